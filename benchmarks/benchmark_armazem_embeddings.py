@@ -0,0 +1,74 @@
+#benchmark_armazem_embeddings.py
+"""
+Mede o armazém de embeddings (armazem_embeddings.py) em float32, float16 e
+int8: tamanho em disco, memória alocada para pontuar todo o histórico a
+partir do memmap, tempo da pontuação e erro dos scores em relação ao float32.
+Inclui, como referência, o custo de manter os vetores em listas Python.
+
+Uso:
+    python benchmarks/benchmark_armazem_embeddings.py [--vetores 100000] [--dimensao 768] [--k 10]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+from armazem_embeddings import ArmazemEmbeddings  # noqa: E402
+from pontuacao_vetorizada import normalizar  # noqa: E402
+
+
+def top_k(scores, k):
+    melhores = np.argpartition(-scores, k - 1)[:k]
+    return set(melhores.tolist())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vetores", type=int, default=100_000)
+    parser.add_argument("--dimensao", type=int, default=768)
+    parser.add_argument("--consultas", type=int, default=20)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    vetores = normalizar(rng.standard_normal((args.vetores, args.dimensao)))
+    consultas = normalizar(rng.standard_normal((args.consultas, args.dimensao)))
+    ids = [f"{i:08d}" for i in range(args.vetores)]
+    referencia = vetores @ consultas.T
+
+    bytes_lista = args.vetores * (56 + 8 * args.dimensao + 24 * args.dimensao)  # list + ponteiros + floats
+    print(f"{args.vetores} vetores, dimensão {args.dimensao}")
+    print(f"listas Python de float (estimado): {bytes_lista / 1e6:10.1f} MB\n")
+    print(f"{'formato':<8} {'disco MB':>9} {'pico MB':>8} {'ms/consulta':>12} {'erro máx':>9} "
+          f"{'recall@' + str(args.k):>9}")
+
+    for formato in ("float32", "float16", "int8"):
+        diretorio = tempfile.mkdtemp(prefix=f"bench_armazem_{formato}_")
+        armazem = ArmazemEmbeddings(diretorio, formato)
+        for i in range(0, args.vetores, 10_000):
+            armazem.adicionar(ids[i:i + 10_000], vetores[i:i + 10_000])
+
+        armazem = ArmazemEmbeddings(diretorio)  # Reabre do disco, como a pontuação faria
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        scores = np.stack([armazem.produto(q) for q in consultas], axis=1)
+        duracao = (time.perf_counter() - inicio) / args.consultas
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        erro = float(np.max(np.abs(scores - referencia)))
+        recall = np.mean([
+            len(top_k(scores[:, j], args.k) & top_k(referencia[:, j], args.k)) / args.k
+            for j in range(args.consultas)
+        ])
+        print(f"{formato:<8} {armazem.bytes_em_disco() / 1e6:9.1f} {pico / 1e6:8.1f} {duracao * 1000:12.1f} "
+              f"{erro:9.2e} {recall:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#benchmark_armazem_vagas.py
+"""
+Compara a leitura das vagas pendentes em .xlsx (pd.read_excel + filtro) e em
+Parquet (projeção de colunas + filtro na leitura) com um histórico sintético.
+
+Uso:
+    python benchmarks/benchmark_armazem_vagas.py [--linhas 50000] [--dir /tmp/bench_vagas]
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+from armazem_vagas import salvar_vagas, ler_vagas_pendentes  # noqa: E402
+
+COLUNAS = ["Code", "Job Description", "Visualizado"]
+
+
+def gerar_historico(linhas, semente=42):
+    rng = np.random.default_rng(semente)
+    descricao = ("Requisitos:\n- Scrum\n- Kanban\n- Jira\n- Inglês avançado\n"
+                 "Diferenciais:\n- PMP\n") * 8
+    visualizado = np.where(rng.random(linhas) < 0.9, "Visualizado", None)
+    return pd.DataFrame({
+        "Visualizado": visualizado,
+        "Company": [f"Empresa {i % 500}" for i in range(linhas)],
+        "Job Info": "São Paulo · há 2 dias",
+        "Job Description": [f"{descricao}Vaga {i}" for i in range(linhas)],
+        "Title": "Coordenador de Projetos",
+        "Link": [f"https://www.linkedin.com/jobs/view/{4000000000 + i}/" for i in range(linhas)],
+        "Code": [str(4000000000 + i) for i in range(linhas)],
+        "Easy Apply": "No",
+        "Sent Resume": "No",
+    })
+
+
+def medir(rotulo, funcao):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcao()
+    duracao = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{rotulo:<28} {duracao:8.3f} s   pico {pico / 1e6:8.1f} MB   {len(resultado)} vagas pendentes")
+    return duracao
+
+
+def ler_excel(caminho):
+    df = pd.read_excel(caminho)
+    return df[df["Visualizado"].isna() | (df["Visualizado"] == "")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=50_000)
+    parser.add_argument("--dir", default="/tmp/bench_vagas")
+    args = parser.parse_args()
+
+    os.makedirs(args.dir, exist_ok=True)
+    caminho_parquet = os.path.join(args.dir, "job_details.parquet")
+    caminho_excel = os.path.join(args.dir, "job_details.xlsx")
+
+    df = gerar_historico(args.linhas)
+    print(f"Gerando histórico com {args.linhas} linhas em {args.dir} ...")
+    salvar_vagas(df, caminho_parquet, caminho_excel)
+    print(f"Tamanho: xlsx {os.path.getsize(caminho_excel) / 1e6:.1f} MB, "
+          f"parquet {os.path.getsize(caminho_parquet) / 1e6:.1f} MB\n")
+
+    t_excel = medir("xlsx (read_excel + filtro)", lambda: ler_excel(caminho_excel))
+    t_parquet = medir("parquet (projeção + filtro)", lambda: ler_vagas_pendentes(caminho_parquet, COLUNAS))
+    print(f"\nGanho: {t_excel / t_parquet:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
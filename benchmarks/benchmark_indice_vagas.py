@@ -0,0 +1,83 @@
+#benchmark_indice_vagas.py
+"""
+Compara o índice IVF de indice_vagas.py com a busca exata (força bruta) num
+histórico sintético agrupado: recall@k e latência por consulta.
+
+Uso:
+    python benchmarks/benchmark_indice_vagas.py [--vagas 50000] [--dimensao 768] [--consultas 200] [--k 10]
+                                                [--formato int8|float16|float32]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+from indice_vagas import IndiceVagas  # noqa: E402
+from pontuacao_vetorizada import normalizar  # noqa: E402
+
+
+def gerar_vetores(n, dimensao, grupos, rng):
+    """
+    Cada vaga mistura dois perfis (ex.: gestão de projetos + dados) com pesos
+    aleatórios, mais ruído: há grupos, mas as fronteiras entre eles são difusas.
+    """
+    centros = rng.standard_normal((grupos, dimensao))
+    peso = rng.random((n, 1))
+    mistura = peso * centros[rng.integers(0, grupos, n)] + (1 - peso) * centros[rng.integers(0, grupos, n)]
+    return normalizar(mistura + 0.5 * rng.standard_normal((n, dimensao)))
+
+
+def busca_exata(vetores, consulta, k):
+    scores = vetores @ consulta
+    melhores = np.argpartition(-scores, k - 1)[:k]
+    return melhores[np.argsort(-scores[melhores])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vagas", type=int, default=50_000)
+    parser.add_argument("--dimensao", type=int, default=768)
+    parser.add_argument("--grupos", type=int, default=300)
+    parser.add_argument("--consultas", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--formato", default="int8", choices=["int8", "float16", "float32"])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    vetores = gerar_vetores(args.vagas + args.consultas, args.dimensao, args.grupos, rng)
+    base, consultas = vetores[:args.vagas], vetores[args.vagas:]
+    ids = [str(i) for i in range(args.vagas)]
+
+    indice = IndiceVagas(tempfile.mkdtemp(prefix="bench_indice_"), formato=args.formato)
+    inicio = time.perf_counter()
+    # Metade numa carga inicial e o resto em inserções incrementais de 1000 vagas
+    metade = args.vagas // 2
+    indice.adicionar(ids[:metade], base[:metade])
+    for i in range(metade, args.vagas, 1000):
+        indice.adicionar(ids[i:i + 1000], base[i:i + 1000])
+    print(f"{args.vagas} vagas, dimensão {args.dimensao}, {args.formato}: construção {time.perf_counter() - inicio:.1f}s, "
+          f"{len(indice.centroides)} listas\n")
+
+    inicio = time.perf_counter()
+    exatos = [busca_exata(base, q, args.k) for q in consultas]
+    t_exato = (time.perf_counter() - inicio) / args.consultas
+    print(f"{'força bruta':<16} {t_exato * 1000:8.2f} ms/consulta   recall@{args.k} 1.000")
+
+    for n_sondas in (1, 2, 4, 8, 16):
+        inicio = time.perf_counter()
+        aproximados = [indice.buscar(q, k=args.k, n_sondas=n_sondas) for q in consultas]
+        t_ivf = (time.perf_counter() - inicio) / args.consultas
+        recall = np.mean([
+            len({int(id_vaga) for id_vaga, _ in aprox} & set(exato.tolist())) / args.k
+            for aprox, exato in zip(aproximados, exatos)
+        ])
+        print(f"{f'IVF sondas={n_sondas}':<16} {t_ivf * 1000:8.2f} ms/consulta   recall@{args.k} {recall:.3f}   "
+              f"({t_exato / t_ivf:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
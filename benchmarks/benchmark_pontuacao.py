@@ -0,0 +1,70 @@
+#benchmark_pontuacao.py
+"""
+Compara a pontuação CV x requisitos em laço Python (uma similaridade de
+cosseno por requisito, como o aderencia_cv_vaga_ia.py fazia) com a versão
+vetorizada de pontuacao_vetorizada.py, com vetores sintéticos.
+
+Uso:
+    python benchmarks/benchmark_pontuacao.py [--vagas 10000] [--requisitos 12] [--dimensao 768]
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+from pontuacao_vetorizada import montar_offsets, normalizar, pontuar  # noqa: E402
+
+
+def calcular_similaridade(vetor_a, vetor_b):
+    return float(np.dot(vetor_a, vetor_b) / (np.linalg.norm(vetor_a) * np.linalg.norm(vetor_b) + 1e-8))
+
+
+def pontuar_laco(vetor_cv, vetores_por_vaga):
+    medias = []
+    for vetores in vetores_por_vaga:
+        scores = [calcular_similaridade(vetor_cv, v) for v in vetores]
+        medias.append(sum(scores) / len(scores))
+    return medias
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vagas", type=int, default=10_000)
+    parser.add_argument("--requisitos", type=int, default=12, help="Máximo de requisitos por vaga")
+    parser.add_argument("--distintos", type=int, default=3000, help="Requisitos distintos no corpus")
+    parser.add_argument("--dimensao", type=int, default=768)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    vetor_cv = rng.standard_normal(args.dimensao)
+    vetores_unicos = rng.standard_normal((args.distintos, args.dimensao))
+    tamanhos = rng.integers(1, args.requisitos + 1, size=args.vagas)
+    posicoes_por_vaga = [rng.integers(0, args.distintos, size=n).tolist() for n in tamanhos]
+    vetores_por_vaga = [[vetores_unicos[i] for i in posicoes] for posicoes in posicoes_por_vaga]
+    print(f"{args.vagas} vagas, {int(tamanhos.sum())} requisitos ({args.distintos} distintos), "
+          f"dimensão {args.dimensao}\n")
+
+    inicio = time.perf_counter()
+    medias_laco = pontuar_laco(vetor_cv, vetores_por_vaga)
+    t_laco = time.perf_counter() - inicio
+    print(f"{'laço Python':<28} {t_laco * 1000:10.1f} ms")
+
+    inicio = time.perf_counter()
+    matriz = normalizar(vetores_unicos)
+    indices, offsets = montar_offsets(posicoes_por_vaga)
+    t_montagem = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    resultado = pontuar(vetor_cv, matriz, indices, offsets)
+    t_vetorizado = time.perf_counter() - inicio
+    print(f"{'matriz + offsets':<28} {t_montagem * 1000:10.1f} ms")
+    print(f"{'vetorizado (scores+agreg.)':<28} {t_vetorizado * 1000:10.1f} ms")
+
+    diferenca = np.max(np.abs(np.asarray(medias_laco) - resultado["media"]))
+    print(f"\nGanho: {t_laco / t_vetorizado:.0f}x   diferença máxima nas médias: {diferenca:.2e}")
+
+
+if __name__ == "__main__":
+    main()
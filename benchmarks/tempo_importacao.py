@@ -0,0 +1,128 @@
+#tempo_importacao.py
+"""
+Relatório de tempo de importação (python -X importtime) dos scripts de
+entrada, comparado com o orçamento gravado em orcamento_importacao.json.
+
+O n8n abre um processo novo para cada item do workflow, então o tempo de
+importação é pago várias vezes por execução. Para cada script, o relatório
+mostra o tempo total de importação (mediana de --repeticoes execuções) e os
+módulos importados diretamente que mais pesam. Sai com código 1 quando algum
+script passa do orçamento ou quando um script com orçamento nem importa (uma
+dependência faltando não pode passar como "dentro do orçamento").
+
+Uso:
+    python benchmarks/tempo_importacao.py                 # relatório + checagem do orçamento
+    python benchmarks/tempo_importacao.py --gravar        # regrava o orçamento (medido x margem)
+    python benchmarks/tempo_importacao.py --scripts cv_sugestor --top 20
+"""
+import os
+import re
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+DIRETORIO_SCRIPTS = os.path.join(RAIZ, "scripts")
+CAMINHO_ORCAMENTO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "orcamento_importacao.json")
+
+SCRIPTS = [
+    "analise_vaga_ia",
+    "aderencia_cv_vaga_ia",
+    "cv_sugestor",
+    "cv_otimizado",
+    "cv_aplicador",
+    "search_linkedin",
+]
+MARGEM_ORCAMENTO = 2.0  # Orçamento gravado = medido x margem (absorve ruído entre máquinas)
+
+_RE_LINHA = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$")
+
+
+def medir(script):
+    """Executa `import <script>` com -X importtime. Retorna (total_ms, {dependência direta: ms}) ou erro."""
+    processo = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {script}"],
+        cwd=DIRETORIO_SCRIPTS, capture_output=True, text=True,
+    )
+    if processo.returncode != 0:
+        ultima = processo.stderr.strip().splitlines()[-1] if processo.stderr.strip() else "erro"
+        raise RuntimeError(ultima)
+
+    total = 0.0
+    diretas = {}
+    for linha in processo.stderr.splitlines():
+        achado = _RE_LINHA.match(linha)
+        if not achado:
+            continue
+        cumulativo_ms = int(achado.group(2)) / 1000
+        nivel = (len(achado.group(3)) - 1) // 2
+        nome = achado.group(4)
+        if nivel == 0 and nome == script:
+            total = cumulativo_ms
+        elif nivel == 1:
+            diretas[nome] = diretas.get(nome, 0.0) + cumulativo_ms
+    return total, diretas
+
+
+def carregar_orcamento():
+    if not os.path.exists(CAMINHO_ORCAMENTO):
+        return {}
+    with open(CAMINHO_ORCAMENTO, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scripts", nargs="+", default=SCRIPTS)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="Dependências diretas listadas por script")
+    parser.add_argument("--gravar", action="store_true", help="Regrava o orçamento a partir desta medição")
+    args = parser.parse_args()
+
+    orcamento = carregar_orcamento()
+    novo_orcamento = dict(orcamento)
+    estouros = []
+    falhas = []
+
+    for script in args.scripts:
+        try:
+            medicoes = [medir(script) for _ in range(args.repeticoes)]
+        except RuntimeError as e:
+            com_orcamento = script in orcamento
+            situacao = "FALHA (tem orçamento)" if com_orcamento else "sem orçamento"
+            print(f"{script:<24} não importável neste ambiente ({e})   {situacao}\n")
+            if com_orcamento:
+                falhas.append(script)
+            continue
+
+        total = statistics.median(m[0] for m in medicoes)
+        diretas = medicoes[len(medicoes) // 2][1]
+        limite = orcamento.get(script)
+        situacao = "sem orçamento" if limite is None else ("OK" if total <= limite else "ACIMA DO ORÇAMENTO")
+        print(f"{script:<24} {total:8.1f} ms   orçamento {limite if limite is not None else '-':>6} ms   {situacao}")
+        for nome, ms in sorted(diretas.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"    {nome:<40} {ms:8.1f} ms")
+        print()
+
+        if limite is not None and total > limite:
+            estouros.append(script)
+        novo_orcamento[script] = int(round(total * MARGEM_ORCAMENTO))
+
+    if args.gravar:
+        with open(CAMINHO_ORCAMENTO, "w", encoding="utf-8") as f:
+            json.dump(novo_orcamento, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"Orçamento gravado em {CAMINHO_ORCAMENTO}")
+        return 0
+
+    if falhas:
+        print(f"Scripts com orçamento que não importaram: {', '.join(falhas)}")
+    if estouros:
+        print(f"Scripts acima do orçamento de importação: {', '.join(estouros)}")
+    return 1 if falhas or estouros else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
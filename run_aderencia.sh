@@ -1,7 +1,22 @@
 #!/bin/bash
 #run_aderencia.sh
+# Cliente fino: repassa a vaga (stdin) ao servidor de aderência, que mantém o
+# modelo de embedding e a matriz do CV carregados entre os itens do n8n.
+# Sem servidor no ar, sobe um em segundo plano para os próximos itens e
+# pontua este item no modo de execução única.
 export MY_LOG_LEVEL=WARNING
 cd /data/linkedin-automacao
 source .venv/bin/activate
 export GOOGLE_APPLICATION_CREDENTIALS="application_default_credentials.json"
-.venv/bin/python3 scripts/aderencia_cv_vaga_ia.py 2> logs/aderencia_logs.txt
\ No newline at end of file
+export ADERENCIA_SOCKET="${ADERENCIA_SOCKET:-logs/aderencia.sock}"
+ENTRADA="$(cat)"
+
+if [ -S "$ADERENCIA_SOCKET" ] && command -v curl > /dev/null 2>&1 && \
+    printf '%s' "$ENTRADA" | curl -sf --max-time 300 --unix-socket "$ADERENCIA_SOCKET" \
+        -H "Content-Type: application/json" --data-binary @- http://localhost/pontuar; then
+    echo
+else
+    nohup .venv/bin/python3 scripts/aderencia_cv_vaga_ia.py --servidor \
+        < /dev/null > /dev/null 2>> logs/aderencia_servidor_logs.txt &
+    printf '%s' "$ENTRADA" | .venv/bin/python3 scripts/aderencia_cv_vaga_ia.py 2> logs/aderencia_logs.txt
+fi
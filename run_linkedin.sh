@@ -1,6 +1,7 @@
 #!/bin/bash
 #run_linkedin.sh
 export MY_LOG_LEVEL=WARNING
+export SAIDA_FORMATO=ndjson
 cd /data/linkedin-automacao
 source .venv/bin/activate
 .venv/bin/python3 scripts/analise_vaga_ia.py 2> logs/analise_vagas_logs.txt
\ No newline at end of file
@@ -31,19 +31,36 @@ def checa_credenciais_google():
     else:
          logging.info(f"💡 Usando credenciais do arquivo: {cred_path}")
 
-# Use sempre este check ANTES de importar qualquer SDK Google:
-checa_credenciais_google()
-
 import json
-import vertexai
-from vertexai.language_models import TextEmbeddingModel
-import google.generativeai as genai
-from google.generativeai import types
-from google.auth import default # Para carregar credenciais automaticamente
+from itertools import islice
 
-from docx import Document
 import numpy as np
 
+import cache_embedding
+from backends_embedding import criar_backend, BackendVertex
+from embedding_cv import carregar_matriz_cv
+from extracao_cv import texto_cv
+from entrada_json import iterar_entrada
+from saida_json import emitir
+from armazem_embeddings import FORMATO_PADRAO
+from indice_vagas import IndiceAberto, DIRETORIO_PADRAO as DIRETORIO_INDICE_PADRAO
+from pontuacao_vetorizada import (
+    montar_offsets,
+    normalizar,
+    pontuar,
+    vetores_das_vagas,
+    validar_top_k,
+    PESO_OBRIGATORIO_PADRAO,
+    PESO_DESEJAVEL_PADRAO,
+    TOP_K_PADRAO,
+)
+
+
+# Campos da referência guardados junto de cada vaga no índice do histórico
+CAMPOS_METADADOS_INDICE = ("Title", "Company", "Link")
+# Vagas pontuadas por vez quando a entrada chega em fluxo
+LOTE_VAGAS_PADRAO = 500
+
 
 def stdin_has_data():
     return not sys.stdin.isatty() and select.select([sys.stdin], [], [], 0.1)[0]
@@ -53,20 +70,7 @@ def ler_config(path_config):
         config = json.load(f)
     return config
 
-def extrair_texto_docx(cv_file):
-    # Abre o documento
-    document = Document(cv_file)
-
-    return "\n".join([p.text for p in document.paragraphs])
-
-def criar_embedding_batch(texto,modelo_nome):
-
-    PROJECT_ID = os.environ.get('VERTEX_PROJECT', 'n8n-automatizando-ia-424719')
-    REGION = os.environ.get('VERTEX_REGION', 'us-central1')
-
-    vertexai.init(project=PROJECT_ID, location=REGION)
-    # Inicializa o modelo de embedding
-    modelo = TextEmbeddingModel.from_pretrained(modelo_nome)
+def criar_embedding_batch(texto, backend, etapa="aderencia_embeddings"):
 
     # Verifica se a entrada é uma string para sabermos como retornar o resultado
     is_single_item = isinstance(texto, str)
@@ -80,11 +84,14 @@ def criar_embedding_batch(texto,modelo_nome):
     if not payload:
         return []
 
-    # Gera o embedding para o texto do CV
+    # Consulta o cache de embeddings e só envia ao backend os textos ainda não vistos
     try:
-        embeddings_response = modelo.get_embeddings(payload)
-        # Extrai os valores numéricos de cada objeto de embedding retornado
-        vetores = [emb.values for emb in embeddings_response]
+        if backend.usar_cache:
+            vetores = cache_embedding.obter_ou_calcular(
+                payload, backend.nome, lambda faltantes: backend.gerar(faltantes, etapa=etapa)
+            )
+        else:
+            vetores = backend.gerar(payload, etapa=etapa)
 
         # Se a entrada original era uma string, retorna apenas o primeiro (e único) vetor.
         # Caso contrário, retorna a lista completa de vetores.
@@ -97,101 +104,182 @@ def criar_embedding_batch(texto,modelo_nome):
         raise RuntimeError(f"Erro ao gerar o embedding: {e}")
 
 
-def calcular_similaridade(vetor_a, vetor_b):
-    return float(np.dot(vetor_a, vetor_b) / (np.linalg.norm(vetor_a) * np.linalg.norm(vetor_b) + 1e-8))
-
-# Adapte a função comparar_cv_vagas para receber código e descrição
-def comparar_cv_vagas(cv_texto, vagas, modelo_embedding="text-multilingual-embedding-002", codigo_col="Code", descricao_col="Job Description"):
-
-    resultado_ranking = []
-    emb_cv = criar_embedding_batch(cv_texto, modelo_embedding)
-
+def coletar_requisitos(vagas, codigo_col="Code", peso_obrigatorio=PESO_OBRIGATORIO_PADRAO):
+    """Lista (referencia, requisitos, pesos) das vagas com análise e ao menos um requisito."""
     sys.stderr.write(f"Total de vagas: {len(vagas)}\n")
 
+    vagas_validas = []
     for idx, vaga in enumerate(vagas):
-        codigo = vaga['referencia'].get('Code')
+        analise = vaga.get("analise", {}) or {}
+        referencia = vaga.get('referencia', {}) or {}
+        codigo = referencia.get(codigo_col)
         sys.stderr.write(f"Código da vaga {idx}: {codigo}\n")
 
-        analise = vaga.get("analise", {}) 
-        referencia = vaga.get('referencia', {})
-        if not analise:  # Pula se o item não tiver a chave "vaga"
-            logging.info(f"[IGNORADA] Vaga {codigo}: sem campo 'analise'.", file=sys.stderr)
-
-        # Pega a descrição usando o nome da coluna dinâmico do seu JSON
-        descricao = analise.get(descricao_col, "")
-        logging.info("VAGA RECEBIDA:", vaga)
-        logging.info("CHAVES:", vaga.keys())
+        if not analise:  # Pula se o item não tiver a chave "analise"
+            logging.info(f"[IGNORADA] Vaga {codigo}: sem campo 'analise'.")
+            continue
 
-        # Adapte para obter requisitos obrigatórios/desejáveis
-        #reqs = vaga.get("requisitos_obrigatorios", []) + vaga.get("requisitos_desejaveis", [])
         obrigatorios = analise.get('requisitos_obrigatorios', [])
         desejaveis   = analise.get('requisitos_desejaveis', [])
         reqs = obrigatorios + desejaveis
 
         if not reqs:
-            logging.info(f"[IGNORADA] Vaga {codigo}: sem requisitos obrigatórios nem desejáveis.", file=sys.stderr)
+            logging.info(f"[IGNORADA] Vaga {codigo}: sem requisitos obrigatórios nem desejáveis.")
             continue
 
-        logging.info(f"[PROCESSADA] Vaga {codigo}: processando normalmente.", file=sys.stderr)
+        logging.info(f"[PROCESSADA] Vaga {codigo}: processando normalmente.")
+        pesos = [peso_obrigatorio] * len(obrigatorios) + [PESO_DESEJAVEL_PADRAO] * len(desejaveis)
+        vagas_validas.append((referencia, reqs, pesos))
+    return vagas_validas
 
-        emb_reqs = criar_embedding_batch(reqs, modelo_embedding)
-        logging.info("embedding retornado reqs:", emb_reqs)
 
-        scores = [calcular_similaridade(emb_cv, emb_req) for emb_req in emb_reqs]
+def embedar_requisitos(vagas_validas, backend):
+    """Embeda os requisitos distintos de todas as vagas de uma só vez. Retorna (matriz, indices, offsets, pesos)."""
+    requisitos_unicos = list(dict.fromkeys(req for _, reqs, _ in vagas_validas for req in reqs))
+    logging.info(
+        f"{sum(len(reqs) for _, reqs, _ in vagas_validas)} requisitos em {len(vagas_validas)} vagas; "
+        f"{len(requisitos_unicos)} distintos."
+    )
+    matriz = normalizar(criar_embedding_batch(requisitos_unicos, backend))
+    posicao = {req: i for i, req in enumerate(requisitos_unicos)}
 
-        if not scores: # Segurança extra para evitar divisão por zero
-            continue
+    indices, offsets = montar_offsets([[posicao[req] for req in reqs] for _, reqs, _ in vagas_validas])
+    pesos = np.concatenate([pesos for _, _, pesos in vagas_validas])
+    return matriz, indices, offsets, pesos
+
+
+# Adapte a função comparar_cv_vagas para receber código e descrição
+def comparar_cv_vagas(cv_texto, vagas, backend=None, codigo_col="Code", descricao_col="Job Description",
+                      peso_obrigatorio=PESO_OBRIGATORIO_PADRAO, top_k=TOP_K_PADRAO, matriz_cv=None, indice=None):
 
+    backend = backend or BackendVertex()
+    resultado_ranking = []
+    # matriz_cv (seções x dimensão) vem do cache de embedding_cv; sem ela, o CV inteiro vira um vetor
+    emb_cv = matriz_cv if matriz_cv is not None else criar_embedding_batch(cv_texto, backend)
+
+    # 1) Coleta os requisitos de todas as vagas
+    vagas_validas = coletar_requisitos(vagas, codigo_col, peso_obrigatorio)
+    if not vagas_validas:
+        return resultado_ranking
+
+    # 2) Embeddings dos requisitos distintos de todas as vagas de uma só vez
+    matriz, indices, offsets, pesos = embedar_requisitos(vagas_validas, backend)
+
+    # 3) Calcula todos os scores de uma vez e os devolve a cada vaga
+    resultado = pontuar(emb_cv, matriz, indices, offsets, pesos=pesos, top_k=top_k)
+    scores = resultado["scores"].tolist()
+
+    for j, (referencia, reqs, _) in enumerate(vagas_validas):
+        inicio = int(offsets[j])
         detalhes = [
             {"requisito": req, "score": round(score, 4)}
-            for req, score in zip(reqs, scores)
+            for req, score in zip(reqs, scores[inicio:inicio + len(reqs)])
         ]
-        score_geral = round(sum(scores) / len(scores), 4)
         resultado_ranking.append({
             "codigo": referencia.get(codigo_col, ""),
-            "similaridade_geral": score_geral,
+            "similaridade_geral": round(float(resultado["media"][j]), 4),
+            "similaridade_ponderada": round(float(resultado["ponderada"][j]), 4),
+            "similaridade_top_k": round(float(resultado["top_k"][j]), 4),
             "detalhes": detalhes
         })
 
+    # 4) Acumula as vagas no índice do histórico (indice_vagas.IndiceAberto)
+    if indice is not None:
+        vetores = vetores_das_vagas(matriz, indices, offsets)
+        com_codigo = [j for j, (referencia, _, _) in enumerate(vagas_validas) if referencia.get(codigo_col)]
+        indice.adicionar(
+            backend.nome,
+            [vagas_validas[j][0][codigo_col] for j in com_codigo],
+            vetores[com_codigo],
+            metadados=[
+                {campo: vagas_validas[j][0].get(campo, "") for campo in CAMPOS_METADADOS_INDICE}
+                for j in com_codigo
+            ],
+        )
+
     resultado_ranking.sort(key=lambda x: x["similaridade_geral"], reverse=True)
     return resultado_ranking
 
 
-def main():
+def preparar_backend(config):
+    """Cria o backend de embedding, checa credenciais e aquece o modelo (uma vez por processo)."""
+    backend = criar_backend(config)
 
-    config_path = os.environ.get('CONFIG_JSON_PATH', 'configs/linkedin.json')    
-    config = ler_config(config_path)
+    # Use sempre este check ANTES de importar qualquer SDK Google (só o backend Vertex precisa):
+    if backend.requer_credenciais_google:
+        checa_credenciais_google()
 
-    # Lê configurações
-    vagas_json_path  = config['output_file_requirements']
-    cv_docx_path  = config['input_file_cv']
-    diretorio_saida = config['output_file_score']
-
-    # Extrai texto do CV (.docx)
-    cv_texto = extrair_texto_docx(cv_docx_path)
-
-    # Lê as vagas do JSON no n8n como a entrada é via stdin a linha de baixo não é necesspara
-    if stdin_has_data():
-        entrada_json = sys.stdin.read()
-    elif len(sys.argv) > 1:
-        with open(sys.argv[1]) as f:
-            entrada_json = f.read()
-    else:
-        logging.info("Nenhuma entrada fornecida! Use argumento de arquivo ou STDIN.")
-        exit(1)
+    # Inicializa o modelo e abre a conexão antes da primeira vaga
+    if config.get('aquecer_embedding', True):
+        backend.aquecer()
+    return backend
 
-    vagas = json.loads(entrada_json)
 
-    print("Tipo de vagas:", type(vagas), file=sys.stderr)
-    print("Primeiro item de vagas:", vagas[0] if isinstance(vagas, list) else vagas, file=sys.stderr)
+def carregar_cv(config, backend):
+    """
+    CV do config pronto para a pontuação: (matriz de seções, None) com
+    `cv_por_secoes`, com a matriz de embeddings em cache, ou (None, texto inteiro).
+    """
+    cv_docx_path = config['input_file_cv']
+    if config.get('cv_por_secoes', True):
+        matriz_cv, _ = carregar_matriz_cv(
+            cv_docx_path, backend.nome,
+            lambda secoes: criar_embedding_batch(secoes, backend, etapa="aderencia_cv"),
+        )
+        return matriz_cv, None
+    return None, texto_cv(cv_docx_path)
+
+
+def abrir_indice(config):
+    """Índice do histórico de vagas do config (None com `indexar_vagas` desligado)."""
+    if not config.get('indexar_vagas', True):
+        return None
+    return IndiceAberto(
+        config.get('diretorio_indice_vagas', DIRETORIO_INDICE_PADRAO),
+        config.get('formato_indice_vagas', FORMATO_PADRAO),
+    )
+
+
+def pontuar_vagas(config, backend, vagas, cv=None, indice=None):
+    """
+    Pontua as vagas (objeto único, lista ou iterador, como o de entrada_json)
+    contra o CV do config e grava o ranking em output_file_score. As vagas são
+    consumidas em lotes de `lote_vagas_aderencia`, para que a pontuação comece
+    antes do fim da entrada e a memória não cresça com o tamanho dela.
+
+    O servidor_aderencia passa `cv` (retorno de carregar_cv) e `indice` (um
+    IndiceAberto) já carregados; sem eles, são carregados aqui, uma vez por chamada.
+    """
+    diretorio_saida = config['output_file_score']
+    tamanho_lote = config.get('lote_vagas_aderencia', LOTE_VAGAS_PADRAO)
+    # Valida antes de gastar embeddings com o primeiro lote
+    top_k = validar_top_k(config.get('top_k_requisitos', TOP_K_PADRAO))
 
-    # Se não é lista, faz virar lista
+    # Se é um objeto único, faz virar lista
     if isinstance(vagas, dict):
         vagas = [vagas]
-    elif not isinstance(vagas, list):
+    elif isinstance(vagas, (str, bytes)) or not hasattr(vagas, "__iter__"):
         raise ValueError("Formato de entrada inválido: deve ser lista ou objeto com chaves 'analise'/'referencia'.")
 
-    ranking = comparar_cv_vagas(cv_texto, vagas)
+    # Extrai texto do CV (.docx): por seções, com a matriz de embeddings em cache, ou inteiro
+    matriz_cv, cv_texto = cv if cv is not None else carregar_cv(config, backend)
+    if indice is None:
+        indice = abrir_indice(config)
+
+    # Requisitos repetidos entre lotes não voltam à API: o cache_embedding os devolve
+    ranking = []
+    vagas = iter(vagas)
+    while lote := list(islice(vagas, tamanho_lote)):
+        ranking.extend(comparar_cv_vagas(
+            cv_texto, lote, backend=backend,
+            peso_obrigatorio=config.get('peso_requisito_obrigatorio', PESO_OBRIGATORIO_PADRAO),
+            top_k=top_k,
+            matriz_cv=matriz_cv,
+            indice=indice,
+        ))
+    ranking.sort(key=lambda x: x["similaridade_geral"], reverse=True)
+
+    cache_embedding.registrar_estatisticas()
 
     # Salva no arquivo
     with open(diretorio_saida, "w", encoding="utf-8") as f:
@@ -199,10 +287,35 @@ def main():
 
     return ranking
 
+
+def main():
+
+    config_path = os.environ.get('CONFIG_JSON_PATH', 'configs/linkedin.json')    
+    config = ler_config(config_path)
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--servidor":
+        # Processo persistente: backend e matriz do CV ficam carregados entre as vagas
+        import servidor_aderencia
+        servidor_aderencia.servir(config, preparar_backend(config), pontuar_vagas, carregar_cv, abrir_indice(config))
+        sys.exit(0)
+
+    backend = preparar_backend(config)
+
+    # Lê as vagas em fluxo (array, objeto único ou NDJSON), do stdin do n8n ou de um arquivo
+    if stdin_has_data():
+        vagas = iterar_entrada()
+    elif len(sys.argv) > 1:
+        vagas = iterar_entrada(sys.argv[1])
+    else:
+        logging.info("Nenhuma entrada fornecida! Use argumento de arquivo ou STDIN.")
+        exit(1)
+
+    return pontuar_vagas(config, backend, vagas)
+
 if __name__ == '__main__':
     try:
         resultado = main()
-        print(json.dumps(resultado, ensure_ascii=False))
+        emitir(resultado, "aderencia_cv_vaga_ia")
     except Exception as e:
-        sys.stderr.write(json.dumps({"error": str(e)},ensure_ascii=False, indent=2), file=sys.stderr)
+        sys.stderr.write(json.dumps({"error": str(e)},ensure_ascii=False, indent=2))
         sys.exit(1)    
\ No newline at end of file
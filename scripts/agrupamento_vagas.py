@@ -0,0 +1,172 @@
+#agrupamento_vagas.py
+"""
+Agrupamento de vagas com requisitos praticamente iguais (cv_sugestor.py).
+
+A mesma função em empresas diferentes costuma gerar análises quase idênticas
+de `requisitos_obrigatorios` e `hard_skills`, e cada uma custava uma chamada
+de sugestões ao Gemini. Aqui cada vaga que chega é comparada com as vagas
+"líderes" dos grupos já formados (agrupamento guloso, na ordem da entrada):
+
+- "jaccard": similaridade de Jaccard entre os conjuntos de requisitos
+  normalizados (minúsculas, sem acento, sem pontuação nas pontas);
+- "embedding": cosseno entre os embeddings do conjunto de requisitos, pelo
+  mesmo backend (e cache) da aderência.
+
+Se a melhor similaridade passa do limiar, a vaga entra no grupo e reaproveita
+as sugestões do líder; senão, vira líder de um grupo novo. O relatório traz o
+número de grupos, as chamadas evitadas e uma amostra de controle de qualidade
+(requisitos que só o membro tem e quanto das sugestões do líder aparece nos
+requisitos do membro).
+"""
+import os
+import re
+import sys
+import logging
+import unicodedata
+
+# ================= LOGGING SETUP =================
+loglevel = os.environ.get("MY_LOG_LEVEL", "INFO").upper()
+logger = logging.getLogger(__name__)
+logger.setLevel(loglevel)
+
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.propagate = False
+
+METODOS = ("jaccard", "embedding")
+CAMPOS_AGRUPAMENTO = ("requisitos_obrigatorios", "hard_skills")
+LIMIAR_PADRAO = {"jaccard": 0.8, "embedding": 0.95}
+AMOSTRA_QC_PADRAO = 3
+_MAX_DIFERENCAS_QC = 5  # Requisitos exclusivos do membro listados por item da amostra
+
+
+def normalizar_requisito(texto):
+    texto = unicodedata.normalize("NFKD", str(texto))
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    texto = re.sub(r"\s+", " ", texto.lower()).strip()
+    return texto.strip(" .,;:-–—•*#|()")
+
+
+def conjunto_requisitos(analise, campos=CAMPOS_AGRUPAMENTO):
+    """Conjunto normalizado dos requisitos da análise usados no agrupamento."""
+    itens = set()
+    for campo in campos:
+        valores = analise.get(campo)
+        if isinstance(valores, list):
+            itens.update(filter(None, (normalizar_requisito(v) for v in valores)))
+    return frozenset(itens)
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class Grupo:
+    """Grupo de vagas servido pelas sugestões do líder (a primeira vaga do grupo)."""
+
+    def __init__(self, lider, conjunto, vetor=None):
+        self.lider = lider
+        self.conjunto = conjunto
+        self.vetor = vetor
+        self.membros = []  # (codigo, similaridade, conjunto) das vagas que reaproveitam o líder
+        self.futuro = None  # Future com o registro de sugestões do líder
+
+
+class Agrupador:
+    """
+    Agrupamento guloso e incremental: `atribuir` é chamado uma vez por vaga, na
+    ordem da entrada, e decide na hora se ela reaproveita um grupo existente.
+    No método "embedding", `vetorizar(texto)` retorna o embedding do conjunto.
+    """
+
+    def __init__(self, metodo="jaccard", limiar=None, vetorizar=None):
+        if metodo not in METODOS:
+            raise ValueError(f"metodo_agrupamento inválido: {metodo!r} (use {', '.join(METODOS)}).")
+        if metodo == "embedding" and vetorizar is None:
+            raise ValueError("O agrupamento por embedding precisa de uma função de vetorização.")
+        self.metodo = metodo
+        self.limiar = LIMIAR_PADRAO[metodo] if limiar is None else float(limiar)
+        self.vetorizar = vetorizar
+        self.grupos = []
+        self.requisitos = {}  # codigo -> texto dos requisitos (para a amostra de controle de qualidade)
+        self.vagas = 0
+        self.refinamentos = 0
+
+    def _vetor(self, conjunto):
+        import numpy as np  # Só o método "embedding" precisa (mantém a importação do cv_sugestor leve)
+
+        vetor = np.asarray(self.vetorizar("; ".join(sorted(conjunto))), dtype=np.float32)
+        return vetor / max(float(np.linalg.norm(vetor)), 1e-8)
+
+    def atribuir(self, codigo, conjunto, requisitos_texto=""):
+        """Retorna (grupo, similaridade, eh_lider). Vagas sem requisitos não são agrupadas (grupo None)."""
+        self.vagas += 1
+        if not conjunto:
+            return None, 0.0, True
+        self.requisitos[codigo] = requisitos_texto
+
+        vetor = self._vetor(conjunto) if self.metodo == "embedding" else None
+        melhor, melhor_sim = None, -1.0
+        for grupo in self.grupos:
+            sim = float(vetor @ grupo.vetor) if vetor is not None else jaccard(conjunto, grupo.conjunto)
+            if sim > melhor_sim:
+                melhor, melhor_sim = grupo, sim
+
+        if melhor is not None and melhor_sim >= self.limiar:
+            melhor.membros.append((codigo, melhor_sim, conjunto))
+            return melhor, melhor_sim, False
+
+        grupo = Grupo(codigo, conjunto, vetor)
+        self.grupos.append(grupo)
+        return grupo, 1.0, True
+
+    def relatorio(self, amostra=AMOSTRA_QC_PADRAO):
+        """
+        Resumo do agrupamento. A amostra de controle de qualidade pega os membros
+        menos parecidos com o líder e mede quanto dos substitutos sugeridos ao
+        líder aparece nos requisitos do líder e nos do membro.
+        """
+        membros = sum(len(g.membros) for g in self.grupos)
+        resultado = {
+            "metodo": self.metodo,
+            "limiar": self.limiar,
+            "vagas": self.vagas,
+            "grupos": len(self.grupos),
+            "grupos_com_membros": sum(1 for g in self.grupos if g.membros),
+            "chamadas_evitadas": membros - self.refinamentos,
+            "refinamentos": self.refinamentos,
+            "amostra_qc": [],
+        }
+
+        candidatos = sorted(
+            ((g, codigo, sim, conjunto) for g in self.grupos for codigo, sim, conjunto in g.membros),
+            key=lambda item: item[2],
+        )
+        for grupo, codigo, sim, conjunto in candidatos[:amostra]:
+            registro_lider = grupo.futuro.result() if grupo.futuro is not None and grupo.futuro.done() else None
+            sugestoes = (registro_lider or {}).get("sugestoes", [])
+            resultado["amostra_qc"].append({
+                "codigo": codigo,
+                "lider": grupo.lider,
+                "similaridade": round(sim, 4),
+                "so_na_vaga": sorted(conjunto - grupo.conjunto)[:_MAX_DIFERENCAS_QC],
+                "so_no_lider": sorted(grupo.conjunto - conjunto)[:_MAX_DIFERENCAS_QC],
+                "cobertura_lider": cobertura(sugestoes, self.requisitos.get(grupo.lider, "")),
+                "cobertura_vaga": cobertura(sugestoes, self.requisitos.get(codigo, "")),
+            })
+        return resultado
+
+
+def cobertura(sugestoes, requisitos_texto):
+    """Fração dos substitutos sugeridos que aparecem no texto dos requisitos (None sem sugestões)."""
+    substitutos = [normalizar_requisito(s.get("substituto", "")) for s in sugestoes if isinstance(s, dict)]
+    substitutos = [s for s in substitutos if s]
+    if not substitutos:
+        return None
+    texto = normalizar_requisito(requisitos_texto)
+    return round(sum(1 for s in substitutos if s in texto) / len(substitutos), 4)
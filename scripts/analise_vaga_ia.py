@@ -4,13 +4,18 @@ from dotenv import load_dotenv
 import os
 import json
 import logging
-import time
 
-import google.generativeai as genai
-from google.generativeai import types
-from google.auth import default # Para carregar credenciais automaticamente
 import pandas as pd
 
+import cliente_gemini
+from preprocessamento_vaga import preprocessar_descricao
+import extrator_local
+from armazem_vagas import ler_vagas_pendentes, caminho_parquet_padrao
+from parser_resposta_ia import (
+    interpretar_resposta, validar_analise, validar_analise_com_sugestoes, filtrar_sugestoes_literais, RespostaInvalida,
+)
+from saida_json import emitir
+
 # ================= LOGGING SETUP =================
 loglevel = os.environ.get("MY_LOG_LEVEL", "INFO").upper()
 logging.basicConfig(
@@ -22,13 +27,8 @@ logging.basicConfig(
 load_dotenv()  # Carrega automaticamente as variáveis do .env
 
 def carrega_chave():
-    gemini_api_key = os.getenv('GEMINI_API_KEY')
-    if not gemini_api_key:
-        log_erro("Chave de API do Google não encontrada (GEMINI_API_KEY).")
-        sys.exit(1)
-        
-    genai.configure(api_key=gemini_api_key)
-    return genai
+    # genai.configure acontece uma única vez por processo, no cliente compartilhado
+    return cliente_gemini.configurar()
 
 
 def log_erro(msg):
@@ -72,8 +72,23 @@ def ler_vagas_do_excel(arquivo_excel, coluna_visualizado="Visualizado"):
         log_erro(f"Erro ao ler o Excel: {e}")
         sys.exit(1)
 
+def ler_vagas(arquivo_excel, arquivo_parquet, coluna_visualizado, colunas):
+    """
+    Lê as vagas pendentes do Parquet gerado pelo search_linkedin.py, projetando só
+    as colunas usadas e filtrando `Visualizado` na leitura. Sem Parquet, usa o Excel.
+    """
+    if arquivo_parquet and os.path.isfile(arquivo_parquet):
+        try:
+            df = ler_vagas_pendentes(arquivo_parquet, colunas, coluna_visualizado)
+            logging.info(f"{len(df)} vagas pendentes lidas de {arquivo_parquet}.")
+            return df
+        except Exception as e:
+            log_erro(f"Erro ao ler o Parquet: {e}")
+            sys.exit(1)
+    return ler_vagas_do_excel(arquivo_excel, coluna_visualizado)
+
 # ==== PASSO 2: Função para análise de vaga (usando a API do Gemini) ====
-def analisar_vaga(genai, texto_vaga, indice,codigo,modelo="gemini-1.5-flash"):
+def analisar_vaga(genai, texto_vaga, indice,codigo,modelo="gemini-1.5-flash", tentativas_parse=2):
 #def analisar_vaga(genai, texto_vaga, indice,codigo,modelo="gemini-2.5-flash-preview-05-20"):
     result = None
 
@@ -100,54 +115,93 @@ def analisar_vaga(genai, texto_vaga, indice,codigo,modelo="gemini-1.5-flash"):
         return None, "vaga vazia ou inválida"
                
     try:
-        modelo = genai.GenerativeModel(modelo)
+        # Handle do modelo reaproveitado entre as vagas (criado só na primeira chamada)
+        cliente_gemini.obter_modelo(modelo)
         logging.info(f"\nAnalisando a vaga {indice + 1}  {codigo}")
     except Exception as e:
         log_erro(f"Erro ao carregar o modelo: {e}")
         return None, f"Erro ao carregar o modelo: {e}"
 
-    try:
-        # Chamada para gerar o conteúdo
-        config =  genai.types.GenerationConfig(temperature=0.7,response_mime_type="application/json")
-        result = modelo.generate_content(
-            prompt,  # Usando a nova API com Part
-            generation_config=config
-            )
-    except Exception as e:
-        log_erro(f"Erro ao chamar a API do modelo: {e}")
-        return None, f"Erro ao chamar o modelo: {e}"
-
-    # Limpa o texto removendo espaços extras e quebras de linha
-    texto_limpo = result.text.strip()
-
-    # Remover os marcadores de bloco de código Markdown
-    if texto_limpo.startswith("```json"):
-        texto_limpo = texto_limpo[len("```json"):]
-    if texto_limpo.startswith("```"): # Caso seja apenas ```
-        texto_limpo = texto_limpo[len("```"):]
-    if texto_limpo.endswith("```"):
-        texto_limpo = texto_limpo[:-len("```")]
-    
-    # Remove markdown code blocks (tolerando espaçamentos)
-    texto_limpo = texto_limpo.replace("```json", "").replace("```", "").strip()
-
-    try:
-        # Certifique-se de que cleaned_text não está vazio após a limpeza
-        if not texto_limpo:
-            raise json.JSONDecodeError("String vazia após limpeza dos marcadores", "", 0)
-        
-        dados_json = json.loads(texto_limpo)
-
-        return dados_json, None
+    return _gerar_e_interpretar(prompt, modelo, validar_analise, "analise_vaga", indice, codigo, tentativas_parse)
+
+def _gerar_e_interpretar(prompt, modelo, validador, etapa, indice, codigo, tentativas_parse, contexto_cache=None):
+    """Chama o modelo e valida a resposta; só repete a chamada se o reparo local não resolver. Retorna (dados, erro)."""
+    config = cliente_gemini.config_json(temperatura=0.7)
+    erro = None
+    for tentativa in range(1, tentativas_parse + 1):
+        try:
+            # Chamada para gerar o conteúdo (timeout e retry definidos em cliente_gemini)
+            result = cliente_gemini.gerar_conteudo(prompt, modelo=modelo, generation_config=config,
+                                                   etapa=etapa, codigo_vaga=codigo, contexto_cache=contexto_cache)
+        except Exception as e:
+            log_erro(f"Erro ao chamar a API do modelo: {e}")
+            return None, f"Erro ao chamar o modelo: {e}"
+
+        try:
+            # json.loads direto; se falhar, reparo local (cercas, aspas, vírgulas, NaN, truncamento)
+            # e validação contra o schema. Nova chamada à API só se o reparo não resolver.
+            dados_json = interpretar_resposta(result.text, validador)
+            return dados_json, None
+
+        except RespostaInvalida as e:
+            log_erro(f"Resposta inválida para a vaga {indice} {codigo} (tentativa {tentativa}/{tentativas_parse}): {e}")
+            erro = f"Erro ao decodificar JSON: {e}"
+
+        except Exception as e:
+            log_erro(f"Erro inesperado ao processar a vaga {indice} {codigo}: {e}")
+            return None, f"Erro inesperado: {e}"
+
+    return None, erro
+
+def analisar_vaga_com_sugestoes(texto_vaga, indice, codigo, contexto, modelo="gemini-1.5-flash", tentativas_parse=2):
+    """
+    Modo combinado (analise_com_sugestoes): numa única chamada, a análise da vaga
+    (mesmo schema de analisar_vaga) e as sugestões de substituição no CV (mesmo
+    formato do cv_sugestor). `contexto` é o contexto_cv.ContextoCV do CV.
+    Retorna ({"analise": {...}, "sugestoes": [...]}, erro).
+    """
+    if pd.isna(texto_vaga) or not isinstance(texto_vaga, str) or texto_vaga.strip() == "":
+        log_erro(f"Descrição da vaga {indice+1} {codigo} está vazia ou inválida. Pulando.")
+        return None, "vaga vazia ou inválida"
 
-    except json.JSONDecodeError as e:
-        log_erro(f"Erro ao decodificar JSON após strip para a vaga {indice} {codigo}: {e}")
-        #log_erro(f"Conteúdo problemático (após strip): {repr(texto_limpo)}")
-        return None, f"Erro ao decodificar JSON: {e}"
+    if contexto.nome_cache:
+        bloco_cv = "(O currículo do candidato está no contexto em cache.)"
+    else:
+        bloco_cv = contexto.texto
 
-    except Exception as e:
-        log_erro(f"Erro inesperado ao processar a vaga {indice} {codigo}: {e}")
-        return None, f"Erro inesperado: {e}"
+    prompt = f"""
+    Aja como um analista de RH e especialista em otimização de currículos.
+    1. Analise a descrição de vaga abaixo e extraia as informações solicitadas.
+    2. Compare os requisitos extraídos com o currículo do candidato e sugira substituições de termos no
+       currículo para que ele se alinhe melhor à vaga, trocando jargões internos ou termos menos comuns por
+       palavras-chave da vaga ou mais reconhecidas no mercado. O campo "original" deve ser um trecho copiado
+       literalmente do currículo. Não sugira mais do que 4 itens.
+
+    Responda ESTRITAMENTE com um objeto JSON com esta estrutura e apenas estas chaves:
+    {{
+    "analise": {{
+        "titulo": "",
+        "localizacao": "",
+        "senioridade": "",
+        "requisitos_obrigatorios": [],
+        "requisitos_desejaveis": [],
+        "soft_skills": [],
+        "hard_skills": []
+    }},
+    "sugestoes": [
+        {{"original": "Termo do currículo", "substituto": "Termo sugerido"}}
+    ]
+    }}
+    Currículo do candidato:
+    -----------------
+    {bloco_cv}
+    -----------------
+    Descrição da vaga:
+    {texto_vaga}
+    """
+    logging.info(f"\nAnalisando a vaga {indice + 1}  {codigo} (análise e sugestões numa chamada)")
+    return _gerar_e_interpretar(prompt, modelo, validar_analise_com_sugestoes, "analise_sugestoes", indice, codigo,
+                                tentativas_parse, contexto_cache=contexto.nome_cache)
 
 # ==== PASSO 5: Função principal de processamento ====
 def processar_todas_as_vagas_excel(config_cam):
@@ -158,17 +212,84 @@ def processar_todas_as_vagas_excel(config_cam):
     coluna_descricao = config_cam.get('col_linkedin_job_description', "Description")
     coluna_codigo = config_cam.get('col_linkedin_job_code', "Code")
     coluna_visualizado = config_cam.get('col_linkedin_job_visualizado', "Visualizado")   
-
-    df = ler_vagas_do_excel(arquivo_entrada, coluna_visualizado)
+    preprocessar = config_cam.get('preprocessar_descricao', True)
+    max_tokens_descricao = config_cam.get('max_tokens_descricao', 1500)
+    usar_extracao_local = config_cam.get('extracao_local', True)
+    limiar_confianca_local = config_cam.get('limiar_confianca_local', 0.8)
+    arquivo_dicionario_skills = config_cam.get('arquivo_dicionario_skills')
+    # Modo combinado: análise e sugestões de CV numa só chamada (o cv_sugestor repassa as sugestões prontas)
+    com_sugestoes = config_cam.get('analise_com_sugestoes', False)
+    arquivo_sugestoes = config_cam.get('output_file_sugestoes')
+
+    arquivo_parquet = config_cam.get('input_file_jobs_parquet', caminho_parquet_padrao(arquivo_entrada))
+    colunas_usadas = [coluna_codigo, coluna_descricao, coluna_visualizado, "Code", "Company", "Link", "Title", "Job Info"]
+
+    df = ler_vagas(arquivo_entrada, arquivo_parquet, coluna_visualizado, colunas_usadas)
     resultados_analise = []
     erros_analise = []
+    sugestoes_vagas = []
+    tokens_economizados_total = 0
+    vagas_extracao_local = 0
+    chamadas_llm = 0
+
+    automato_skills = None
+    if usar_extracao_local and arquivo_dicionario_skills:
+        hard_skills, soft_skills = extrator_local.carregar_dicionario_extra(arquivo_dicionario_skills)
+        automato_skills = extrator_local.construir_automato(hard_skills, soft_skills)
 
     genai=carrega_chave()
 
+    contexto = None
+    if com_sugestoes:
+        # O CV é lido (em cache) e preparado uma vez para todas as vagas, como no cv_sugestor
+        from extracao_cv import texto_cv
+        from contexto_cv import preparar_contexto, MODELO_CACHE_PADRAO, MIN_TOKENS_CACHE_PADRAO, TTL_CACHE_PADRAO
+        contexto = preparar_contexto(
+            texto_cv(config_cam['input_file_cv']),
+            modo=config_cam.get('contexto_cv_sugestor', 'auto'),
+            modelo_cache=config_cam.get('modelo_cache_contexto', MODELO_CACHE_PADRAO),
+            min_tokens_cache=int(config_cam.get('min_tokens_cache_contexto', MIN_TOKENS_CACHE_PADRAO)),
+            ttl_cache=int(config_cam.get('ttl_cache_contexto', TTL_CACHE_PADRAO)),
+        )
+
     for idx, row in df.iterrows():
         texto_vaga = row.get(coluna_descricao, "")
         logging.info(f"Processando vaga {idx+1} de {len(df)}...")
-        resultado, erro = analisar_vaga(genai, texto_vaga,idx, row.get("Code"))
+        texto_valido = isinstance(texto_vaga, str) and texto_vaga.strip() != ""
+
+        resultado, erro, sugestoes = None, None, None
+        extracao = {"origem": "llm", "confianca": None}
+
+        # Caminho rápido: descrições com listas de requisitos bem estruturadas dispensam o LLM
+        if usar_extracao_local and texto_valido:
+            titulo = row.get("Title") if pd.notna(row.get("Title")) else ""
+            job_info = row.get("Job Info") if pd.notna(row.get("Job Info")) else ""
+            localizacao = str(job_info).split("·")[0].strip()
+            analise_local, confianca = extrator_local.extrair_analise_local(
+                texto_vaga, titulo, localizacao, automato_skills
+            )
+            extracao["confianca"] = confianca
+            if confianca >= limiar_confianca_local:
+                resultado = analise_local
+                extracao["origem"] = "local"
+                vagas_extracao_local += 1
+                logging.info(f"Vaga {row.get('Code')} extraída localmente (confiança {confianca}).")
+
+        if resultado is None:
+            # Remove boilerplate (sobre nós, benefícios, EEO...) e aplica o orçamento de tokens
+            if preprocessar and texto_valido:
+                texto_vaga, estatisticas = preprocessar_descricao(texto_vaga, max_tokens_descricao, row.get("Code"))
+                tokens_economizados_total += estatisticas["tokens_economizados"]
+
+            if contexto is not None:
+                combinado, erro = analisar_vaga_com_sugestoes(texto_vaga, idx, row.get("Code"), contexto)
+                if combinado is not None:
+                    resultado = combinado["analise"]
+                    sugestoes = filtrar_sugestoes_literais(combinado["sugestoes"], contexto.texto_cv, row.get("Code"))
+            else:
+                resultado, erro = analisar_vaga(genai, texto_vaga,idx, row.get("Code"))
+            if texto_valido:
+                chamadas_llm += 1
         vaga_dict = row.to_dict()
 
         code = vaga_dict.get("Code")
@@ -182,6 +303,7 @@ def processar_todas_as_vagas_excel(config_cam):
 
         ref = {
             "Code": codigo_final,
+            "Title": vaga_dict.get("Title") if pd.notna(vaga_dict.get("Title")) else "",
             "Company": vaga_dict.get("Company") if pd.notna(vaga_dict.get("Company")) else "",
             "Link": vaga_dict.get("Link") if pd.notna(vaga_dict.get("Link")) else "",
         }
@@ -191,18 +313,39 @@ def processar_todas_as_vagas_excel(config_cam):
                 "analise": resultado,
                 "referencia": {
                 "Code": ref["Code"],
+                "Title": ref["Title"],
                 "Company": ref["Company"],
                 "Link": ref["Link"],
-                }
+                },
+                "extracao": extracao
             })
+            if sugestoes is not None:
+                # Mesmo formato da saída do cv_sugestor (entrada do cv_aplicador)
+                resultados_analise[-1]["sugestoes"] = sugestoes
+                sugestoes_vagas.append({"codigo": ref["Code"], "referencia": resultados_analise[-1]["referencia"],
+                                        "sugestoes": sugestoes})
         else:
             log_erro(f"Erro na vaga {idx+1}: {erro}")
             erros_analise.append({
                 "Code": ref["Code"],
                 "erro": erro
             })
-            
-        time.sleep(1)  # Respeita limites de API
+
+        # O ritmo das chamadas ao Gemini é controlado pelo limitador compartilhado (limitador_taxa)
+
+    total_vagas = vagas_extracao_local + chamadas_llm
+    if usar_extracao_local and total_vagas:
+        logging.info(
+            f"Extração local atendeu {vagas_extracao_local} de {total_vagas} vagas "
+            f"({100 * vagas_extracao_local / total_vagas:.1f}%); {vagas_extracao_local} chamadas ao LLM evitadas."
+        )
+    if preprocessar:
+        logging.info(f"Pré-processamento economizou ~{tokens_economizados_total} tokens de entrada no total.")
+    if com_sugestoes:
+        logging.info(f"Modo combinado: {len(sugestoes_vagas)} vagas com análise e sugestões na mesma chamada; "
+                     f"{len(sugestoes_vagas)} chamadas do cv_sugestor evitadas.")
+        if arquivo_sugestoes:
+            salvar_json(sugestoes_vagas, arquivo_sugestoes)
 
     salvar_json(resultados_analise, arquivo_saida)
     if erros_analise:
@@ -223,4 +366,4 @@ if __name__ == "__main__":
 
 
     # Retorno apropriado para n8n
-    print(json.dumps(saida, ensure_ascii=False, indent=2))
+    emitir(saida, "analise_vaga_ia")
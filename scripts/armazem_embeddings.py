@@ -0,0 +1,183 @@
+#armazem_embeddings.py
+"""
+Armazém de embeddings em disco, quantizado e lido por np.memmap.
+
+Os vetores ficam numa única matriz contígua (float16, ou int8 com uma escala
+float32 por vetor) que só cresce por append; ids.txt guarda um id por linha e
+a linha é o offset do vetor na matriz. A leitura é zero-copy: a pontuação
+multiplica direto a matriz mapeada, sem carregar o histórico para a memória.
+
+Layout de <diretorio>:
+    meta.json     {"dimensao": 768, "formato": "int8"}
+    vetores.bin   n x dimensao (int8, float16 ou float32)
+    escalas.bin   n x float32 (só int8)
+    ids.txt       um id por linha; a contagem de linhas é o tamanho do armazém
+
+O append grava vetores e escalas antes de ids.txt: se o processo cair no meio,
+as linhas extras no fim dos .bin são ignoradas e sobrescritas depois.
+Escritas concorrentes devem ser serializadas por quem chama (ver indice_vagas).
+"""
+import os
+import json
+
+import numpy as np
+
+FORMATOS = ("int8", "float16", "float32")
+FORMATO_PADRAO = "int8"
+TAMANHO_BLOCO = 8192  # Linhas por bloco no produto com a matriz mapeada (limita a cópia em float32)
+
+
+def quantizar(vetores, formato):
+    """Retorna (dados no tipo do formato, escalas float32 ou None)."""
+    vetores = np.asarray(vetores, dtype=np.float32)
+    if formato == "int8":
+        escalas = np.abs(vetores).max(axis=1) / 127.0
+        escalas[escalas == 0] = 1.0
+        dados = np.rint(vetores / escalas[:, None]).astype(np.int8)
+        return dados, escalas.astype(np.float32)
+    return vetores.astype(formato), None
+
+
+class ArmazemEmbeddings:
+
+    def __init__(self, diretorio, formato=FORMATO_PADRAO):
+        self.diretorio = diretorio
+        self.formato = formato
+        self.dimensao = None
+        self.ids = []
+        self._posicao = {}
+
+        caminho_meta = os.path.join(diretorio, "meta.json")
+        if os.path.exists(caminho_meta):
+            with open(caminho_meta, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            self.formato = meta["formato"]
+            self.dimensao = meta["dimensao"]
+        if self.formato not in FORMATOS:
+            raise ValueError(f"Formato de armazém inválido: {self.formato!r} (use {', '.join(FORMATOS)}).")
+
+        caminho_ids = os.path.join(diretorio, "ids.txt")
+        if os.path.exists(caminho_ids):
+            with open(caminho_ids, "r", encoding="utf-8") as f:
+                self.ids = f.read().splitlines()
+            self._posicao = {id_vetor: i for i, id_vetor in enumerate(self.ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, id_vetor):
+        return id_vetor in self._posicao
+
+    def _caminho(self, nome):
+        return os.path.join(self.diretorio, nome)
+
+    def posicoes(self, ids):
+        """Offset de cada id (-1 quando ausente)."""
+        return np.array([self._posicao.get(str(i), -1) for i in ids], dtype=np.int64)
+
+    # ---------- escrita ----------
+
+    def adicionar(self, ids, vetores):
+        """Acrescenta os ids novos no fim e sobrescreve no lugar os já existentes. Retorna os offsets."""
+        ids = [str(i) for i in ids]
+        vetores = np.asarray(vetores, dtype=np.float32).reshape(len(ids), -1)
+        if not ids:
+            return np.empty(0, dtype=np.int64)
+        if any("\n" in i for i in ids):
+            raise ValueError("ids do armazém não podem conter quebra de linha.")
+
+        if self.dimensao is None:
+            os.makedirs(self.diretorio, exist_ok=True)
+            self.dimensao = int(vetores.shape[1])
+            with open(self._caminho("meta.json"), "w", encoding="utf-8") as f:
+                json.dump({"dimensao": self.dimensao, "formato": self.formato}, f)
+        elif vetores.shape[1] != self.dimensao:
+            raise ValueError(f"Dimensão {vetores.shape[1]} diferente da do armazém ({self.dimensao}).")
+
+        # Dentro do lote, vale o último vetor de cada id
+        ultimo = {id_vetor: i for i, id_vetor in enumerate(ids)}
+        existentes = [(self._posicao[i], j) for i, j in ultimo.items() if i in self._posicao]
+        novos = [(i, j) for i, j in ultimo.items() if i not in self._posicao]
+
+        if existentes:
+            destino, origem = map(np.array, zip(*existentes))
+            dados, escalas = quantizar(vetores[origem], self.formato)
+            matriz = self._mapear("vetores.bin", self.formato, (len(self), self.dimensao), "r+")
+            matriz[destino] = dados
+            matriz.flush()
+            if escalas is not None:
+                mapa_escalas = self._mapear("escalas.bin", "float32", (len(self),), "r+")
+                mapa_escalas[destino] = escalas
+                mapa_escalas.flush()
+
+        if novos:
+            dados, escalas = quantizar(vetores[[j for _, j in novos]], self.formato)
+            self._anexar("vetores.bin", dados, len(self) * self.dimensao * dados.itemsize)
+            if escalas is not None:
+                self._anexar("escalas.bin", escalas, len(self) * 4)
+            with open(self._caminho("ids.txt"), "a", encoding="utf-8") as f:
+                f.write("".join(f"{i}\n" for i, _ in novos))
+            for i, _ in novos:
+                self._posicao[i] = len(self.ids)
+                self.ids.append(i)
+
+        return self.posicoes(ids)
+
+    def _anexar(self, nome, dados, offset_bytes):
+        modo = "r+b" if os.path.exists(self._caminho(nome)) else "wb"
+        with open(self._caminho(nome), modo) as f:
+            # Descarta sobras de um append interrompido antes de gravar
+            f.truncate(offset_bytes)
+            f.seek(offset_bytes)
+            f.write(np.ascontiguousarray(dados).tobytes())
+
+    # ---------- leitura ----------
+
+    def _mapear(self, nome, dtype, forma, modo="r"):
+        return np.memmap(self._caminho(nome), dtype=dtype, mode=modo, shape=forma)
+
+    def matriz(self):
+        """Matriz quantizada mapeada (somente leitura, zero-copy)."""
+        if not len(self):
+            return np.empty((0, self.dimensao or 0), dtype=self.formato)
+        return self._mapear("vetores.bin", self.formato, (len(self), self.dimensao))
+
+    def escalas(self):
+        if self.formato != "int8" or not len(self):
+            return None
+        return self._mapear("escalas.bin", "float32", (len(self),))
+
+    def vetores(self, posicoes=None):
+        """Vetores float32 (desquantizados) das posições pedidas, ou de todos."""
+        matriz = self.matriz()
+        escalas = self.escalas()
+        if posicoes is not None:
+            matriz = matriz[posicoes]
+            escalas = escalas[posicoes] if escalas is not None else None
+        vetores = np.asarray(matriz, dtype=np.float32)
+        if escalas is not None:
+            vetores *= np.asarray(escalas)[:, None]
+        return vetores
+
+    def produto(self, consulta, posicoes=None):
+        """matriz @ consulta, em blocos, sem desquantizar a matriz inteira."""
+        consulta = np.asarray(consulta, dtype=np.float32)
+        matriz = self.matriz()
+        escalas = self.escalas()
+        if posicoes is not None:
+            matriz = matriz[posicoes]
+            escalas = escalas[posicoes] if escalas is not None else None
+
+        resultado = np.empty(len(matriz), dtype=np.float32)
+        for i in range(0, len(matriz), TAMANHO_BLOCO):
+            resultado[i:i + TAMANHO_BLOCO] = matriz[i:i + TAMANHO_BLOCO].astype(np.float32) @ consulta
+        if escalas is not None:
+            resultado *= escalas
+        return resultado
+
+    def bytes_em_disco(self):
+        return sum(
+            os.path.getsize(self._caminho(nome))
+            for nome in ("vetores.bin", "escalas.bin", "ids.txt")
+            if os.path.exists(self._caminho(nome))
+        )
@@ -0,0 +1,79 @@
+#armazem_vagas.py
+"""
+Armazenamento colunar (Parquet) das vagas coletadas.
+
+É o formato de troca entre search_linkedin.py e analise_vaga_ia.py: a leitura
+projeta apenas as colunas necessárias e empurra o filtro de `Visualizado`
+para o leitor do Parquet, sem carregar o histórico inteiro em memória.
+O .xlsx continua sendo gerado para consulta humana.
+"""
+import os
+import sys
+import logging
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# ================= LOGGING SETUP =================
+loglevel = os.environ.get("MY_LOG_LEVEL", "INFO").upper()
+logger = logging.getLogger(__name__)
+logger.setLevel(loglevel)
+
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.propagate = False
+
+# Row groups menores permitem que o filtro descarte blocos inteiros pelas estatísticas
+LINHAS_POR_ROW_GROUP = 10_000
+
+
+def caminho_parquet_padrao(caminho_excel):
+    """dados/entrada/job_details.xlsx -> dados/entrada/job_details.parquet"""
+    return os.path.splitext(caminho_excel)[0] + ".parquet"
+
+
+def salvar_vagas(df, caminho_parquet, caminho_excel=None):
+    """Grava as vagas em Parquet (formato principal) e, opcionalmente, exporta .xlsx."""
+    diretorio = os.path.dirname(caminho_parquet)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+
+    # Colunas de texto como string: evita que um lote só com vazios vire tipo "null"
+    tabela = pa.Table.from_pandas(df.astype({c: "string" for c in df.columns if df[c].dtype == object}),
+                                  preserve_index=False)
+    pq.write_table(tabela, caminho_parquet, row_group_size=LINHAS_POR_ROW_GROUP, compression="zstd")
+    logger.info(f"Vagas salvas em Parquet: {caminho_parquet} ({tabela.num_rows} linhas)")
+
+    if caminho_excel:
+        diretorio_excel = os.path.dirname(caminho_excel)
+        if diretorio_excel:
+            os.makedirs(diretorio_excel, exist_ok=True)
+        df.to_excel(caminho_excel, index=False)
+        logger.info(f"Cópia em Excel exportada para: {caminho_excel}")
+
+
+def ler_vagas_pendentes(caminho_parquet, colunas, coluna_visualizado="Visualizado"):
+    """
+    Lê do Parquet apenas `colunas` das vagas ainda não visualizadas
+    (Visualizado nulo ou ""), com o filtro aplicado durante a leitura.
+    """
+    esquema = pq.read_schema(caminho_parquet)
+    disponiveis = [c for c in dict.fromkeys(colunas) if c in esquema.names]
+
+    filtro = None
+    if coluna_visualizado in esquema.names:
+        campo = pc.field(coluna_visualizado)
+        if pa.types.is_null(esquema.field(coluna_visualizado).type):
+            filtro = None  # Coluna inteira vazia: nenhuma vaga foi visualizada
+        elif pa.types.is_string(esquema.field(coluna_visualizado).type) or \
+                pa.types.is_large_string(esquema.field(coluna_visualizado).type):
+            filtro = campo.is_null() | (campo == "")
+        else:
+            filtro = campo.is_null()
+
+    tabela = pq.read_table(caminho_parquet, columns=disponiveis, filters=filtro)
+    return tabela.to_pandas()
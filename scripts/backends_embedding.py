@@ -0,0 +1,97 @@
+#backends_embedding.py
+"""
+Backends de embedding intercambiáveis para a aderência CV x vagas.
+
+- "vertex" (padrão): modelos de embedding do Vertex AI via cliente_embedding.
+- "local": n-gramas de caracteres com hashing, calculados na CPU, sem rede
+  nem credenciais. Serve para CI sem acesso ao Google e para medir o
+  pipeline de pontuação offline; a qualidade semântica é inferior à do Vertex.
+
+O backend é escolhido no config (`backend_embedding`). O `nome` de cada
+backend identifica os vetores nos caches (cache_embedding, embedding_cv) e no
+índice do histórico, para que vetores de backends diferentes não se misturem.
+"""
+import math
+import zlib
+from collections import Counter
+
+import numpy as np
+
+from cache_embedding import normalizar_texto
+
+BACKEND_PADRAO = "vertex"
+MODELO_VERTEX_PADRAO = "text-multilingual-embedding-002"
+DIMENSAO_LOCAL_PADRAO = 1024
+
+
+class BackendEmbedding:
+    """Interface: `gerar(textos, etapa)` devolve um vetor por texto, na mesma ordem."""
+
+    nome = ""
+    usar_cache = True                  # Se vale guardar os vetores no cache_embedding
+    requer_credenciais_google = False
+
+    def gerar(self, textos, etapa="embeddings"):
+        raise NotImplementedError
+
+    def aquecer(self):
+        """Prepara o backend antes da primeira vaga (opcional)."""
+
+
+class BackendVertex(BackendEmbedding):
+    requer_credenciais_google = True
+
+    def __init__(self, modelo=MODELO_VERTEX_PADRAO):
+        self.nome = modelo
+
+    def gerar(self, textos, etapa="embeddings"):
+        # Importado aqui: o backend local não depende do SDK do Vertex
+        import cliente_embedding
+        return cliente_embedding.gerar_embeddings_em_lotes(textos, self.nome, etapa=etapa)
+
+    def aquecer(self):
+        import cliente_embedding
+        cliente_embedding.aquecer(self.nome)
+
+
+class BackendNgramasLocal(BackendEmbedding):
+    """
+    Vetor por hashing de n-gramas de caracteres (3 a 5 por padrão) do texto
+    normalizado, com peso 1 + log(tf) e sinal pelo hash para reduzir o viés
+    das colisões. Não há IDF global: o vetor de um texto não pode depender dos
+    outros textos do lote, senão não poderia ir para cache.
+    """
+    usar_cache = False
+
+    def __init__(self, dimensao=DIMENSAO_LOCAL_PADRAO, ngrama_min=3, ngrama_max=5):
+        self.dimensao = dimensao
+        self.ngrama_min = ngrama_min
+        self.ngrama_max = ngrama_max
+        self.nome = f"local-ngramas-{ngrama_min}-{ngrama_max}-{dimensao}"
+
+    def _ngramas(self, texto):
+        texto = f" {normalizar_texto(texto)} "
+        for n in range(self.ngrama_min, self.ngrama_max + 1):
+            for i in range(len(texto) - n + 1):
+                yield texto[i:i + n]
+
+    def vetor(self, texto):
+        vetor = np.zeros(self.dimensao, dtype=np.float32)
+        for ngrama, tf in Counter(self._ngramas(texto)).items():
+            h = zlib.crc32(ngrama.encode("utf-8"))
+            sinal = 1.0 if h & 0x80000000 else -1.0
+            vetor[h % self.dimensao] += sinal * (1.0 + math.log(tf))
+        return vetor
+
+    def gerar(self, textos, etapa="embeddings"):
+        return [self.vetor(texto) for texto in textos]
+
+
+def criar_backend(config):
+    """Instancia o backend indicado em `backend_embedding` no config."""
+    tipo = config.get('backend_embedding', BACKEND_PADRAO)
+    if tipo == "vertex":
+        return BackendVertex(config.get('modelo_embedding', MODELO_VERTEX_PADRAO))
+    if tipo == "local":
+        return BackendNgramasLocal(config.get('dimensao_embedding_local', DIMENSAO_LOCAL_PADRAO))
+    raise ValueError(f"backend_embedding desconhecido: {tipo!r} (use 'vertex' ou 'local').")
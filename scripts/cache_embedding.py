@@ -0,0 +1,180 @@
+#cache_embedding.py
+"""
+Cache persistente de embeddings endereçado por conteúdo.
+
+A chave é (modelo, sha256 do texto normalizado); o vetor é guardado em
+float32 num SQLite local. Requisitos como "Python", "SQL" ou "Inglês avançado"
+se repetem em centenas de vagas e o CV muda raramente: depois das primeiras
+execuções quase todas as consultas viram acerto de cache.
+
+Uso avulso para ver o tamanho do cache:
+    python scripts/cache_embedding.py
+"""
+import os
+import sys
+import json
+import hashlib
+import logging
+import sqlite3
+import threading
+import unicodedata
+
+import numpy as np
+
+# ================= LOGGING SETUP =================
+loglevel = os.environ.get("MY_LOG_LEVEL", "INFO").upper()
+logger = logging.getLogger(__name__)
+logger.setLevel(loglevel)
+
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.propagate = False
+
+# ================= CONFIGURAÇÃO =================
+CAMINHO_DB = os.environ.get("EMBEDDING_CACHE_DB", "logs/cache_embedding.sqlite")
+DESATIVADO = os.environ.get("EMBEDDING_CACHE_DESATIVADO", "").lower() in ("1", "true", "sim")
+# Limite de parâmetros por consulta do SQLite (SQLITE_MAX_VARIABLE_NUMBER antigo = 999)
+TAMANHO_LOTE_CONSULTA = 900
+
+_lock = threading.Lock()
+_estatisticas = {"consultas": 0, "acertos": 0}
+
+
+def normalizar_texto(texto):
+    """Normaliza Unicode, espaços e caixa para que variações triviais caiam na mesma chave."""
+    texto = unicodedata.normalize("NFC", texto or "")
+    return " ".join(texto.split()).casefold()
+
+
+def chave_texto(texto):
+    return hashlib.sha256(normalizar_texto(texto).encode("utf-8")).hexdigest()
+
+
+def _conectar():
+    diretorio = os.path.dirname(CAMINHO_DB)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    conexao = sqlite3.connect(CAMINHO_DB, timeout=30)
+    conexao.execute(
+        "CREATE TABLE IF NOT EXISTS embeddings ("
+        " modelo TEXT NOT NULL, hash TEXT NOT NULL, dimensao INTEGER NOT NULL, vetor BLOB NOT NULL,"
+        " PRIMARY KEY (modelo, hash))"
+    )
+    return conexao
+
+
+# ================= API PÚBLICA =================
+
+def buscar(textos, modelo):
+    """
+    Consulta em lote. Retorna uma lista alinhada a `textos` com o vetor float32
+    de cada acerto e None para cada falta.
+    """
+    resultado = [None] * len(textos)
+    if DESATIVADO or not textos:
+        return resultado
+
+    chaves = [chave_texto(t) for t in textos]
+    encontrados = {}
+    unicas = list(dict.fromkeys(chaves))
+    conexao = _conectar()
+    try:
+        for i in range(0, len(unicas), TAMANHO_LOTE_CONSULTA):
+            lote = unicas[i:i + TAMANHO_LOTE_CONSULTA]
+            marcadores = ",".join("?" * len(lote))
+            linhas = conexao.execute(
+                f"SELECT hash, vetor FROM embeddings WHERE modelo = ? AND hash IN ({marcadores})",
+                [modelo, *lote],
+            )
+            for hash_texto, blob in linhas:
+                encontrados[hash_texto] = np.frombuffer(blob, dtype=np.float32)
+    finally:
+        conexao.close()
+
+    for i, chave in enumerate(chaves):
+        resultado[i] = encontrados.get(chave)
+
+    acertos = sum(1 for v in resultado if v is not None)
+    with _lock:
+        _estatisticas["consultas"] += len(textos)
+        _estatisticas["acertos"] += acertos
+    return resultado
+
+
+def gravar(textos, vetores, modelo):
+    """Grava os vetores (convertidos para float32) de `textos` no cache."""
+    if DESATIVADO or not textos:
+        return
+    linhas = []
+    for texto, vetor in zip(textos, vetores):
+        vetor = np.asarray(vetor, dtype=np.float32)
+        linhas.append((modelo, chave_texto(texto), int(vetor.shape[0]), vetor.tobytes()))
+    conexao = _conectar()
+    try:
+        with conexao:
+            conexao.executemany(
+                "INSERT OR REPLACE INTO embeddings (modelo, hash, dimensao, vetor) VALUES (?, ?, ?, ?)",
+                linhas,
+            )
+    finally:
+        conexao.close()
+
+
+def obter_ou_calcular(textos, modelo, calcular):
+    """
+    Devolve os vetores float32 de `textos`, chamando `calcular(lista_de_textos)`
+    apenas para as faltas (cada texto distinto uma única vez) e gravando o resultado.
+    """
+    vetores = buscar(textos, modelo)
+    faltas = {}
+    for i, vetor in enumerate(vetores):
+        if vetor is None:
+            faltas.setdefault(chave_texto(textos[i]), []).append(i)
+
+    if faltas:
+        textos_faltantes = [textos[indices[0]] for indices in faltas.values()]
+        novos = [np.asarray(v, dtype=np.float32) for v in calcular(textos_faltantes)]
+        gravar(textos_faltantes, novos, modelo)
+        for indices, vetor in zip(faltas.values(), novos):
+            for i in indices:
+                vetores[i] = vetor
+    return vetores
+
+
+def estatisticas():
+    """Consultas, acertos e taxa de acerto acumulados no processo."""
+    with _lock:
+        consultas = _estatisticas["consultas"]
+        acertos = _estatisticas["acertos"]
+    return {
+        "consultas": consultas,
+        "acertos": acertos,
+        "taxa_acerto": round(acertos / consultas, 4) if consultas else 0.0,
+    }
+
+
+def registrar_estatisticas():
+    dados = estatisticas()
+    if dados["consultas"]:
+        logger.info(
+            f"Cache de embeddings: {dados['acertos']}/{dados['consultas']} acertos "
+            f"({dados['taxa_acerto']:.1%})."
+        )
+    return dados
+
+
+if __name__ == "__main__":
+    conexao = _conectar()
+    try:
+        resumo = {
+            modelo: {"vetores": total, "bytes": tamanho}
+            for modelo, total, tamanho in conexao.execute(
+                "SELECT modelo, COUNT(*), SUM(LENGTH(vetor)) FROM embeddings GROUP BY modelo"
+            )
+        }
+    finally:
+        conexao.close()
+    print(json.dumps(resumo, ensure_ascii=False, indent=2))
@@ -0,0 +1,174 @@
+#cliente_embedding.py
+"""
+Cliente de embeddings do Vertex AI compartilhado.
+
+vertexai.init e TextEmbeddingModel.from_pretrained rodam uma única vez por
+(projeto, região, modelo) em cada processo; as chamadas seguintes reutilizam
+o mesmo handle. O tempo de inicialização é registrado nas métricas
+(etapa "embedding_init") separado do tempo de inferência.
+
+gerar_embeddings_em_lotes empacota muitos textos em requisições que respeitam
+os limites de instâncias e de tokens por requisição do modelo e as dispara
+em paralelo, devolvendo os vetores na ordem de entrada.
+"""
+import os
+import sys
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from tenacity import Retrying
+
+import cliente_gemini
+import limitador_taxa
+import metricas_llm
+from preprocessamento_vaga import estimar_tokens
+
+# ================= LOGGING SETUP =================
+loglevel = os.environ.get("MY_LOG_LEVEL", "INFO").upper()
+logger = logging.getLogger(__name__)
+logger.setLevel(loglevel)
+
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.propagate = False
+
+MODELO_PADRAO = "text-multilingual-embedding-002"
+BALDE_LIMITADOR = "vertex_embeddings"
+
+# Limites por requisição do get_embeddings (text-multilingual-embedding-002)
+MAX_INSTANCIAS = int(os.environ.get("EMBEDDING_MAX_INSTANCIAS", "250"))
+MAX_TOKENS_REQUISICAO = int(os.environ.get("EMBEDDING_MAX_TOKENS_REQUISICAO", "20000"))
+MAX_TOKENS_TEXTO = 2048  # A API trunca cada texto neste limite
+WORKERS_PADRAO = int(os.environ.get("EMBEDDING_WORKERS", "4"))
+TENTATIVAS_PADRAO = int(os.environ.get("EMBEDDING_MAX_TENTATIVAS", "5"))
+
+_lock = threading.Lock()
+_projetos_iniciados = set()
+_modelos = {}
+
+
+def _projeto_e_regiao():
+    return (
+        os.environ.get('VERTEX_PROJECT', 'n8n-automatizando-ia-424719'),
+        os.environ.get('VERTEX_REGION', 'us-central1'),
+    )
+
+
+def obter_modelo(modelo_nome=MODELO_PADRAO):
+    """Devolve o TextEmbeddingModel de (projeto, região, modelo), inicializando só na primeira vez."""
+    projeto, regiao = _projeto_e_regiao()
+    chave = (projeto, regiao, modelo_nome)
+    with _lock:
+        modelo = _modelos.get(chave)
+        if modelo is not None:
+            return modelo
+
+        inicio = time.perf_counter()
+        # SDK importado só aqui: a importação entra no tempo de inicialização medido
+        import vertexai
+        from vertexai.language_models import TextEmbeddingModel
+        if (projeto, regiao) not in _projetos_iniciados:
+            vertexai.init(project=projeto, location=regiao)
+            _projetos_iniciados.add((projeto, regiao))
+        modelo = TextEmbeddingModel.from_pretrained(modelo_nome)
+        duracao = time.perf_counter() - inicio
+
+        _modelos[chave] = modelo
+    logger.info(f"Modelo de embedding '{modelo_nome}' inicializado em {duracao:.2f}s ({projeto}/{regiao}).")
+    metricas_llm.registrar_chamada("embedding_init", modelo_nome, duracao)
+    return modelo
+
+
+def aquecer(modelo_nome=MODELO_PADRAO):
+    """
+    Inicializa o modelo e faz uma chamada mínima para abrir a conexão com a API,
+    de modo que a primeira vaga não pague esse custo.
+    """
+    inicio = time.perf_counter()
+    gerar_embeddings(["aquecimento"], modelo_nome, etapa="embedding_aquecimento")
+    logger.info(f"Aquecimento do embedding concluído em {time.perf_counter() - inicio:.2f}s.")
+
+
+def gerar_embeddings(textos, modelo_nome=MODELO_PADRAO, etapa="embeddings", tentativas=TENTATIVAS_PADRAO):
+    """
+    Gera os vetores (listas de float) de `textos` numa única requisição. Erros
+    transitórios (429, 5xx, timeout) são repetidos com a política de retry do
+    cliente_gemini, então um lote com problema não derruba a execução inteira.
+    """
+    if not textos:
+        return []
+    modelo = obter_modelo(modelo_nome)
+    textos = list(textos)
+
+    inicio = time.perf_counter()
+    feitas = 0
+    espera = 0.0
+    try:
+        for tentativa in Retrying(**cliente_gemini.politica_retry(tentativas, servico="Vertex embeddings")):
+            with tentativa:
+                feitas += 1
+                espera += limitador_taxa.adquirir(BALDE_LIMITADOR)
+                try:
+                    resposta = modelo.get_embeddings(textos)
+                except Exception as e:
+                    if isinstance(e, cliente_gemini.erros_limite()):
+                        limitador_taxa.registrar_limite(BALDE_LIMITADOR, limitador_taxa.extrair_retry_after(e))
+                    raise
+                limitador_taxa.registrar_sucesso(BALDE_LIMITADOR)
+    except Exception as e:
+        metricas_llm.registrar_chamada(etapa, modelo_nome, time.perf_counter() - inicio - espera,
+                                       tentativas=feitas, erro=e, espera_limitador=espera)
+        raise
+
+    metricas_llm.registrar_chamada(
+        etapa, modelo_nome, time.perf_counter() - inicio - espera,
+        tokens_entrada=sum(getattr(getattr(emb, "statistics", None), "token_count", 0) or 0
+                           for emb in resposta),
+        tentativas=feitas,
+        espera_limitador=espera,
+    )
+    return [emb.values for emb in resposta]
+
+
+def planejar_lotes(textos, max_instancias=MAX_INSTANCIAS, max_tokens=MAX_TOKENS_REQUISICAO):
+    """
+    Agrupa os índices de `textos` em lotes consecutivos o maiores possível,
+    sem passar de `max_instancias` textos nem de `max_tokens` (estimados) por lote.
+    """
+    lotes = []
+    atual, tokens_atual = [], 0
+    for i, texto in enumerate(textos):
+        tokens = min(estimar_tokens(texto), MAX_TOKENS_TEXTO)
+        if atual and (len(atual) >= max_instancias or tokens_atual + tokens > max_tokens):
+            lotes.append(atual)
+            atual, tokens_atual = [], 0
+        atual.append(i)
+        tokens_atual += tokens
+    if atual:
+        lotes.append(atual)
+    return lotes
+
+
+def gerar_embeddings_em_lotes(textos, modelo_nome=MODELO_PADRAO, etapa="embeddings", workers=WORKERS_PADRAO):
+    """Gera os vetores de `textos` com o mínimo de requisições, em paralelo, preservando a ordem."""
+    textos = list(textos)
+    if not textos:
+        return []
+    lotes = planejar_lotes(textos)
+    obter_modelo(modelo_nome)  # Inicializa antes de abrir as threads
+
+    def _executar(indices):
+        return gerar_embeddings([textos[i] for i in indices], modelo_nome, etapa=etapa)
+
+    vetores = [None] * len(textos)
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(lotes)))) as executor:
+        for indices, resultado in zip(lotes, executor.map(_executar, lotes)):
+            for i, vetor in zip(indices, resultado):
+                vetores[i] = vetor
+    logger.info(f"{len(textos)} textos enviados em {len(lotes)} requisições de embedding.")
+    return vetores
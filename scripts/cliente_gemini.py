@@ -0,0 +1,361 @@
+#cliente_gemini.py
+"""
+Cliente Gemini compartilhado pelos scripts que chamam o LLM.
+
+Configura a chave uma única vez por processo, guarda os handles de
+GenerativeModel já criados (o canal gRPC do SDK fica aberto entre as chamadas,
+sem novo handshake a cada vaga) e concentra a política de timeout e de
+retry usada por analise_vaga_ia.py, cv_sugestor.py e cv_otimizado.py.
+Toda chamada passa antes pelo limitador de taxa compartilhado entre processos.
+
+O SDK (google.generativeai, ~0,7 s de importação) só é importado na primeira
+chamada real à API: com GEMINI_BACKEND=fake, ou quando o analise_vaga_ia.py
+resolve todas as vagas pela extração local, ele nunca é carregado.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import threading
+import functools
+from types import SimpleNamespace
+
+from tenacity import (
+    Retrying,
+    AsyncRetrying,
+    stop_after_attempt,
+    wait_exponential,
+    retry_if_exception_type,
+)
+
+import limitador_taxa
+import metricas_llm
+
+# ================= LOGGING SETUP =================
+loglevel = os.environ.get("MY_LOG_LEVEL", "INFO").upper()
+logger = logging.getLogger(__name__)
+logger.setLevel(loglevel)
+
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.propagate = False
+
+# ================= POLÍTICA PADRÃO =================
+MODELO_PADRAO = "gemini-1.5-flash"
+TIMEOUT_PADRAO = float(os.environ.get("GEMINI_TIMEOUT_SECONDS", "60"))
+TENTATIVAS_PADRAO = int(os.environ.get("GEMINI_MAX_TENTATIVAS", "5"))
+# "api" (padrão) ou "fake": backend local determinístico, sem rede, para testes
+BACKEND = os.environ.get("GEMINI_BACKEND", "api").lower()
+LATENCIA_FAKE = float(os.environ.get("GEMINI_FAKE_LATENCIA_SECONDS", "0.05"))
+
+BALDE_LIMITADOR = "gemini"
+ESPERA_MAXIMA_RETRY_AFTER = 60.0  # Segundos: teto para um Retry-After fora do comum
+
+_lock = threading.Lock()
+_configurado = False
+_modelos = {}
+
+
+# ================= IMPORTAÇÃO SOB DEMANDA =================
+
+def _sdk():
+    """Importa o google.generativeai na primeira vez que for realmente necessário."""
+    import google.generativeai as genai
+    return genai
+
+
+@functools.lru_cache(maxsize=None)
+def erros_transitorios():
+    """
+    Erros transitórios da API que justificam uma nova tentativa.
+    Erros de parsing da resposta NÃO entram aqui: cada script decide o que fazer.
+    """
+    from google.api_core import exceptions as google_exceptions
+    return (
+        google_exceptions.ResourceExhausted,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.DeadlineExceeded,
+        google_exceptions.InternalServerError,
+        google_exceptions.TooManyRequests,
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def erros_limite():
+    from google.api_core import exceptions as google_exceptions
+    return (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests)
+
+
+def __getattr__(nome):
+    # Mantém cliente_gemini.ERROS_TRANSITORIOS / ERROS_LIMITE sem importar o SDK no carregamento
+    if nome == "ERROS_TRANSITORIOS":
+        return erros_transitorios()
+    if nome == "ERROS_LIMITE":
+        return erros_limite()
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+
+# ================= BACKEND FAKE =================
+
+class ModeloFake:
+    """
+    Substituto local do GenerativeModel (GEMINI_BACKEND=fake). Responde JSON
+    válido no formato esperado por cada script e preenche usage_metadata,
+    para exercitar retry, limitador e métricas sem rede nem chave de API.
+    """
+
+    def __init__(self, nome):
+        self.model_name = nome
+
+    def _responder(self, prompt):
+        if "resumo_cv" in prompt.lower():
+            texto = json.dumps({"resumo_cv": prompt[-len(prompt) // 4:]}, ensure_ascii=False)
+        elif '"analise"' in prompt and '"sugestoes"' in prompt:
+            texto = json.dumps({
+                "analise": {
+                    "titulo": "", "localizacao": "", "senioridade": "",
+                    "requisitos_obrigatorios": ["Gestão de projetos"], "requisitos_desejaveis": [],
+                    "soft_skills": [], "hard_skills": [],
+                },
+                "sugestoes": [{"original": "Gestão", "substituto": "Gestão de projetos"}],
+            }, ensure_ascii=False)
+        elif "substitui" in prompt.lower():
+            texto = json.dumps([{"original": "Gestão", "substituto": "Gestão de projetos"}], ensure_ascii=False)
+        else:
+            texto = json.dumps({
+                "titulo": "", "localizacao": "", "senioridade": "",
+                "requisitos_obrigatorios": [], "requisitos_desejaveis": [],
+                "soft_skills": [], "hard_skills": [],
+            })
+        uso = SimpleNamespace(
+            prompt_token_count=len(prompt) // 4,
+            candidates_token_count=len(texto) // 4,
+            cached_content_token_count=0,
+        )
+        return SimpleNamespace(text=texto, usage_metadata=uso)
+
+    def generate_content(self, prompt, generation_config=None, request_options=None):
+        time.sleep(LATENCIA_FAKE)
+        return self._responder(prompt)
+
+    async def generate_content_async(self, prompt, generation_config=None, request_options=None):
+        await asyncio.sleep(LATENCIA_FAKE)
+        return self._responder(prompt)
+
+
+# ================= CONFIGURAÇÃO E HANDLES =================
+
+def configurar(api_key=None):
+    """
+    Configura o SDK do Gemini uma única vez por processo e devolve o módulo genai
+    (None com o backend fake, que não importa o SDK).
+    """
+    global _configurado
+    with _lock:
+        if _configurado:
+            return None if BACKEND == "fake" else _sdk()
+
+        if BACKEND == "fake":
+            _configurado = True
+            logger.info("Usando backend fake do Gemini (GEMINI_BACKEND=fake).")
+            return None
+
+        gemini_api_key = api_key or os.getenv('GEMINI_API_KEY')
+        if not gemini_api_key:
+            logger.error("Chave de API do Google não encontrada (GEMINI_API_KEY).")
+            sys.exit(1)
+
+        genai = _sdk()
+        genai.configure(api_key=gemini_api_key)
+        _configurado = True
+        logger.info("SDK do Gemini configurado.")
+    return genai
+
+
+def obter_modelo(nome=MODELO_PADRAO):
+    """Devolve o handle de GenerativeModel para `nome`, criando-o apenas na primeira vez."""
+    configurar()
+    with _lock:
+        modelo = _modelos.get(nome)
+        if modelo is None:
+            modelo = ModeloFake(nome) if BACKEND == "fake" else _sdk().GenerativeModel(nome)
+            _modelos[nome] = modelo
+            logger.info(f"Handle do modelo '{nome}' criado e guardado para reuso.")
+    return modelo
+
+
+def criar_cache_contexto(conteudo, modelo, instrucao_sistema=None, ttl_segundos=3600, nome_exibicao=None):
+    """
+    Registra `conteudo` como contexto em cache no servidor (CachedContent) e
+    devolve o nome do cache. Levanta NotImplementedError quando o backend ou a
+    versão do SDK não oferecem cache; erros da API (ex.: conteúdo abaixo do
+    mínimo de tokens do modelo) são propagados para quem chama decidir o fallback.
+    """
+    if BACKEND == "fake":
+        raise NotImplementedError("Cache de contexto indisponível no backend fake.")
+    configurar()
+    caching = getattr(_sdk(), "caching", None)
+    if caching is None:
+        raise NotImplementedError("Esta versão do google-generativeai não tem genai.caching.")
+
+    from datetime import timedelta
+    cache = caching.CachedContent.create(
+        model=modelo,
+        display_name=nome_exibicao,
+        system_instruction=instrucao_sistema,
+        contents=[conteudo],
+        ttl=timedelta(seconds=ttl_segundos),
+    )
+    logger.info(f"Contexto registrado no cache do servidor: {cache.name} (ttl {ttl_segundos}s)")
+    return cache.name
+
+
+def obter_modelo_com_cache(nome_cache):
+    """Handle de GenerativeModel ligado a um contexto em cache (criado uma vez por processo)."""
+    configurar()
+    chave = f"cache:{nome_cache}"
+    with _lock:
+        modelo = _modelos.get(chave)
+        if modelo is None:
+            modelo = _sdk().GenerativeModel.from_cached_content(cached_content=nome_cache)
+            _modelos[chave] = modelo
+    return modelo
+
+
+def config_json(temperatura=0.7):
+    """GenerationConfig padrão dos scripts: resposta em JSON."""
+    if BACKEND == "fake":
+        return {"temperature": temperatura, "response_mime_type": "application/json"}
+    return _sdk().types.GenerationConfig(temperature=temperatura, response_mime_type="application/json")
+
+
+def _espera_com_retry_after(base):
+    """Backoff exponencial, mas nunca menor que o Retry-After informado pela API (limitado a ESPERA_MAXIMA_RETRY_AFTER)."""
+    def esperar(retry_state):
+        espera = base(retry_state)
+        excecao = retry_state.outcome.exception() if retry_state.outcome else None
+        atraso = limitador_taxa.extrair_retry_after(excecao) if excecao is not None else None
+        if atraso:
+            espera = max(espera, min(atraso, ESPERA_MAXIMA_RETRY_AFTER))
+        return espera
+    return esperar
+
+
+def politica_retry(tentativas, servico="Gemini"):
+    """
+    Política de retry compartilhada (Gemini e embeddings do Vertex): só erros
+    transitórios, backoff exponencial que respeita o Retry-After.
+    """
+    def log_antes_de_nova_tentativa(retry_state):
+        delay = retry_state.next_action.sleep
+        logger.info(
+            f"API do {servico} retornou erro transitório ({retry_state.outcome.exception()}). "
+            f"Tentando novamente em {delay:.1f} segundos..."
+        )
+
+    return dict(
+        wait=_espera_com_retry_after(wait_exponential(multiplier=1, min=4, max=10)),
+        stop=stop_after_attempt(tentativas),
+        retry=retry_if_exception_type(erros_transitorios()),
+        reraise=True,
+        before_sleep=log_antes_de_nova_tentativa,
+    )
+
+
+def _registrar_resultado(excecao=None):
+    """Informa ao limitador compartilhado o desfecho da chamada (ajuste adaptativo da taxa)."""
+    if excecao is None:
+        limitador_taxa.registrar_sucesso(BALDE_LIMITADOR)
+    elif isinstance(excecao, erros_limite()):
+        limitador_taxa.registrar_limite(BALDE_LIMITADOR, limitador_taxa.extrair_retry_after(excecao))
+
+
+def _registrar_metricas(etapa, modelo, inicio, espera, tentativas, codigo_vaga, resposta=None, erro=None):
+    # A espera no limitador é registrada à parte para não inflar a latência da API
+    tokens_entrada, tokens_saida, cache = metricas_llm.tokens_da_resposta(resposta)
+    metricas_llm.registrar_chamada(
+        etapa, modelo, time.perf_counter() - inicio - espera,
+        tokens_entrada=tokens_entrada, tokens_saida=tokens_saida,
+        tentativas=tentativas, cache=cache, codigo_vaga=codigo_vaga, erro=erro,
+        espera_limitador=espera,
+    )
+
+
+# ================= CHAMADAS AO MODELO =================
+
+def gerar_conteudo(prompt, modelo=MODELO_PADRAO, generation_config=None,
+                   timeout=TIMEOUT_PADRAO, tentativas=TENTATIVAS_PADRAO,
+                   etapa=None, codigo_vaga=None, contexto_cache=None):
+    """
+    Chamada síncrona ao generate_content com timeout e retry compartilhados.
+    `etapa` e `codigo_vaga` identificam a chamada nas métricas (metricas_llm).
+    Com `contexto_cache` (nome devolvido por criar_cache_contexto), o prompt é
+    enviado sobre o contexto já em cache no servidor.
+    """
+    handle = obter_modelo_com_cache(contexto_cache) if contexto_cache else obter_modelo(modelo)
+    if generation_config is None:
+        generation_config = config_json()
+
+    inicio = time.perf_counter()
+    feitas = 0
+    espera = 0.0
+    try:
+        for tentativa in Retrying(**politica_retry(tentativas)):
+            with tentativa:
+                feitas += 1
+                espera += limitador_taxa.adquirir(BALDE_LIMITADOR)
+                try:
+                    resposta = handle.generate_content(
+                        prompt,
+                        generation_config=generation_config,
+                        request_options={"timeout": timeout},
+                    )
+                except Exception as e:
+                    _registrar_resultado(e)
+                    raise
+                _registrar_resultado()
+    except Exception as e:
+        _registrar_metricas(etapa, modelo, inicio, espera, feitas, codigo_vaga, erro=e)
+        raise
+
+    _registrar_metricas(etapa, modelo, inicio, espera, feitas, codigo_vaga, resposta=resposta)
+    return resposta
+
+
+async def gerar_conteudo_async(prompt, modelo=MODELO_PADRAO, generation_config=None,
+                               timeout=TIMEOUT_PADRAO, tentativas=TENTATIVAS_PADRAO,
+                               etapa=None, codigo_vaga=None, contexto_cache=None):
+    """Versão assíncrona de gerar_conteudo, para uso com asyncio."""
+    handle = obter_modelo_com_cache(contexto_cache) if contexto_cache else obter_modelo(modelo)
+    if generation_config is None:
+        generation_config = config_json()
+
+    inicio = time.perf_counter()
+    feitas = 0
+    espera = 0.0
+    try:
+        async for tentativa in AsyncRetrying(**politica_retry(tentativas)):
+            with tentativa:
+                feitas += 1
+                espera += await asyncio.to_thread(limitador_taxa.adquirir, BALDE_LIMITADOR)
+                try:
+                    resposta = await handle.generate_content_async(
+                        prompt,
+                        generation_config=generation_config,
+                        request_options={"timeout": timeout},
+                    )
+                except Exception as e:
+                    await asyncio.to_thread(_registrar_resultado, e)
+                    raise
+                await asyncio.to_thread(_registrar_resultado)
+    except Exception as e:
+        _registrar_metricas(etapa, modelo, inicio, espera, feitas, codigo_vaga, erro=e)
+        raise
+
+    _registrar_metricas(etapa, modelo, inicio, espera, feitas, codigo_vaga, resposta=resposta)
+    return resposta
@@ -0,0 +1,166 @@
+#comparar_cvs_vagas.py
+"""
+Compara várias versões do CV com as mesmas vagas numa única execução.
+
+Lê todos os .docx de um diretório (`--cvs` ou `diretorio_cvs` no config),
+embeda cada requisito distinto das vagas uma única vez e calcula a matriz
+CV x vaga num só passo vetorizado (pontuar_varios_cvs). As matrizes dos CVs
+usam o mesmo cache por seção da aderência (embedding_cv), então um CV que não
+mudou não gera chamadas à API.
+
+A entrada é a mesma do aderencia_cv_vaga_ia.py (stdin ou arquivo). A saída,
+impressa e gravada em `output_file_score_cvs` quando configurado, traz para
+cada vaga o melhor CV e os scores de todos os CVs, mais quantas vagas cada CV
+venceu.
+
+Uso:
+    python scripts/comparar_cvs_vagas.py --cvs dados/cv/versoes [vagas.json] [--criterio ponderada]
+"""
+import os
+import sys
+import json
+import glob
+import logging
+import argparse
+
+import numpy as np
+
+from aderencia_cv_vaga_ia import (
+    ler_config,
+    stdin_has_data,
+    criar_embedding_batch,
+    preparar_backend,
+    coletar_requisitos,
+    embedar_requisitos,
+)
+from embedding_cv import carregar_matriz_cv
+from extracao_cv import texto_cv
+from entrada_json import iterar_entrada
+from pontuacao_vetorizada import pontuar_varios_cvs, validar_top_k, PESO_OBRIGATORIO_PADRAO, TOP_K_PADRAO
+
+# ================= LOGGING SETUP =================
+loglevel = os.environ.get("MY_LOG_LEVEL", "INFO").upper()
+logger = logging.getLogger(__name__)
+logger.setLevel(loglevel)
+
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.propagate = False
+
+# Critério de escolha do melhor CV -> chave do resultado de pontuar_varios_cvs
+CRITERIOS = {"geral": "media", "ponderada": "ponderada", "top_k": "top_k"}
+
+
+def listar_cvs(diretorio):
+    """Caminhos dos .docx do diretório, em ordem alfabética (ignora os temporários do Word, "~$...")."""
+    return sorted(
+        caminho for caminho in glob.glob(os.path.join(diretorio, "*.docx"))
+        if not os.path.basename(caminho).startswith("~$")
+    )
+
+
+def matrizes_dos_cvs(caminhos, backend, por_secoes=True):
+    """Matriz de embeddings (seções x dimensão) de cada CV, pelo cache de embedding_cv."""
+    matrizes = []
+    for caminho in caminhos:
+        if por_secoes:
+            matriz, _ = carregar_matriz_cv(
+                caminho, backend.nome,
+                lambda secoes: criar_embedding_batch(secoes, backend, etapa="aderencia_cv"),
+            )
+        else:
+            matriz = np.atleast_2d(criar_embedding_batch(texto_cv(caminho), backend, etapa="aderencia_cv"))
+        matrizes.append(matriz)
+    return matrizes
+
+
+def comparar_cvs_vagas(caminhos_cvs, vagas, backend, codigo_col="Code", peso_obrigatorio=PESO_OBRIGATORIO_PADRAO,
+                       top_k=TOP_K_PADRAO, criterio="geral", por_secoes=True):
+    """Matriz CV x vaga e o melhor CV de cada vaga segundo `criterio` (geral, ponderada ou top_k)."""
+    nomes = [os.path.basename(caminho) for caminho in caminhos_cvs]
+    resultado = {"criterio": criterio, "cvs": nomes, "vagas": [], "vitorias": {nome: 0 for nome in nomes}}
+
+    vagas_validas = coletar_requisitos(vagas, codigo_col, peso_obrigatorio)
+    if not vagas_validas or not caminhos_cvs:
+        return resultado
+
+    matriz, indices, offsets, pesos = embedar_requisitos(vagas_validas, backend)
+    matrizes_cv = matrizes_dos_cvs(caminhos_cvs, backend, por_secoes)
+    scores = pontuar_varios_cvs(matrizes_cv, matriz, indices, offsets, pesos=pesos, top_k=top_k)
+    logger.info(f"Matriz {len(nomes)} CVs x {len(vagas_validas)} vagas calculada.")
+
+    melhores = scores[CRITERIOS[criterio]].argmax(axis=1)
+    for j, (referencia, _, _) in enumerate(vagas_validas):
+        melhor = nomes[melhores[j]]
+        resultado["vitorias"][melhor] += 1
+        resultado["vagas"].append({
+            "codigo": referencia.get(codigo_col, ""),
+            "titulo": referencia.get("Title", ""),
+            "melhor_cv": melhor,
+            "melhor_score": round(float(scores[CRITERIOS[criterio]][j, melhores[j]]), 4),
+            "scores": {
+                nome: {
+                    "similaridade_geral": round(float(scores["media"][j, i]), 4),
+                    "similaridade_ponderada": round(float(scores["ponderada"][j, i]), 4),
+                    "similaridade_top_k": round(float(scores["top_k"][j, i]), 4),
+                }
+                for i, nome in enumerate(nomes)
+            },
+        })
+
+    resultado["vagas"].sort(key=lambda x: x["melhor_score"], reverse=True)
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("vagas", nargs="?", help="JSON das vagas analisadas (padrão: stdin)")
+    parser.add_argument("--cvs", help="Diretório com os .docx das versões do CV (padrão: diretorio_cvs do config)")
+    parser.add_argument("--criterio", choices=sorted(CRITERIOS), default="geral",
+                        help="Score usado para escolher o melhor CV de cada vaga")
+    args = parser.parse_args()
+
+    config_path = os.environ.get('CONFIG_JSON_PATH', 'configs/linkedin.json')
+    config = ler_config(config_path)
+
+    diretorio_cvs = args.cvs or config.get('diretorio_cvs')
+    if not diretorio_cvs:
+        raise ValueError("Informe o diretório dos CVs com --cvs ou 'diretorio_cvs' no config.")
+    caminhos_cvs = listar_cvs(diretorio_cvs)
+    if not caminhos_cvs:
+        raise ValueError(f"Nenhum .docx encontrado em {diretorio_cvs}")
+    logger.info(f"{len(caminhos_cvs)} CVs em {diretorio_cvs}")
+
+    if args.vagas:
+        vagas = list(iterar_entrada(args.vagas))
+    elif stdin_has_data():
+        vagas = list(iterar_entrada())
+    else:
+        raise ValueError("Nenhuma entrada fornecida! Use argumento de arquivo ou STDIN.")
+
+    top_k = validar_top_k(config.get('top_k_requisitos', TOP_K_PADRAO))
+    backend = preparar_backend(config)
+    resultado = comparar_cvs_vagas(
+        caminhos_cvs, vagas, backend,
+        peso_obrigatorio=config.get('peso_requisito_obrigatorio', PESO_OBRIGATORIO_PADRAO),
+        top_k=top_k,
+        criterio=args.criterio,
+        por_secoes=config.get('cv_por_secoes', True),
+    )
+
+    saida = config.get('output_file_score_cvs')
+    if saida:
+        with open(saida, "w", encoding="utf-8") as f:
+            f.write(json.dumps(resultado, ensure_ascii=False, indent=2))
+    return resultado
+
+
+if __name__ == "__main__":
+    try:
+        print(json.dumps(main(), ensure_ascii=False))
+    except Exception as e:
+        sys.stderr.write(json.dumps({"error": str(e)}, ensure_ascii=False, indent=2))
+        sys.exit(1)
@@ -0,0 +1,208 @@
+#contexto_cv.py
+"""
+Contexto do CV reaproveitado entre os prompts de sugestão (cv_sugestor.py).
+
+Cada vaga gerava um prompt com o CV inteiro, que era tokenizado e processado
+de novo a cada chamada. Aqui o CV é preparado uma vez e só os requisitos da
+vaga mudam de um prompt para outro:
+
+- "cache": o CV vai para um CachedContent no servidor do Gemini e os prompts
+  das vagas são enviados sobre ele. O nome do cache fica registrado em
+  <CV_CACHE_DIR>/contextos_servidor.json e é reusado por outros processos até
+  expirar. O cache explícito exige um mínimo de tokens por contexto
+  (`min_tokens_cache_contexto`); um CV menor que isso não é elegível.
+- "resumo": um resumo comprimido do CV, gerado uma única vez por hash do texto
+  do CV e guardado em <CV_CACHE_DIR>/<sha256>_<modelo>_resumo.json. O resumo
+  preserva literalmente cargos, ferramentas e frases do CV, porque as
+  sugestões citam trechos exatos que o cv_aplicador substitui no .docx.
+- "completo": o CV inteiro em cada prompt (comportamento anterior).
+
+No modo "auto" (padrão) tenta-se o cache no servidor, depois o resumo, e por
+fim o CV completo.
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+
+import cliente_gemini
+import metricas_llm
+from parser_resposta_ia import interpretar_resposta, validar_resumo_cv
+from preprocessamento_vaga import estimar_tokens
+
+# ================= LOGGING SETUP =================
+loglevel = os.environ.get("MY_LOG_LEVEL", "INFO").upper()
+logger = logging.getLogger(__name__)
+logger.setLevel(loglevel)
+
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.propagate = False
+
+MODOS = ("auto", "cache", "resumo", "completo")
+DIRETORIO_CACHE = os.environ.get("CV_CACHE_DIR", "logs/cache_cv")
+MODELO_CACHE_PADRAO = "models/gemini-1.5-flash-002"  # O cache explícito exige a versão fixa do modelo
+MIN_TOKENS_CACHE_PADRAO = 32768  # Mínimo de tokens do cache explícito nos modelos Gemini 1.5
+TTL_CACHE_PADRAO = 3600
+MARGEM_EXPIRACAO = 120  # Segundos: um cache prestes a expirar não é reusado
+RAZAO_MAXIMA_RESUMO = 0.8  # Resumo com mais de 80% dos tokens do CV não compensa
+MIN_TOKENS_RESUMO = 400  # CV menor que isso vai completo: a chamada de resumo não se paga
+
+INSTRUCAO_CACHE = (
+    "Você é um especialista em RH e otimização de currículos. "
+    "O conteúdo em cache é o currículo do candidato; use-o em todas as respostas."
+)
+
+PROMPT_RESUMO = """
+Condense o currículo abaixo para ser usado como contexto em sugestões de ajuste do CV a vagas de emprego.
+Preserve LITERALMENTE (copiando sem alterar nenhuma palavra) cargos, empresas, ferramentas, tecnologias,
+certificações, metodologias e as frases que descrevem responsabilidades e resultados: as sugestões vão
+citar trechos exatos do currículo. Remova dados de contato, repetições e formatação.
+
+Responda ESTRITAMENTE com um objeto JSON: {{"resumo_cv": "<texto condensado>"}}
+
+-----------------
+{texto_cv}
+-----------------
+"""
+
+
+class ContextoCV:
+    """
+    CV preparado para os prompts: `texto` entra no prompt; com `nome_cache`, o CV
+    já está no servidor. `texto_cv` é sempre o CV completo, contra o qual os
+    trechos "original" das sugestões são conferidos.
+    """
+
+    def __init__(self, modo, texto, tokens_cv, tokens_contexto, nome_cache=None, tokens_preparo=0, texto_cv=None):
+        self.modo = modo
+        self.texto = texto
+        self.texto_cv = texto if texto_cv is None else texto_cv
+        self.tokens_cv = tokens_cv
+        self.tokens_contexto = tokens_contexto
+        self.nome_cache = nome_cache
+        self.tokens_preparo = tokens_preparo  # Custo de preparar o contexto nesta execução (0 quando reusado)
+
+    def relatorio(self, n_vagas):
+        """Economia estimada de tokens de entrada em relação a mandar o CV completo em cada prompt."""
+        economia = n_vagas * (self.tokens_cv - self.tokens_contexto) - self.tokens_preparo
+        return {
+            "modo": self.modo,
+            "vagas": n_vagas,
+            "tokens_cv": self.tokens_cv,
+            "tokens_por_prompt": self.tokens_contexto,
+            "tokens_preparo": self.tokens_preparo,
+            "tokens_economizados": economia,
+        }
+
+
+def hash_texto(texto):
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+def _gravar_json(caminho, dados):
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(dados, f, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+
+def _ler_json(caminho):
+    if not os.path.exists(caminho):
+        return {}
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# ---------- cache no servidor ----------
+
+def _contexto_servidor(texto_cv, tokens_cv, hash_cv, modelo, min_tokens, ttl):
+    if tokens_cv < min_tokens:
+        logger.info(f"CV com ~{tokens_cv} tokens, abaixo do mínimo de {min_tokens} do cache no servidor.")
+        return None
+
+    caminho_registro = os.path.join(DIRETORIO_CACHE, "contextos_servidor.json")
+    registro = _ler_json(caminho_registro)
+    chave = f"{hash_cv}_{modelo}"
+    existente = registro.get(chave)
+    if existente and existente["expira"] - MARGEM_EXPIRACAO > time.time():
+        logger.info(f"Reusando contexto do CV em cache no servidor: {existente['nome']}")
+        return ContextoCV("cache", "", tokens_cv, 0, nome_cache=existente["nome"])
+
+    try:
+        nome = cliente_gemini.criar_cache_contexto(
+            f"Currículo do candidato:\n{texto_cv}", modelo,
+            instrucao_sistema=INSTRUCAO_CACHE, ttl_segundos=ttl, nome_exibicao=f"cv_{hash_cv[:12]}",
+        )
+    except Exception as e:
+        logger.warning(f"Cache de contexto no servidor indisponível ({e}).")
+        return None
+
+    registro = {k: v for k, v in _ler_json(caminho_registro).items() if v["expira"] > time.time()}
+    registro[chave] = {"nome": nome, "expira": time.time() + ttl}
+    _gravar_json(caminho_registro, registro)
+    return ContextoCV("cache", "", tokens_cv, 0, nome_cache=nome, tokens_preparo=tokens_cv)
+
+
+# ---------- resumo comprimido ----------
+
+def _contexto_resumo(texto_cv, tokens_cv, hash_cv, modelo):
+    if tokens_cv < MIN_TOKENS_RESUMO:
+        logger.info(f"CV com ~{tokens_cv} tokens: curto demais para compensar um resumo.")
+        return None
+    caminho = os.path.join(DIRETORIO_CACHE, f"{hash_cv}_{modelo.replace('/', '_')}_resumo.json")
+    dados = _ler_json(caminho)
+    tokens_preparo = 0
+
+    if "resumo_cv" not in dados:
+        try:
+            resposta = cliente_gemini.gerar_conteudo(
+                PROMPT_RESUMO.format(texto_cv=texto_cv), modelo=modelo,
+                generation_config=cliente_gemini.config_json(temperatura=0.0), etapa="cv_resumo",
+            )
+            resumo = interpretar_resposta(resposta.text, validar_resumo_cv)
+        except Exception as e:
+            logger.warning(f"Não foi possível gerar o resumo do CV ({e}).")
+            return None
+        entrada, saida, _ = metricas_llm.tokens_da_resposta(resposta)
+        tokens_preparo = (entrada or tokens_cv) + saida
+        dados = {"resumo_cv": resumo, "modelo": modelo}
+        _gravar_json(caminho, dados)
+        logger.info(f"Resumo do CV gerado e guardado em {caminho}")
+
+    tokens_resumo = estimar_tokens(dados["resumo_cv"])
+    if tokens_resumo > RAZAO_MAXIMA_RESUMO * tokens_cv:
+        logger.info(f"Resumo do CV (~{tokens_resumo} tokens) não é menor o bastante que o CV (~{tokens_cv}).")
+        return None
+    return ContextoCV("resumo", dados["resumo_cv"], tokens_cv, tokens_resumo, tokens_preparo=tokens_preparo)
+
+
+def preparar_contexto(texto_cv, modo="auto", modelo=cliente_gemini.MODELO_PADRAO,
+                      modelo_cache=MODELO_CACHE_PADRAO, min_tokens_cache=MIN_TOKENS_CACHE_PADRAO,
+                      ttl_cache=TTL_CACHE_PADRAO):
+    """Prepara o contexto do CV uma vez para todas as vagas, conforme o `modo` (ver docstring do módulo)."""
+    if modo not in MODOS:
+        raise ValueError(f"contexto_cv_sugestor inválido: {modo!r} (use {', '.join(MODOS)}).")
+
+    tokens_cv = estimar_tokens(texto_cv)
+    hash_cv = hash_texto(texto_cv)
+    contexto = None
+    if modo in ("auto", "cache"):
+        contexto = _contexto_servidor(texto_cv, tokens_cv, hash_cv, modelo_cache, min_tokens_cache, ttl_cache)
+    if contexto is None and modo in ("auto", "resumo"):
+        contexto = _contexto_resumo(texto_cv, tokens_cv, hash_cv, modelo)
+    if contexto is None:
+        contexto = ContextoCV("completo", texto_cv, tokens_cv, tokens_cv)
+
+    contexto.texto_cv = texto_cv
+    logger.info(f"Contexto do CV: modo '{contexto.modo}', ~{contexto.tokens_contexto} de ~{tokens_cv} tokens por prompt.")
+    return contexto
@@ -10,6 +10,9 @@ import subprocess
 import time
 import re # Para regex na interpretação da resposta (se necessário, mas não deve mais ser neste script)
 
+from entrada_json import iterar_entrada
+from saida_json import emitir
+
 # ================= LOGGING SETUP =================
 loglevel = os.environ.get("MY_LOG_LEVEL", "INFO").upper()
 logger = logging.getLogger(__name__)
@@ -20,6 +23,7 @@ if not logger.handlers:
     formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     handler.setFormatter(formatter)
     logger.addHandler(handler)
+    logger.propagate = False
 
 # ================= FUNÇÕES DO SCRIPT =================
 
@@ -93,20 +97,6 @@ def gerar_pdf_linux(docx_path, output_dir):
         logger.error(f"Erro inesperado durante a conversão para PDF: {e}")
         return False
 
-def extrair_texto_docx(caminho_arquivo):
-    """Extrai texto de um arquivo DOCX (função auxiliar, pode ser redundante se o CV já foi lido antes)."""
-    try:
-        doc = Document(caminho_arquivo)
-        texto = []
-        for p in doc.paragraphs:
-            texto.append(p.text)
-        return "\n".join(texto)
-    except Exception as e:
-        logger.error(f"Erro ao extrair texto do DOCX '{caminho_arquivo}': {e}")
-        # Não sys.exit(1) aqui, pois pode ser que o arquivo esteja corrompido, mas queremos continuar
-        # processando outras vagas, se houver.
-        return None
-
 def substituir_texto_docx(caminho_arquivo_original, substituicoes):
     """
     Realiza as substituições no documento DOCX, preservando a formatação.
@@ -198,26 +188,15 @@ def main():
     diretorio_cv_original = linkedin_config["input_file_cv"]
     output_base_dir = linkedin_config['output_dir']
 
-    # Lê o JSON consolidado de sugestões (entrada via stdin ou arquivo)
-    try:
-        if stdin_has_data():
-            entrada_json = sys.stdin.read().strip()
-            logger.info("Lido JSON de sugestões do stdin.")
-        elif len(sys.argv) > 1:
-            with open(sys.argv[1]) as f:
-                entrada_json = f.read()
-            logger.info(f"Lido JSON de sugestões do arquivo {sys.argv[1]}.")
-        else:
-            logger.info("Nenhuma entrada de sugestões fornecida! Use argumento de arquivo ou STDIN.")
-            sys.exit(1)
-        
-        all_vaga_suggestions = json.loads(entrada_json)
-        if not isinstance(all_vaga_suggestions, list):
-            # Se for um único objeto, transforme em lista para processamento
-            all_vaga_suggestions = [all_vaga_suggestions]
-
-    except Exception as e:
-        logger.error(f"Erro ao ler entrada de sugestões: {e}")
+    # Lê o JSON consolidado de sugestões em fluxo, vaga a vaga (array, objeto único ou NDJSON; stdin ou arquivo)
+    if stdin_has_data():
+        all_vaga_suggestions = iterar_entrada()
+        logger.info("Lendo JSON de sugestões do stdin.")
+    elif len(sys.argv) > 1:
+        all_vaga_suggestions = iterar_entrada(sys.argv[1])
+        logger.info(f"Lendo JSON de sugestões do arquivo {sys.argv[1]}.")
+    else:
+        logger.info("Nenhuma entrada de sugestões fornecida! Use argumento de arquivo ou STDIN.")
         sys.exit(1)
     
     if not os.path.exists(diretorio_cv_original):
@@ -241,12 +220,16 @@ def main():
             # import shutil
             # shutil.copy(diretorio_cv_original, novo_docx_path)
             # logger.info(f"Copiado CV original para {novo_docx_path} (sem modificações).")
-            processing_results.append({
+            resultado_vaga = {
                 "codigo": codigo_vaga,
                 "status": "Nenhuma sugestão, DOCX original não modificado",
                 "output_dir": dir_vaga,
                 "referencia": referencia
-            })
+            }
+            if vaga_data.get("erro"):
+                # O cv_sugestor registra aqui a falha da vaga (as demais seguem normalmente)
+                resultado_vaga["erro"] = vaga_data["erro"]
+            processing_results.append(resultado_vaga)
             continue # Passa para a próxima vaga
 
         # Aplicar sugestões e salvar novo DOCX
@@ -301,7 +284,7 @@ def main():
         time.sleep(0.5) # Pequeno atraso para evitar sobrecarga de I/O ou CPU
 
     # Imprime o JSON de resultados de processamento para o stdout
-    print(json.dumps(processing_results, ensure_ascii=False, indent=2))
+    emitir(processing_results, "cv_aplicador")
     logger.info("Processo de aplicação de sugestões e geração de documentos finalizado.")
 
 if __name__ == "__main__":
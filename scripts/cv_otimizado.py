@@ -4,13 +4,15 @@ from docx import Document
 import os
 import json
 from google.auth import default
-import google.generativeai as genai
-import ast
-import re
 import subprocess
 import sys
 import logging
-import time
+
+import cliente_gemini
+import extracao_cv
+from entrada_json import iterar_entrada
+from saida_json import emitir
+from parser_resposta_ia import interpretar_resposta, validar_sugestoes, RespostaInvalida
 
 # ================= LOGGING SETUP =================
 # Configuração mais robusta e explícita do logging
@@ -28,19 +30,15 @@ if not logger.handlers:
     formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     handler.setFormatter(formatter)
     logger.addHandler(handler)
+    logger.propagate = False
 
 # ===================================================
 
 load_dotenv()
 
 def carrega_chave():
-    gemini_api_key = os.getenv('GEMINI_API_KEY')
-    if not gemini_api_key:
-        logger.error("Chave de API do Google não encontrada (GEMINI_API_KEY).")
-        sys.exit(1)
-        
-    genai.configure(api_key=gemini_api_key)
-    return genai
+    # genai.configure acontece uma única vez por processo, no cliente compartilhado
+    return cliente_gemini.configurar()
 
 def stdin_has_data():
     import select
@@ -119,51 +117,19 @@ def gerar_pdf_linux(docx_path, output_dir):
         return False
 
 def interpretar_resposta_ia(resposta_texto):
-
-    logging.warning("Resposta da IA não parece ser um JSON. Validando entrada.")
-
-    # Remove marcações de código e espaços em branco desnecessários
-    cleaned_text = re.sub(r'```json\s*|```', '', resposta_texto).strip()
-
-    # Se a resposta estiver vazia após a limpeza, retorna lista vazia.
-    if not cleaned_text:
-        logging.warning("Resposta da IA estava vazia após a limpeza.")
-        return []
-
+    """
+    Interpreta a resposta da IA como lista de sugestões, reparando localmente
+    os defeitos comuns de JSON. Retorna lista vazia se o reparo não resolver,
+    para não quebrar o fluxo principal.
+    """
     try:
-        # Tenta converter a string para um objeto Python
-        dados_convertidos = ast.literal_eval(cleaned_text)
-
-        # Caso 1: A resposta já é uma lista (formato ideal)
-        if isinstance(dados_convertidos, list):
-            logging.info("Resposta da IA interpretada como uma lista de sugestões.")
-            return dados_convertidos
-
-        # Caso 2: A resposta é um dicionário contendo a chave 'sugestoes'
-        elif isinstance(dados_convertidos, dict):
-            if 'sugestoes' in dados_convertidos and isinstance(dados_convertidos['sugestoes'], list):
-                logging.info("Resposta da IA interpretada como um dicionário. Extraindo a lista 'sugestoes'.")
-                return dados_convertidos['sugestoes']
-            else:
-                logging.error(f"Dicionário JSON não contém a chave 'sugestoes' ou o valor não é uma lista. Resposta recebida: {cleaned_text}")
-                return []
-        
-        # Caso 3: Formato inesperado (nem lista, nem dicionário)
-        else:
-            logging.error(f"Resposta da IA não é uma lista ou dicionário válido. Tipo recebido: {type(dados_convertidos)}")
-            return []
-        
-    except (ValueError, SyntaxError, TypeError) as e:
-        # Erro de parsing: A string não é uma estrutura Python válida
-        logging.error(f"Erro de parsing ao interpretar a resposta da IA: {e}. Resposta bruta recebida: {resposta_texto}")
-        return [] # Retorna lista vazia para não quebrar o fluxo principal
-    except Exception as e:
-        # Pega qualquer outro erro inesperado
-        logging.error(f"Erro genérico inesperado ao interpretar resposta: {e}. Resposta bruta recebida: {resposta_texto}")
+        return interpretar_resposta(resposta_texto, validar_sugestoes)
+    except RespostaInvalida as e:
+        logger.error(f"Erro de parsing ao interpretar a resposta da IA: {e}. Resposta bruta recebida: {resposta_texto}")
         return []
 
 # 1. Função para gerar sugestões com Vertex IA / Gemini (Google GenAI)
-def sugerir_substituicoes(genai, texto_cv, requisitos_vaga, model="gemini-1.5-flash"):
+def sugerir_substituicoes(genai, texto_cv, requisitos_vaga, model="gemini-1.5-flash", codigo_vaga=None):
 #def sugerir_substituicoes(genai, texto_cv, requisitos_vaga, model="gemini-2.5-flash-preview-05-20"):
     # Autentica usando application default credentials
     creds, _ = default()
@@ -196,12 +162,9 @@ Compare com estes requisitos da vaga:
     try:
         # Chamada para gerar o conteúdo
         logger.info(f"Enviando o seguinte prompt para a IA:\n{prompt}")
-        modelo = genai.GenerativeModel(model)
-        config =  genai.types.GenerationConfig(temperature=0.7,response_mime_type="application/json")
-        response = modelo.generate_content(
-            prompt,  # Usando a nova API com Part
-            generation_config=config
-        )
+        config = cliente_gemini.config_json(temperatura=0.7)
+        response = cliente_gemini.gerar_conteudo(prompt, modelo=model, generation_config=config,
+                                                 etapa="cv_otimizado", codigo_vaga=codigo_vaga)
         logger.info(f"DEBUG: repr(response.text) antes de interpretar:\n {repr(response.text)}")    
     except Exception as e:
         logger.error(f"Ocorreu um erro ao chamar a API: {e}")
@@ -214,14 +177,6 @@ Compare com estes requisitos da vaga:
     return sugestoes_ia
 
     
-# 2. Função para extrair texto de um DOCX (simplificada)
-def extrair_texto_docx(caminho_arquivo):
-    doc = Document(caminho_arquivo)
-    texto = []
-    for p in doc.paragraphs:
-        texto.append(p.text)
-    return "\n".join(texto)
-
 def substituir_texto_docx(caminho_arquivo_original, substituicoes):
     try:
         document = Document(caminho_arquivo_original)
@@ -317,9 +272,9 @@ def processar_vaga(genai, vaga_dict, output_dir,caminho_cv):
     novo_docx_path = os.path.join(dir_vaga, f"CV_Modificado_{codigo_vaga}.docx")
 
     # Processamento
-    texto_cv = extrair_texto_docx(caminho_cv)
+    texto_cv = extracao_cv.texto_cv(caminho_cv)  # Em cache: o .docx não é relido a cada vaga
     logger.info("Solicitando sugestões IA...")
-    sugestoes_ia = sugerir_substituicoes(genai, texto_cv, requisitos_texto)
+    sugestoes_ia = sugerir_substituicoes(genai, texto_cv, requisitos_texto, codigo_vaga=codigo_vaga)
     logger.info(f"Sugestões:, {sugestoes_ia}")
 
     # Substituições manuais, se necessário
@@ -350,8 +305,6 @@ def processar_vaga(genai, vaga_dict, output_dir,caminho_cv):
             logger.error(f"Falha ao tentar gerar o DOCX para a vaga {codigo_vaga}: {e}")
     else:
         logger.error(f"Falha ao modificar o arquivo DOCX para a vaga {codigo_vaga}. Nenhum arquivo salvo")
-    
-    time.sleep(1)  # Respeita limites de API
 
     return {"codigo" : codigo_vaga,
             "sugestoes": sugestoes_ia
@@ -376,29 +329,24 @@ def main():
     output_dir = linkedin_config['output_dir']
 
     # Lê as vagas do JSON no n8n como a entrada é via stdin a linha de baixo não é necessaria 
-    try:
-        if stdin_has_data():
-            entrada_json = sys.stdin.read().strip()
-            logger.info("Lido JSON do stdin", file=sys.stderr)
-        elif len(sys.argv) > 1:
-            with open(sys.argv[1]) as f:
-                entrada_json = f.read()
-            logger.info(f"Lido JSON do arquivo {sys.argv[1]}", file=sys.stderr)
-        else:
-            logger.info("Nenhuma entrada fornecida! Use argumento de arquivo ou STDIN.", file=sys.stderr)
-            sys.exit(1)
-        vagas = json.loads(entrada_json)
-    except Exception as e:
-        logger.info(f"Erro ao ler entrada: {e}")
+    # A leitura é em fluxo: cada vaga é processada assim que chega (array, objeto único ou NDJSON)
+    if stdin_has_data():
+        vagas = iterar_entrada()
+        logger.info("Lendo JSON do stdin")
+    elif len(sys.argv) > 1:
+        vagas = iterar_entrada(sys.argv[1])
+        logger.info(f"Lendo JSON do arquivo {sys.argv[1]}")
+    else:
+        logger.info("Nenhuma entrada fornecida! Use argumento de arquivo ou STDIN.")
         sys.exit(1)
-        
+
 
     for vaga in vagas:
 
         resultado=processar_vaga(genai, vaga, output_dir,diretorio_cv) 
         resultados.append(resultado)   
 
-    print(json.dumps(resultados, ensure_ascii=False, indent=2))
+    emitir(resultados, "cv_otimizado")
 
     # O print dos logs para stderr foi REMOVIDO. O módulo logging já está fazendo isso em tempo real.
     logger.info("Processo finalizado.")
@@ -4,17 +4,18 @@ import sys
 from dotenv import load_dotenv
 import os
 import json
-from tenacity import retry, stop_after_attempt, wait_exponential, before_log
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 import logging
-import ast
-import re
-import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
 
-import google.generativeai as genai
-from google.generativeai import types
-from google.auth import default # Para carregar credenciais automaticamente
-
-from docx import Document # Ainda precisamos disso para extrair texto do CV
+import cliente_gemini
+import extracao_cv
+from entrada_json import iterar_entrada
+from contexto_cv import preparar_contexto, MODELO_CACHE_PADRAO, MIN_TOKENS_CACHE_PADRAO, TTL_CACHE_PADRAO
+from agrupamento_vagas import Agrupador, conjunto_requisitos, AMOSTRA_QC_PADRAO
+from saida_json import emitir
+from parser_resposta_ia import interpretar_resposta, validar_sugestoes, filtrar_sugestoes_literais, RespostaInvalida
 
 # ================= LOGGING SETUP =================
 loglevel = os.environ.get("MY_LOG_LEVEL", "INFO").upper()
@@ -26,19 +27,16 @@ if not logger.handlers:
     formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     handler.setFormatter(formatter)
     logger.addHandler(handler)
+    logger.propagate = False
 
-
+# Vagas processadas em paralelo; o ritmo das chamadas continua limitado pelo limitador_taxa compartilhado
+WORKERS_PADRAO = int(os.environ.get("CV_SUGESTOR_WORKERS", "4"))
 
 # ================= FUNÇÕES DO SCRIPT =================
 
 def carrega_chave():
-    """Carrega a chave da API do Gemini das variáveis de ambiente."""
-    gemini_api_key = os.getenv('GEMINI_API_KEY')
-    if not gemini_api_key:
-        logger.error("Chave de API do Google não encontrada (GEMINI_API_KEY).")
-        sys.exit(1)
-    genai.configure(api_key=gemini_api_key)
-    return genai
+    """Carrega a chave da API do Gemini (configurada uma única vez no cliente compartilhado)."""
+    return cliente_gemini.configurar()
 
 def stdin_has_data():
     """Verifica se há dados na entrada padrão (stdin)."""
@@ -55,51 +53,49 @@ def log_custom_before_sleep(retry_state):
 
 def interpretar_resposta_ia(resposta_texto):
     """
-    Interpreta e limpa a resposta da IA para garantir que seja um JSON válido.
-    Lida com formatações extras como '```json' e garante que a saída seja uma lista.
+    Interpreta a resposta da IA como lista de sugestões {original, substituto}.
+    Defeitos comuns (cercas de markdown, aspas simples, vírgulas sobrando, NaN,
+    array truncado) são reparados localmente; só levanta RespostaInvalida
+    (um ValueError, que dispara o retry) quando o reparo não resolve.
     """
-    logging.warning("Resposta da IA não parece ser um JSON puro. Validando entrada.")
-
-    # Remove marcações de código e espaços em branco desnecessários
-    cleaned_text = re.sub(r'```json\s*|```', '', resposta_texto).strip()
-
-    if not cleaned_text:
-        logging.warning("Resposta da IA estava vazia após a limpeza.")
-        return []
-
     try:
-        dados_convertidos = ast.literal_eval(cleaned_text)
-
-        if isinstance(dados_convertidos, list):
-            logging.info("Resposta da IA interpretada como uma lista de sugestões.")
-            return dados_convertidos
-        elif isinstance(dados_convertidos, dict):
-            if 'sugestoes' in dados_convertidos and isinstance(dados_convertidos['sugestoes'], list):
-                logging.info("Resposta da IA interpretada como um dicionário. Extraindo a lista 'sugestoes'.")
-                return dados_convertidos['sugestoes']
-            else:
-                raise ValueError(f"Dicionário JSON não contém a chave 'sugestoes' ou o valor não é uma lista. Resposta recebida: {cleaned_text}")                
-        else:
-            raise ValueError(f"Resposta da IA não é uma lista ou dicionário válido. Tipo recebido: {type(dados_convertidos)}")
-            
-    except (ValueError, SyntaxError, TypeError) as e:
-        logging.error(f"Erro de parsing ao interpretar a resposta da IA: {e}. Resposta bruta recebida: {resposta_texto}")
-        raise
-    except Exception as e:
-        logging.error(f"Erro genérico inesperado ao interpretar resposta: {e}. Resposta bruta recebida: {resposta_texto}")
+        return interpretar_resposta(resposta_texto, validar_sugestoes)
+    except RespostaInvalida as e:
+        logger.error(f"Erro de parsing ao interpretar a resposta da IA: {e}. Resposta bruta recebida: {resposta_texto}")
         raise
     
 @retry(
     wait=wait_exponential(multiplier=1, min=4, max=10), # Espera 4s, 8s, 16s... até 10s max
     stop=stop_after_attempt(5), # Tenta 5 vezes
+    # Erros transitórios da API já são repetidos dentro de cliente_gemini;
+    # aqui só repetimos quando a resposta não pôde ser interpretada.
+    retry=retry_if_exception_type((ValueError, SyntaxError, TypeError)),
     reraise=True, # Se quiser que a exceção seja propagada após todas as tentativas
     before_sleep=log_custom_before_sleep
 )
 
-def sugerir_substituicoes(genai_model, texto_cv, requisitos_vaga, model="gemini-1.5-flash"):
+def sugerir_substituicoes(genai_model, texto_cv, requisitos_vaga, model="gemini-1.5-flash", codigo_vaga=None,
+                          contexto=None, sugestoes_base=None):
     """
     Gera sugestões de substituição de termos no CV usando a API do Gemini.
+    Com `contexto` (contexto_cv.ContextoCV), o CV vai como resumo no prompt ou
+    já está no cache do servidor, e só os requisitos mudam de uma vaga para outra.
+    Com `sugestoes_base` (sugestões de uma vaga do mesmo grupo), a IA só ajusta
+    essas sugestões aos requisitos desta vaga.
     """
+    if contexto is not None and contexto.nome_cache:
+        bloco_cv = "(O currículo do candidato está no contexto em cache.)"
+    else:
+        bloco_cv = contexto.texto if contexto is not None else texto_cv
+
+    bloco_base = ""
+    if sugestoes_base:
+        bloco_base = (
+            "Sugestões já feitas para uma vaga com requisitos muito parecidos (mantenha as que servem "
+            "e ajuste apenas o necessário para os requisitos abaixo):\n"
+            f"{json.dumps(sugestoes_base, ensure_ascii=False)}\n-----------------"
+        )
+
     prompt = f"""
 Você é um especialista em RH e otimização de currículos. Analise o currículo e os requisitos da vaga abaixo.
 Sugira substituições de termos no currículo para que ele se alinhe melhor aos requisitos da vaga.
@@ -117,45 +113,211 @@ Seja sucinto e prático, não sugira mais do que 4 itens!
 ]
 
 -----------------
-{texto_cv}
+{bloco_cv}
 -----------------
 Compare com estes requisitos da vaga:
 {requisitos_vaga}
 -----------------
+{bloco_base}
 """
     try:
         logger.info(f"Enviando prompt para a IA (modelo: {model})...")
-        modelo = genai_model.GenerativeModel(model)
-        config = genai.types.GenerationConfig(temperature=0.7, response_mime_type="application/json")
-        response = modelo.generate_content(
-            prompt,
-            generation_config=config
-        )
+        config = cliente_gemini.config_json(temperatura=0.7)
+        response = cliente_gemini.gerar_conteudo(prompt, modelo=model, generation_config=config,
+                                                 etapa="cv_sugestor", codigo_vaga=codigo_vaga,
+                                                 contexto_cache=contexto.nome_cache if contexto else None)
         logger.info(f"DEBUG: repr(response.text) antes de interpretar:\n {repr(response.text)}")
 
         sugestoes_ia = interpretar_resposta_ia(response.text)
         logger.info(f"DEBUG: Sugestões interpretadas da IA: {sugestoes_ia}")
-        return sugestoes_ia
+        # O prompt pode ter levado o resumo do CV: só vale o que o cv_aplicador encontra no .docx
+        return filtrar_sugestoes_literais(sugestoes_ia, texto_cv, codigo_vaga)
     
     except Exception as e:
         logger.error(f"Ocorreu um erro ao chamar a API: {e}")
         logger.exception("Detalhes do erro na função sugerir_substituicoes")
         raise
 
-def extrair_texto_docx(caminho_arquivo):
-    """Extrai texto de um arquivo DOCX."""
+def montar_requisitos(analise):
+    """Texto dos requisitos da vaga enviado no prompt (listas primeiro, depois os campos simples)."""
+    linhas_requisitos = []
+    campos_lista = [
+        "requisitos_obrigatorios",
+        "requisitos_desejaveis",
+        "soft_skills",
+        "hard_skills"
+    ]
+
+    for campo in campos_lista:
+        if campo in analise and isinstance(analise[campo], list):
+            if analise[campo]: # Adiciona apenas se a lista não estiver vazia
+                linhas_requisitos.append(f"{campo.replace('_',' ').capitalize()}: {', '.join(analise[campo])}")
+
+    # Adiciona outros campos que não são listas e não foram processados acima
+    for campo, valor in analise.items():
+        if campo not in campos_lista and not isinstance(valor, (list, dict)):
+            linhas_requisitos.append(f"{campo}: {valor}")
+
+    return "\n".join(linhas_requisitos)
+
+def codigo_da_vaga(referencia):
+    """Código da vaga de forma robusta (números viram texto sem casas decimais)."""
+    code = referencia.get("Code", "SEM_CODIGO")
+    return str(int(float(code))) if isinstance(code, (int, float, str)) and str(code).isdigit() else str(code)
+
+def processar_vaga(genai_model, texto_cv, vaga_dict, contexto=None, sugestoes_base=None):
+    """
+    Gera as sugestões de uma vaga. Retorna o registro da vaga, ou None se ela
+    não tem requisitos. Uma falha depois de esgotados os retries vira um
+    registro com "erro" e sugestões vazias, sem derrubar as demais vagas.
+    """
+    analise = vaga_dict.get("analise", {})
+    referencia = vaga_dict.get("referencia", {})
+    codigo_vaga = codigo_da_vaga(referencia)
+
+    sugestoes_prontas = vaga_dict.get("sugestoes")
+    if isinstance(sugestoes_prontas, list):
+        # Geradas junto com a análise (analise_com_sugestoes no analise_vaga_ia): nenhuma chamada à IA
+        logger.info(f"Vaga {codigo_vaga} já veio com sugestões da análise; repassando.")
+        return {"codigo": codigo_vaga, "referencia": referencia, "sugestoes": sugestoes_prontas}
+
+    logger.info(f"Iniciando geração de sugestões para a vaga: {codigo_vaga}")
+    requisitos_texto = montar_requisitos(analise)
+
+    if not requisitos_texto.strip():
+        logger.warning(f"Requisitos de vaga vazios para {codigo_vaga}. Pulando geração de sugestões.")
+        return None
+
+    logger.info(f"Solicitando sugestões IA para vaga {codigo_vaga}...")
+    # O ritmo das chamadas é controlado pelo limitador compartilhado (limitador_taxa)
     try:
-        doc = Document(caminho_arquivo)
-        texto = []
-        for p in doc.paragraphs:
-            texto.append(p.text)
-        return "\n".join(texto)
+        sugestoes_ia = sugerir_substituicoes(genai_model, texto_cv, requisitos_texto, codigo_vaga=codigo_vaga,
+                                             contexto=contexto, sugestoes_base=sugestoes_base)
     except Exception as e:
-        logger.error(f"Erro ao extrair texto do DOCX '{caminho_arquivo}': {e}")
-        sys.exit(1)
+        logger.error(f"Sem sugestões para a vaga {codigo_vaga} após as tentativas: {e}")
+        return {
+            "codigo": codigo_vaga,
+            "referencia": referencia,
+            "sugestoes": [],
+            "erro": f"{type(e).__name__}: {e}",
+        }
+    logger.info(f"Sugestões recebidas para {codigo_vaga}: {sugestoes_ia}")
+
+    return {
+        "codigo": codigo_vaga,
+        "referencia": referencia, # Manter a referência completa da vaga
+        "sugestoes": sugestoes_ia if sugestoes_ia is not None else []
+    }
+
+class _Imediato:
+    """Executa cada tarefa na hora, com a interface do ThreadPoolExecutor (processamento sequencial)."""
+
+    def submit(self, funcao, *args):
+        futuro = Future()
+        try:
+            futuro.set_result(funcao(*args))
+        except Exception as e:
+            futuro.set_exception(e)
+        return futuro
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+def registro_do_grupo(registro_lider, vaga_dict, lider):
+    """Registro de uma vaga do grupo com as sugestões (ou o erro) do líder, sem nova chamada à IA."""
+    referencia = vaga_dict.get("referencia", {})
+    registro = {
+        "codigo": codigo_da_vaga(referencia),
+        "referencia": referencia,
+        "sugestoes": list(registro_lider.get("sugestoes", [])) if registro_lider else [],
+        "grupo": lider,
+    }
+    if registro_lider and registro_lider.get("erro"):
+        registro["erro"] = registro_lider["erro"]
+    return registro
+
+def _derivar(futuro_lider, funcao):
+    """Future concluído com funcao(resultado do líder) assim que o líder termina, sem ocupar uma thread."""
+    futuro = Future()
+
+    def concluir(concluido):
+        try:
+            futuro.set_result(funcao(concluido.result()))
+        except Exception as e:
+            futuro.set_exception(e)
+
+    futuro_lider.add_done_callback(concluir)
+    return futuro
+
+def _refinar(genai_model, texto_cv, vaga_dict, grupo, contexto):
+    """Sugestões do líder ajustadas aos requisitos desta vaga (uma chamada, com as sugestões do líder no prompt)."""
+    registro_lider = grupo.futuro.result()
+    if not registro_lider or registro_lider.get("erro"):
+        return registro_do_grupo(registro_lider, vaga_dict, grupo.lider)
+    registro = processar_vaga(genai_model, texto_cv, vaga_dict, contexto, sugestoes_base=registro_lider["sugestoes"])
+    if registro is not None:
+        registro["grupo"] = grupo.lider
+    return registro
+
+def processar_vagas(genai_model, texto_cv, vagas, workers=WORKERS_PADRAO, contexto=None, agrupador=None,
+                    refinar=False):
+    """
+    Processa as vagas com `workers` threads e gera os resultados na ordem de
+    entrada. No máximo 2 x workers vagas ficam em andamento, então a entrada
+    em fluxo continua sendo consumida aos poucos.
+
+    Com `agrupador` (agrupamento_vagas.Agrupador), uma vaga cujos requisitos
+    caem num grupo existente reaproveita as sugestões do líder do grupo; com
+    `refinar`, as que não têm requisitos idênticos aos do líder ganham uma
+    chamada de ajuste sobre essas sugestões.
+    """
+    pendentes = deque()
+    executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else _Imediato()
+    with executor:
+        for vaga_dict in vagas:
+            if agrupador is None or isinstance(vaga_dict.get("sugestoes"), list):
+                futuro = executor.submit(processar_vaga, genai_model, texto_cv, vaga_dict, contexto)
+            else:
+                analise = vaga_dict.get("analise", {})
+                conjunto = conjunto_requisitos(analise)
+                codigo = codigo_da_vaga(vaga_dict.get("referencia", {}))
+                grupo, _, eh_lider = agrupador.atribuir(codigo, conjunto, montar_requisitos(analise))
+                if eh_lider:
+                    futuro = executor.submit(processar_vaga, genai_model, texto_cv, vaga_dict, contexto)
+                    if grupo is not None:
+                        grupo.futuro = futuro
+                        futuro = _derivar(futuro, lambda r, lider=grupo.lider: r and {**r, "grupo": lider})
+                elif refinar and conjunto != grupo.conjunto:
+                    agrupador.refinamentos += 1
+                    # O líder foi enviado antes ao executor (fila FIFO), então esta espera não trava o pool
+                    futuro = executor.submit(_refinar, genai_model, texto_cv, vaga_dict, grupo, contexto)
+                else:
+                    futuro = _derivar(grupo.futuro,
+                                      lambda r, v=vaga_dict, lider=grupo.lider: registro_do_grupo(r, v, lider))
+            pendentes.append(futuro)
+            if len(pendentes) >= 2 * workers:
+                yield pendentes.popleft().result()
+        while pendentes:
+            yield pendentes.popleft().result()
 
 # ================= FLUXO PRINCIPAL =================
 
+def criar_agrupador(config):
+    """Agrupador de vagas conforme o config, ou None se `agrupar_vagas_sugestor` está desligado."""
+    if not config.get("agrupar_vagas_sugestor", False):
+        return None
+    metodo = config.get("metodo_agrupamento", "jaccard")
+    vetorizar = None
+    if metodo == "embedding":
+        # Mesmo backend e cache de embeddings da aderência; importado só quando usado
+        from aderencia_cv_vaga_ia import preparar_backend, criar_embedding_batch
+        backend = preparar_backend(config)
+        vetorizar = lambda texto: criar_embedding_batch(texto, backend, etapa="agrupamento_vagas")
+    return Agrupador(metodo, config.get("limiar_agrupamento"), vetorizar)
+
 def main():
     load_dotenv()
     genai_instance = carrega_chave()
@@ -172,85 +334,71 @@ def main():
 
     diretorio_cv = linkedin_config["input_file_cv"]
 
-    # Lê as vagas (analisadas) do JSON (entrada via stdin ou arquivo)
-    try:
-        if stdin_has_data():
-            entrada_json = sys.stdin.read().strip()
-            logger.info("Lido JSON do stdin.")
-        elif len(sys.argv) > 1:
-            with open(sys.argv[1]) as f:
-                entrada_json = f.read()
-            logger.info(f"Lido JSON do arquivo {sys.argv[1]}.")
-        else:
-            logger.info("Nenhuma entrada de vagas fornecida! Use argumento de arquivo ou STDIN.")
-            sys.exit(1)
-        vagas_analisadas = json.loads(entrada_json)
-        if not isinstance(vagas_analisadas, list):
-            # Se for um único objeto, transforme em lista para processamento
-            vagas_analisadas = [vagas_analisadas]
+    # Lê as vagas (analisadas) em fluxo, uma a uma (array, objeto único ou NDJSON; stdin ou arquivo)
+    if stdin_has_data():
+        vagas_analisadas = iterar_entrada()
+        logger.info("Lendo JSON do stdin.")
+    elif len(sys.argv) > 1:
+        vagas_analisadas = iterar_entrada(sys.argv[1])
+        logger.info(f"Lendo JSON do arquivo {sys.argv[1]}.")
+    else:
+        logger.info("Nenhuma entrada de vagas fornecida! Use argumento de arquivo ou STDIN.")
+        sys.exit(1)
 
+    # Texto do CV em cache (extracao_cv): o .docx só é aberto quando muda
+    try:
+        texto_cv = extracao_cv.texto_cv(diretorio_cv)
     except Exception as e:
-        logger.error(f"Erro ao ler entrada de vagas: {e}")
+        logger.error(f"Erro ao extrair texto do DOCX '{diretorio_cv}': {e}")
         sys.exit(1)
-
-    texto_cv = extrair_texto_docx(diretorio_cv)
-
-    for vaga_dict in vagas_analisadas:
-        analise = vaga_dict.get("analise", {})
-        referencia = vaga_dict.get("referencia", {})
-
-        # Extrair código da vaga de forma robusta
-        code = referencia.get("Code", "SEM_CODIGO")
-        codigo_vaga = str(int(float(code))) if isinstance(code, (int, float, str)) and str(code).isdigit() else str(code)
-
-        logger.info(f"Iniciando geração de sugestões para a vaga: {codigo_vaga}")
-
-        linhas_requisitos = []
-        campos_lista = [
-            "requisitos_obrigatorios",
-            "requisitos_desejaveis",
-            "soft_skills",
-            "hard_skills"
-        ]
-
-        for campo in campos_lista:
-            if campo in analise and isinstance(analise[campo], list):
-                if analise[campo]: # Adiciona apenas se a lista não estiver vazia
-                    linhas_requisitos.append(f"{campo.replace('_',' ').capitalize()}: {', '.join(analise[campo])}")
-        
-        # Adiciona outros campos que não são listas e não foram processados acima
-        for campo, valor in analise.items():
-            if campo not in campos_lista and not isinstance(valor, (list, dict)):
-                linhas_requisitos.append(f"{campo}: {valor}")
-        
-        requisitos_texto = "\n".join(linhas_requisitos)
-
-        if not requisitos_texto.strip():
-            logger.warning(f"Requisitos de vaga vazios para {codigo_vaga}. Pulando geração de sugestões.")
-            continue
-        
-        logger.info(f"Solicitando sugestões IA para vaga {codigo_vaga}...")
-        sugestoes_ia = sugerir_substituicoes(genai_instance, texto_cv, requisitos_texto)
-        time.sleep(3)
-        logger.info(f"Sugestões recebidas para {codigo_vaga}: {sugestoes_ia}")
-
-        # Adição da correção manual da idade (se ainda for necessária)
-        # Idealmente, isso seria configurável ou parte de um pós-processamento separado
-        # if sugestoes_ia is not None:
-        #     sugestoes_ia.append({"original": "Brasileira, solteira, 52 anos, sem filhos",
-        #                          "substituto": "Brasileira, solteira, 53 anos, sem filhos"})
-        #     logger.info(f"Adicionada correção manual da idade. Total de sugestões: {len(sugestoes_ia)}")
-        # else:
-        #     sugestoes_ia = [] # Garante que sugestoes_ia é uma lista
-
-        all_vaga_suggestions.append({
-            "codigo": codigo_vaga,
-            "referencia": referencia, # Manter a referência completa da vaga
-            "sugestoes": sugestoes_ia if sugestoes_ia is not None else []
-        })
+    workers = int(linkedin_config.get("workers_sugestor", WORKERS_PADRAO))
+
+    # O CV é preparado uma vez (cache no servidor ou resumo) e reaproveitado em todos os prompts
+    contexto = preparar_contexto(
+        texto_cv,
+        modo=linkedin_config.get("contexto_cv_sugestor", "auto"),
+        modelo_cache=linkedin_config.get("modelo_cache_contexto", MODELO_CACHE_PADRAO),
+        min_tokens_cache=int(linkedin_config.get("min_tokens_cache_contexto", MIN_TOKENS_CACHE_PADRAO)),
+        ttl_cache=int(linkedin_config.get("ttl_cache_contexto", TTL_CACHE_PADRAO)),
+    )
+
+    # Vagas com requisitos quase iguais podem compartilhar uma única chamada de sugestões
+    agrupador = criar_agrupador(linkedin_config)
+    refinar = bool(linkedin_config.get("refinar_agrupamento", False))
+
+    # As vagas são processadas em paralelo, mas os resultados saem na ordem da entrada
+    for resultado in processar_vagas(genai_instance, texto_cv, vagas_analisadas, workers, contexto,
+                                     agrupador, refinar):
+        if resultado is not None:
+            all_vaga_suggestions.append(resultado)
+
+    if agrupador is not None:
+        relatorio_grupos = agrupador.relatorio(int(linkedin_config.get("amostra_qc_agrupamento", AMOSTRA_QC_PADRAO)))
+        logger.info(
+            f"Agrupamento ({relatorio_grupos['metodo']}, limiar {relatorio_grupos['limiar']}): "
+            f"{relatorio_grupos['vagas']} vagas em {relatorio_grupos['grupos']} grupos; "
+            f"{relatorio_grupos['chamadas_evitadas']} chamadas evitadas, {relatorio_grupos['refinamentos']} refinamentos."
+        )
+        for item in relatorio_grupos["amostra_qc"]:
+            logger.info(f"Amostra QC do agrupamento: {json.dumps(item, ensure_ascii=False)}")
+        saida_grupos = linkedin_config.get("output_file_agrupamento")
+        if saida_grupos:
+            with open(saida_grupos, "w", encoding="utf-8") as f:
+                json.dump(relatorio_grupos, f, ensure_ascii=False, indent=2)
+
+    relatorio = contexto.relatorio(sum(1 for r in all_vaga_suggestions if "erro" not in r))
+    logger.info(
+        f"Contexto do CV ({relatorio['modo']}): ~{relatorio['tokens_por_prompt']} de ~{relatorio['tokens_cv']} "
+        f"tokens do CV por prompt em {relatorio['vagas']} vagas; economia estimada de "
+        f"~{relatorio['tokens_economizados']} tokens de entrada (preparo: ~{relatorio['tokens_preparo']})."
+    )
+
+    erros = sum(1 for r in all_vaga_suggestions if "erro" in r)
+    if erros:
+        logger.warning(f"{erros} de {len(all_vaga_suggestions)} vagas ficaram sem sugestões por erro (campo 'erro').")
 
     # Imprime o JSON consolidado de todas as sugestões para o stdout
-    print(json.dumps(all_vaga_suggestions, ensure_ascii=False, indent=2))
+    emitir(all_vaga_suggestions, "cv_sugestor")
     logger.info("Processo de geração de sugestões finalizado.")
 
 if __name__ == "__main__":
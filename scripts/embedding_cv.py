@@ -0,0 +1,81 @@
+#embedding_cv.py
+"""
+Matriz de embeddings do CV por seção, com cache em disco.
+
+O CV é dividido em parágrafos (e linhas de tabela, via extracao_cv); linhas curtas (títulos como "Experiência" ou
+"Formação") são juntadas ao parágrafo seguinte. Cada seção é embedada uma
+vez e a matriz normalizada fica em <CV_CACHE_DIR>/<sha256 do .docx>_<modelo>_v2.npz:
+enquanto o arquivo do CV não mudar, nenhuma chamada à API é feita para ele.
+"""
+import os
+import sys
+import logging
+
+import numpy as np
+
+from extracao_cv import hash_arquivo, linhas_cv
+from pontuacao_vetorizada import normalizar
+
+# ================= LOGGING SETUP =================
+loglevel = os.environ.get("MY_LOG_LEVEL", "INFO").upper()
+logger = logging.getLogger(__name__)
+logger.setLevel(loglevel)
+
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.propagate = False
+
+DIRETORIO_CACHE = os.environ.get("CV_CACHE_DIR", "logs/cache_cv")
+# Parágrafos com menos caracteres que isso são tratados como título da seção seguinte
+MIN_CARACTERES_SECAO = 40
+# Entra no nome do cache: as seções passaram a incluir as linhas de tabela do CV
+VERSAO_SECOES = 2
+
+
+def dividir_secoes(caminho_docx, min_caracteres=MIN_CARACTERES_SECAO):
+    """Lista as seções de texto do CV (parágrafos e linhas de tabela), na ordem do documento."""
+    secoes = []
+    pendente = []
+    for texto in linhas_cv(caminho_docx):
+        pendente.append(texto)
+        if len(texto) >= min_caracteres:
+            secoes.append("\n".join(pendente))
+            pendente = []
+    if pendente:
+        if secoes:
+            secoes[-1] += "\n" + "\n".join(pendente)
+        else:
+            secoes.append("\n".join(pendente))
+    return secoes
+
+
+def _caminho_cache(hash_cv, modelo):
+    return os.path.join(DIRETORIO_CACHE, f"{hash_cv}_{modelo.replace('/', '_')}_v{VERSAO_SECOES}.npz")
+
+
+def carregar_matriz_cv(caminho_docx, modelo, gerar_embeddings):
+    """
+    Devolve (matriz normalizada float32 seções x dimensão, lista de seções).
+    `gerar_embeddings(textos)` só é chamado quando o .docx não está no cache.
+    """
+    caminho_cache = _caminho_cache(hash_arquivo(caminho_docx), modelo)
+    if os.path.exists(caminho_cache):
+        with np.load(caminho_cache, allow_pickle=False) as dados:
+            logger.info(f"Matriz do CV carregada do cache: {caminho_cache}")
+            return dados["matriz"], dados["secoes"].tolist()
+
+    secoes = dividir_secoes(caminho_docx)
+    if not secoes:
+        raise ValueError(f"CV sem texto: {caminho_docx}")
+    matriz = normalizar(gerar_embeddings(secoes))
+
+    os.makedirs(DIRETORIO_CACHE, exist_ok=True)
+    temporario = f"{caminho_cache}.{os.getpid()}.tmp"
+    with open(temporario, "wb") as f:
+        np.savez(f, matriz=matriz, secoes=np.array(secoes))
+    os.replace(temporario, caminho_cache)
+    logger.info(f"CV dividido em {len(secoes)} seções; matriz gravada em {caminho_cache}")
+    return matriz, secoes
@@ -0,0 +1,163 @@
+#entrada_json.py
+"""
+Leitura em fluxo da entrada JSON dos scripts de etapa (aderência, sugestor,
+aplicador, otimizado).
+
+Em vez de `sys.stdin.read()` + `json.loads` do array inteiro, os itens são
+decodificados um a um à medida que chegam: o processamento começa antes do
+fim da entrada e a memória fica limitada a um bloco de leitura mais o item
+corrente. Formatos aceitos (todos produzem a mesma sequência de itens):
+
+    [ {...}, {...} ]          array JSON (formato atual do n8n)
+    {...}                     objeto único
+    {...}\\n{...}\\n            NDJSON / objetos concatenados
+    [ ... ]\\n[ ... ]           vários arrays seguidos (os itens são achatados)
+
+Um item que seja o manifesto de saida_json (saída grande despejada em
+arquivo) é trocado pelos registros do arquivo indicado, com o sha256 conferido.
+"""
+import os
+import sys
+import json
+import hashlib
+import logging
+
+from saida_json import eh_manifesto
+
+# ================= LOGGING SETUP =================
+loglevel = os.environ.get("MY_LOG_LEVEL", "INFO").upper()
+logger = logging.getLogger(__name__)
+logger.setLevel(loglevel)
+
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.propagate = False
+
+TAMANHO_BLOCO = 1 << 16  # Caracteres lidos por vez da entrada
+_ESPACOS = " \t\r\n\ufeff"
+
+
+class _Leitor:
+    """Buffer sobre o fluxo de texto, descartando o que já foi decodificado."""
+
+    def __init__(self, fluxo, tamanho_bloco):
+        self.fluxo = fluxo
+        self.tamanho_bloco = tamanho_bloco
+        self.buffer = ""
+        self.pos = 0
+        self.fim = False
+        self.decodificador = json.JSONDecoder()
+
+    def encher(self):
+        """Lê mais um bloco. Retorna False no fim da entrada."""
+        if self.fim:
+            return False
+        bloco = self.fluxo.read(self.tamanho_bloco)
+        if not bloco:
+            self.fim = True
+            return False
+        if self.pos:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        self.buffer += bloco
+        return True
+
+    def proximo_caractere(self):
+        """Pula espaços e retorna o próximo caractere sem consumi-lo (None no fim)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _ESPACOS:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.encher():
+                return None
+
+    def consumir(self):
+        self.pos += 1
+
+    def decodificar(self):
+        """Decodifica o próximo valor JSON completo, lendo mais blocos enquanto ele estiver incompleto."""
+        self.proximo_caractere()
+        while True:
+            try:
+                valor, fim = self.decodificador.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.encher():
+                    continue
+                raise
+            # Número ou literal no fim do buffer pode continuar no próximo bloco
+            if fim == len(self.buffer) and self.encher():
+                continue
+            self.pos = fim
+            return valor
+
+    def erro(self, esperado):
+        trecho = self.buffer[self.pos:self.pos + 40]
+        return ValueError(f"JSON inválido na entrada: esperado {esperado}, encontrado {trecho!r}")
+
+
+def ler_manifesto(manifesto):
+    """Registros do .ndjson apontado por um manifesto de saida_json; confere contagem e sha256 ao final."""
+    sha = hashlib.sha256()
+    registros = 0
+    with open(manifesto["arquivo"], "rb") as f:
+        for linha in f:
+            sha.update(linha)
+            if linha.strip():
+                registros += 1
+                yield json.loads(linha)
+    if sha.hexdigest() != manifesto.get("sha256", sha.hexdigest()) or registros != manifesto.get("registros", registros):
+        raise ValueError(f"Arquivo do manifesto corrompido ou incompleto: {manifesto['arquivo']}")
+    logger.info(f"{registros} registros lidos de {manifesto['arquivo']}")
+
+
+def iterar_json(fluxo, tamanho_bloco=TAMANHO_BLOCO):
+    """Gera os itens da entrada um a um (ver formatos no docstring do módulo). Erros de sintaxe viram ValueError."""
+    for item in _iterar_valores(fluxo, tamanho_bloco):
+        if eh_manifesto(item):
+            yield from ler_manifesto(item)
+        else:
+            yield item
+
+
+def _iterar_valores(fluxo, tamanho_bloco):
+    leitor = _Leitor(fluxo, tamanho_bloco)
+    while (caractere := leitor.proximo_caractere()) is not None:
+        if caractere != "[":
+            yield leitor.decodificar()
+            continue
+
+        leitor.consumir()
+        if leitor.proximo_caractere() == "]":
+            leitor.consumir()
+            continue
+        while True:
+            yield leitor.decodificar()
+            caractere = leitor.proximo_caractere()
+            if caractere == ",":
+                leitor.consumir()
+            elif caractere == "]":
+                leitor.consumir()
+                break
+            else:
+                raise leitor.erro("',' ou ']'")
+
+
+def iterar_entrada(caminho=None):
+    """
+    Itens da entrada do script: do arquivo `caminho` ou, sem ele, do stdin.
+    Um erro de leitura no meio do fluxo é registrado e encerra o processo com
+    código 1, como fazia a leitura do JSON inteiro.
+    """
+    try:
+        if caminho is None:
+            yield from iterar_json(sys.stdin)
+        else:
+            with open(caminho, "r", encoding="utf-8") as f:
+                yield from iterar_json(f)
+    except (ValueError, OSError) as e:
+        logger.error(f"Erro ao ler entrada: {e}")
+        sys.exit(1)
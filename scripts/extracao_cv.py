@@ -0,0 +1,179 @@
+#extracao_cv.py
+"""
+Extração do texto do CV (.docx) compartilhada pelos scripts de etapa, com cache.
+
+Cada etapa (aderência, sugestor, otimizado, comparação de CVs) abria o mesmo
+`input_file_cv` com python-docx, e o cv_otimizado fazia isso a cada vaga.
+Aqui o documento é lido uma vez e o resultado fica:
+
+- em memória, por (caminho, mtime, tamanho): chamadas repetidas no mesmo
+  processo não tocam no arquivo;
+- em disco, em <CV_CACHE_DIR>/<sha256 do .docx>_texto.json: as próximas
+  execuções só calculam o hash do arquivo, sem abrir o .docx.
+
+A extração segue a ordem do documento e inclui o texto das tabelas (que a
+leitura só de `document.paragraphs` perdia): cada linha de tabela vira uma
+linha de texto com as células separadas por " | ". A estrutura também fica
+disponível (`blocos`): parágrafos e tabelas com as células de cada linha.
+"""
+import os
+import sys
+import json
+import hashlib
+import logging
+import threading
+
+# ================= LOGGING SETUP =================
+loglevel = os.environ.get("MY_LOG_LEVEL", "INFO").upper()
+logger = logging.getLogger(__name__)
+logger.setLevel(loglevel)
+
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.propagate = False
+
+DIRETORIO_CACHE = os.environ.get("CV_CACHE_DIR", "logs/cache_cv")
+VERSAO_EXTRACAO = 1  # Mude ao alterar o formato extraído: invalida o cache em disco
+SEPARADOR_CELULAS = " | "
+
+_memoria = {}
+_trava = threading.Lock()
+
+
+def hash_arquivo(caminho):
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 16), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def _texto_celula(celula):
+    """Texto de uma célula: parágrafos (e tabelas aninhadas) numa linha só."""
+    partes = []
+    for item in celula.iter_inner_content():
+        if hasattr(item, "rows"):
+            partes.extend(SEPARADOR_CELULAS.join(linha) for linha in _linhas_tabela(item))
+        elif item.text.strip():
+            partes.append(item.text.strip())
+    return " ".join(partes)
+
+
+def _linhas_tabela(tabela):
+    """Células (texto) de cada linha; células mescladas aparecem uma vez só."""
+    linhas = []
+    for linha in tabela.rows:
+        celulas = []
+        vistas = set()
+        for celula in linha.cells:
+            if id(celula._tc) in vistas:
+                continue
+            vistas.add(id(celula._tc))
+            texto = _texto_celula(celula)
+            if texto:
+                celulas.append(texto)
+        if celulas:
+            linhas.append(celulas)
+    return linhas
+
+
+def _ler_docx(caminho):
+    from docx import Document  # Só na falta de cache: no acerto o .docx nem é aberto
+
+    blocos = []
+    for item in Document(caminho).iter_inner_content():
+        if hasattr(item, "rows"):
+            linhas = _linhas_tabela(item)
+            if linhas:
+                blocos.append({"tipo": "tabela", "linhas": linhas})
+        else:
+            blocos.append({"tipo": "paragrafo", "texto": item.text})
+    return blocos
+
+
+def _texto_dos_blocos(blocos):
+    linhas = []
+    for bloco in blocos:
+        if bloco["tipo"] == "tabela":
+            linhas.extend(SEPARADOR_CELULAS.join(celulas) for celulas in bloco["linhas"])
+        else:
+            linhas.append(bloco["texto"])
+    return "\n".join(linhas)
+
+
+def _caminho_cache(hash_cv):
+    return os.path.join(DIRETORIO_CACHE, f"{hash_cv}_texto.json")
+
+
+def _ler_cache(caminho_cache):
+    try:
+        with open(caminho_cache, "r", encoding="utf-8") as f:
+            dados = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return dados if dados.get("versao") == VERSAO_EXTRACAO else None
+
+
+def _gravar_cache(caminho_cache, dados):
+    try:
+        os.makedirs(os.path.dirname(caminho_cache) or ".", exist_ok=True)
+        temporario = f"{caminho_cache}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(dados, f, ensure_ascii=False)
+        os.replace(temporario, caminho_cache)
+    except OSError as e:
+        logger.warning(f"Não foi possível gravar o cache do texto do CV em {caminho_cache}: {e}")
+
+
+def extrair_cv(caminho):
+    """
+    Extração do CV: {"sha256", "texto", "blocos"}. Usa o cache em memória e em
+    disco; o .docx só é aberto quando o conteúdo do arquivo é novo.
+    """
+    caminho_abs = os.path.abspath(caminho)
+    estado = os.stat(caminho_abs)
+    chave = (caminho_abs, estado.st_mtime_ns, estado.st_size)
+    with _trava:
+        if chave in _memoria:
+            return _memoria[chave]
+
+    hash_cv = hash_arquivo(caminho_abs)
+    caminho_cache = _caminho_cache(hash_cv)
+    dados = _ler_cache(caminho_cache)
+    if dados is not None:
+        logger.info(f"Texto do CV carregado do cache: {caminho_cache}")
+    else:
+        blocos = _ler_docx(caminho_abs)
+        dados = {
+            "versao": VERSAO_EXTRACAO,
+            "sha256": hash_cv,
+            "caminho": caminho_abs,
+            "mtime_ns": estado.st_mtime_ns,
+            "texto": _texto_dos_blocos(blocos),
+            "blocos": blocos,
+        }
+        _gravar_cache(caminho_cache, dados)
+        logger.info(f"Texto do CV extraído de {caminho} e guardado em {caminho_cache}")
+
+    with _trava:
+        _memoria[chave] = dados
+    return dados
+
+
+def texto_cv(caminho):
+    """Texto do CV, parágrafos e linhas de tabela na ordem do documento, separados por quebra de linha."""
+    return extrair_cv(caminho)["texto"]
+
+
+def linhas_cv(caminho):
+    """Parágrafos e linhas de tabela não vazios do CV, na ordem do documento e sem espaços nas pontas."""
+    linhas = []
+    for bloco in extrair_cv(caminho)["blocos"]:
+        if bloco["tipo"] == "tabela":
+            linhas.extend(SEPARADOR_CELULAS.join(celulas) for celulas in bloco["linhas"])
+        elif bloco["texto"].strip():
+            linhas.append(bloco["texto"].strip())
+    return linhas
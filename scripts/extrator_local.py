@@ -0,0 +1,351 @@
+#extrator_local.py
+"""
+Extração determinística de requisitos da vaga (caminho rápido sem LLM).
+
+Detecta as seções de requisitos pelos cabeçalhos ("Requisitos:", "Diferenciais:",
+"Requirements"...), lê os itens de lista de cada seção e reconhece hard/soft
+skills com um autômato Aho-Corasick sobre um dicionário de termos. Devolve o
+mesmo schema produzido por analise_vaga_ia.analisar_vaga e uma confiança em
+[0, 1]; o LLM só é chamado quando a confiança fica abaixo do limiar.
+"""
+import os
+import re
+import sys
+import json
+import logging
+import unicodedata
+from collections import deque
+
+# ================= LOGGING SETUP =================
+loglevel = os.environ.get("MY_LOG_LEVEL", "INFO").upper()
+logger = logging.getLogger(__name__)
+logger.setLevel(loglevel)
+
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.propagate = False
+
+# ================= DICIONÁRIOS =================
+# Nome canônico -> variações (já em minúsculas; acentos são ignorados na busca).
+HARD_SKILLS = {
+    "Scrum": ["scrum"],
+    "Kanban": ["kanban"],
+    "Metodologias ágeis": ["metodologias ageis", "metodologia agil", "agile", "agil", "ageis"],
+    "SAFe": ["safe agile", "scaled agile", "safe framework"],
+    "Lean": ["lean"],
+    "Six Sigma": ["six sigma", "lean six sigma"],
+    "PMBOK": ["pmbok"],
+    "PMP": ["pmp"],
+    "Waterfall": ["waterfall", "cascata"],
+    "ITIL": ["itil"],
+    "PMO": ["pmo"],
+    "Gestão de projetos": ["gestao de projetos", "gerenciamento de projetos", "project management"],
+    "Gestão de riscos": ["gestao de riscos", "gerenciamento de riscos", "risk management"],
+    "Gestão de stakeholders": ["gestao de stakeholders", "stakeholder management", "gestao de partes interessadas"],
+    "Gestão de orçamento": ["gestao de orcamento", "controle de orcamento", "budget management", "budgeting"],
+    "Jira": ["jira"],
+    "Confluence": ["confluence"],
+    "MS Project": ["ms project", "microsoft project"],
+    "Trello": ["trello"],
+    "Azure DevOps": ["azure devops"],
+    "Power BI": ["power bi", "powerbi"],
+    "Excel": ["excel"],
+    "SQL": ["sql"],
+    "Python": ["python"],
+    "Java": ["java"],
+    "JavaScript": ["javascript", "js"],
+    "C#": ["c#"],
+    ".NET": [".net", "dotnet"],
+    "Node.js": ["node.js", "nodejs"],
+    "React": ["react", "react.js"],
+    "Docker": ["docker"],
+    "Kubernetes": ["kubernetes", "k8s"],
+    "AWS": ["aws", "amazon web services"],
+    "Azure": ["azure", "microsoft azure"],
+    "GCP": ["gcp", "google cloud"],
+    "Git": ["git"],
+    "SAP": ["sap"],
+    "Salesforce": ["salesforce"],
+    "OKR": ["okr", "okrs"],
+    "KPI": ["kpi", "kpis", "indicadores de desempenho"],
+    "Inglês": ["ingles", "english"],
+    "Espanhol": ["espanhol", "spanish"],
+}
+
+SOFT_SKILLS = {
+    "Comunicação": ["comunicacao", "communication", "comunicativo", "comunicativa"],
+    "Liderança": ["lideranca", "leadership"],
+    "Negociação": ["negociacao", "negotiation"],
+    "Trabalho em equipe": ["trabalho em equipe", "teamwork", "team player"],
+    "Proatividade": ["proatividade", "proativo", "proativa", "proactive"],
+    "Organização": ["organizacao", "organizado", "organizada", "organized"],
+    "Resolução de problemas": ["resolucao de problemas", "problem solving", "problem-solving"],
+    "Pensamento analítico": ["pensamento analitico", "analytical thinking", "perfil analitico"],
+    "Adaptabilidade": ["adaptabilidade", "flexibilidade", "adaptability"],
+    "Gestão de conflitos": ["gestao de conflitos", "conflict management"],
+    "Autonomia": ["autonomia", "autonomo", "autonoma"],
+    "Facilitação": ["facilitacao", "facilitation"],
+}
+
+# Cabeçalhos de seção -> tipo ("obrigatorios", "desejaveis" ou None para seções que encerram a lista).
+CABECALHOS_SECAO = {
+    "requisitos": "obrigatorios",
+    "requisitos obrigatorios": "obrigatorios",
+    "requisitos e qualificacoes": "obrigatorios",
+    "qualificacoes": "obrigatorios",
+    "pre-requisitos": "obrigatorios",
+    "o que esperamos de voce": "obrigatorios",
+    "o que buscamos": "obrigatorios",
+    "o que voce precisa ter": "obrigatorios",
+    "conhecimentos necessarios": "obrigatorios",
+    "requirements": "obrigatorios",
+    "required qualifications": "obrigatorios",
+    "qualifications": "obrigatorios",
+    "must have": "obrigatorios",
+    "what we're looking for": "obrigatorios",
+    "what you need": "obrigatorios",
+    "diferenciais": "desejaveis",
+    "requisitos desejaveis": "desejaveis",
+    "desejavel": "desejaveis",
+    "desejaveis": "desejaveis",
+    "sera um diferencial": "desejaveis",
+    "sera um plus": "desejaveis",
+    "nice to have": "desejaveis",
+    "preferred qualifications": "desejaveis",
+    "bonus points": "desejaveis",
+    "responsabilidades": None,
+    "atribuicoes": None,
+    "atividades": None,
+    "principais atividades": None,
+    "o que voce vai fazer": None,
+    "responsibilities": None,
+    "what you will do": None,
+    "what you'll do": None,
+    "beneficios": None,
+    "benefits": None,
+    "sobre nos": None,
+    "about us": None,
+    "local de trabalho": None,
+    "informacoes adicionais": None,
+}
+
+SENIORIDADES = (
+    ("Especialista", ("especialista", "specialist")),
+    ("Sênior", ("senior", "sr")),
+    ("Pleno", ("pleno", "mid-level", "mid level")),
+    ("Júnior", ("junior", "jr")),
+    ("Coordenação", ("coordenador", "coordenadora", "coordinator")),
+    ("Gerência", ("gerente", "manager")),
+)
+
+# Termos casados como palavras inteiras ("sr" não casa em "srta", "senior" não casa em "senioridade")
+_RE_SENIORIDADES = [
+    (rotulo, re.compile(r"\b(?:" + "|".join(re.escape(termo) for termo in termos) + r")\b"))
+    for rotulo, termos in SENIORIDADES
+]
+
+_RE_MARCADOR = re.compile(r"^\s*(?:[-•*·▪●◦–—]|\d{1,2}[.)])\s*")
+_MAX_PALAVRAS_CABECALHO = 7
+_MAX_PALAVRAS_ITEM = 30
+
+
+def _sem_acentos(texto):
+    texto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+# ================= AHO-CORASICK =================
+
+class AutomatoAhoCorasick:
+    """Autômato de busca de múltiplos padrões em uma única passada pelo texto."""
+
+    def __init__(self):
+        self._transicoes = [{}]
+        self._falha = [0]
+        self._saidas = [[]]
+
+    def adicionar(self, padrao, valor):
+        estado = 0
+        for caractere in padrao:
+            proximo = self._transicoes[estado].get(caractere)
+            if proximo is None:
+                proximo = len(self._transicoes)
+                self._transicoes[estado][caractere] = proximo
+                self._transicoes.append({})
+                self._falha.append(0)
+                self._saidas.append([])
+            estado = proximo
+        self._saidas[estado].append((len(padrao), valor))
+
+    def construir(self):
+        fila = deque(self._transicoes[0].values())
+        while fila:
+            estado = fila.popleft()
+            for caractere, proximo in self._transicoes[estado].items():
+                fila.append(proximo)
+                falha = self._falha[estado]
+                while falha and caractere not in self._transicoes[falha]:
+                    falha = self._falha[falha]
+                destino = self._transicoes[falha].get(caractere, 0)
+                self._falha[proximo] = destino if destino != proximo else 0
+                self._saidas[proximo].extend(self._saidas[self._falha[proximo]])
+        return self
+
+    def buscar(self, texto):
+        """Gera (inicio, fim, valor) para cada ocorrência de padrão em `texto`."""
+        estado = 0
+        for posicao, caractere in enumerate(texto):
+            while estado and caractere not in self._transicoes[estado]:
+                estado = self._falha[estado]
+            estado = self._transicoes[estado].get(caractere, 0)
+            for tamanho, valor in self._saidas[estado]:
+                yield posicao - tamanho + 1, posicao + 1, valor
+
+
+def _eh_limite(texto, indice):
+    """Fim do texto ou caractere não alfanumérico; um ponto entre alfanuméricos (node.js, asp.net) não separa palavras."""
+    if indice < 0 or indice >= len(texto):
+        return True
+    if texto[indice] == "." and 0 < indice < len(texto) - 1 and texto[indice - 1].isalnum() and texto[indice + 1].isalnum():
+        return False
+    return not texto[indice].isalnum()
+
+
+def construir_automato(hard_skills=None, soft_skills=None):
+    automato = AutomatoAhoCorasick()
+    for tipo, dicionario in (("hard", hard_skills or HARD_SKILLS), ("soft", soft_skills or SOFT_SKILLS)):
+        for canonico, variacoes in dicionario.items():
+            for variacao in set(variacoes) | {_sem_acentos(canonico)}:
+                automato.adicionar(_sem_acentos(variacao), (tipo, canonico))
+    return automato.construir()
+
+
+def carregar_dicionario_extra(caminho):
+    """Lê um JSON {"hard_skills": {...}, "soft_skills": {...}} e mescla com os dicionários padrão."""
+    with open(caminho, "r", encoding="utf-8") as f:
+        extra = json.load(f)
+    hard = {**HARD_SKILLS, **extra.get("hard_skills", {})}
+    soft = {**SOFT_SKILLS, **extra.get("soft_skills", {})}
+    return hard, soft
+
+
+_AUTOMATO_PADRAO = None
+
+
+def _automato_padrao():
+    global _AUTOMATO_PADRAO
+    if _AUTOMATO_PADRAO is None:
+        _AUTOMATO_PADRAO = construir_automato()
+    return _AUTOMATO_PADRAO
+
+
+def encontrar_skills(texto, automato=None):
+    """Retorna (hard_skills, soft_skills) na ordem em que aparecem no texto."""
+    automato = automato or _automato_padrao()
+    normalizado = _sem_acentos(texto)
+    encontrados = {"hard": [], "soft": []}
+    for inicio, fim, (tipo, canonico) in automato.buscar(normalizado):
+        if not (_eh_limite(normalizado, inicio - 1) and _eh_limite(normalizado, fim)):
+            continue
+        if canonico not in encontrados[tipo]:
+            encontrados[tipo].append(canonico)
+    return encontrados["hard"], encontrados["soft"]
+
+
+# ================= SEÇÕES =================
+
+def _tipo_cabecalho(linha):
+    normalizada = _sem_acentos(linha).strip().strip(" :-–—•*#|").strip()
+    normalizada = re.sub(r"\s+", " ", normalizada)
+    if not normalizada or len(normalizada.split()) > _MAX_PALAVRAS_CABECALHO:
+        return False, None
+    if normalizada in CABECALHOS_SECAO:
+        return True, CABECALHOS_SECAO[normalizada]
+    # Qualquer linha curta terminada em ':' também abre (e encerra) uma seção
+    if linha.rstrip().endswith(":"):
+        return True, None
+    return False, None
+
+
+def extrair_secoes(texto):
+    """Agrupa os itens de lista por seção: {"obrigatorios": [...], "desejaveis": [...]}."""
+    secoes = {"obrigatorios": [], "desejaveis": []}
+    atual = None
+    for linha in texto.splitlines():
+        if not linha.strip():
+            continue
+        eh_cabecalho, tipo = _tipo_cabecalho(linha)
+        if eh_cabecalho:
+            atual = tipo
+            continue
+        if atual is None:
+            continue
+        item = _RE_MARCADOR.sub("", linha).strip().rstrip(";.")
+        if item and len(item.split()) <= _MAX_PALAVRAS_ITEM and item not in secoes[atual]:
+            secoes[atual].append(item)
+    return secoes
+
+
+def detectar_senioridade(*textos):
+    """
+    Senioridade pelo primeiro texto que a indica: chame com o título antes da
+    descrição, que só é lida quando o título não diz nada (uma descrição cita
+    "gerente" ou "sênior" por muitos motivos além do nível da vaga).
+    """
+    for texto in textos:
+        if not texto:
+            continue
+        normalizado = _sem_acentos(texto)
+        for rotulo, padrao in _RE_SENIORIDADES:
+            if padrao.search(normalizado):
+                return rotulo
+    return ""
+
+
+# ================= EXTRAÇÃO =================
+
+def calcular_confianca(secoes, hard_skills, titulo):
+    """Heurística simples: quanto da estrutura esperada foi encontrada no texto."""
+    obrigatorios = secoes["obrigatorios"]
+    confianca = 0.0
+    if len(obrigatorios) >= 3:
+        confianca += 0.45
+    elif obrigatorios:
+        confianca += 0.2
+    if secoes["desejaveis"]:
+        confianca += 0.1
+    if len(hard_skills) >= 3:
+        confianca += 0.2
+    elif hard_skills:
+        confianca += 0.1
+    if obrigatorios:
+        # Itens curtos e objetivos indicam lista de requisitos "limpa"
+        media_palavras = sum(len(i.split()) for i in obrigatorios) / len(obrigatorios)
+        if media_palavras <= 12:
+            confianca += 0.15
+    if titulo:
+        confianca += 0.1
+    return round(min(confianca, 1.0), 2)
+
+
+def extrair_analise_local(texto_vaga, titulo="", localizacao="", automato=None):
+    """
+    Produz a análise no mesmo schema de analisar_vaga, sem chamar o LLM.
+    Retorna (analise, confianca).
+    """
+    secoes = extrair_secoes(texto_vaga)
+    hard_skills, soft_skills = encontrar_skills(texto_vaga, automato)
+
+    analise = {
+        "titulo": titulo or "",
+        "localizacao": localizacao or "",
+        "senioridade": detectar_senioridade(titulo, texto_vaga),
+        "requisitos_obrigatorios": secoes["obrigatorios"],
+        "requisitos_desejaveis": secoes["desejaveis"],
+        "soft_skills": soft_skills,
+        "hard_skills": hard_skills,
+    }
+    return analise, calcular_confianca(secoes, hard_skills, titulo)
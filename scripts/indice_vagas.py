@@ -0,0 +1,423 @@
+#indice_vagas.py
+"""
+Índice vetorial aproximado (IVF em NumPy puro) do histórico de vagas.
+
+Cada vaga pontuada pelo aderencia_cv_vaga_ia.py entra no índice com um vetor:
+a média normalizada dos embeddings dos seus requisitos. As vagas são
+agrupadas em listas invertidas por k-means esférico; a consulta compara o
+vetor de busca só com os centróides e com as vagas das `n_sondas` listas mais
+próximas, em vez do histórico inteiro.
+
+Inserções são incrementais: vagas novas vão para a lista do centróide mais
+próximo (uma vaga já indexada é substituída) e o índice é retreinado quando
+cresce além de FATOR_RETREINO vezes o tamanho do último treino. Os vetores
+ficam no armazém quantizado em memmap (armazem_embeddings.py, int8 por padrão).
+
+Salvar após uma inserção só grava o lote: vetores e ids são anexados no
+armazém, a lista de cada vaga é anexada (ou corrigida no lugar) em
+atribuicao.bin e os metadados vão para o log metadados.ndjson, em que vale a
+última linha de cada id. Só o retreino reescreve tudo (centróides em
+indice.npz, atribuicao.bin inteiro e o log compactado); como ele acontece a
+cada FATOR_RETREINO vezes o tamanho, o custo por vaga inserida é constante.
+
+Consulta pela linha de comando (usa o modelo de embedding do config):
+    python scripts/indice_vagas.py --cv "dados/cv/CV.docx" --k 20
+    python scripts/indice_vagas.py --texto "gestão de projetos ágeis, Scrum, Jira"
+"""
+import os
+import sys
+import json
+import time
+import fcntl
+import logging
+import argparse
+from contextlib import contextmanager
+
+import numpy as np
+
+from armazem_embeddings import ArmazemEmbeddings, FORMATO_PADRAO
+from pontuacao_vetorizada import normalizar
+
+# ================= LOGGING SETUP =================
+loglevel = os.environ.get("MY_LOG_LEVEL", "INFO").upper()
+logger = logging.getLogger(__name__)
+logger.setLevel(loglevel)
+
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.propagate = False
+
+DIRETORIO_PADRAO = "dados/indice_vagas"
+N_SONDAS_PADRAO = 8
+MIN_VETORES_TREINO = 1000   # Abaixo disso a busca é exata (uma lista só)
+FATOR_RETREINO = 2.0
+ITERACOES_KMEANS = 10
+TAMANHO_BLOCO = 8192        # Linhas por bloco nas multiplicações grandes
+AMOSTRA_POR_LISTA = 64      # Vetores por lista na amostra de treino do k-means
+
+
+def _mais_proximo(vetores, centroides):
+    """Índice do centróide de maior similaridade para cada vetor, em blocos."""
+    resultado = np.empty(len(vetores), dtype=np.int64)
+    for i in range(0, len(vetores), TAMANHO_BLOCO):
+        resultado[i:i + TAMANHO_BLOCO] = np.argmax(vetores[i:i + TAMANHO_BLOCO] @ centroides.T, axis=1)
+    return resultado
+
+
+def kmeans_esferico(vetores, n_listas, iteracoes=ITERACOES_KMEANS, semente=0):
+    rng = np.random.default_rng(semente)
+    centroides = vetores[rng.choice(len(vetores), size=n_listas, replace=False)].copy()
+    for _ in range(iteracoes):
+        atribuicao = _mais_proximo(vetores, centroides)
+        somas = np.zeros_like(centroides)
+        np.add.at(somas, atribuicao, vetores)
+        vazios = ~somas.any(axis=1)
+        # Lista vazia recebe um vetor aleatório para não desperdiçar o centróide
+        somas[vazios] = vetores[rng.choice(len(vetores), size=int(vazios.sum()))]
+        centroides = normalizar(somas)
+    return centroides
+
+
+class IndiceVagas:
+    """
+    Índice IVF em <diretorio>: vetores no armazém quantizado (vetores/),
+    centróides em indice.npz, a lista de cada vaga em atribuicao.bin e
+    título/empresa/link no log metadados.ndjson.
+    """
+
+    def __init__(self, diretorio=DIRETORIO_PADRAO, formato=FORMATO_PADRAO):
+        self.diretorio = diretorio
+        self.modelo = None          # Backend/modelo de embedding dos vetores indexados
+        self.armazem = ArmazemEmbeddings(os.path.join(diretorio, "vetores"), formato)
+        self.centroides = None
+        self.atribuicao = np.empty(0, dtype=np.int64)
+        self.tamanho_treino = 0
+        self._listas = None
+        self._metadados = None      # Lido do log só quando consultado
+        self._metadados_pendentes = []
+        self._atribuicao_gravada = 0  # Posições de atribuicao.bin já em disco
+        self._alteradas = []          # Posições já gravadas que mudaram de lista
+        self._modelo_gravado = None
+        self._retreinado = False
+
+    def _caminho(self, nome):
+        return os.path.join(self.diretorio, nome)
+
+    def __len__(self):
+        return len(self.armazem)
+
+    @property
+    def ids(self):
+        return self.armazem.ids
+
+    @property
+    def metadados(self):
+        if self._metadados is None:
+            self._metadados = {}
+            if os.path.exists(self._caminho("metadados.ndjson")):
+                with open(self._caminho("metadados.ndjson"), "r", encoding="utf-8") as f:
+                    for linha in f:
+                        try:
+                            registro = json.loads(linha)
+                        except ValueError:
+                            continue  # Linha cortada por um append interrompido
+                        self._metadados[registro["id"]] = registro["meta"]
+            for id_vaga, meta in self._metadados_pendentes:
+                self._metadados[id_vaga] = meta
+        return self._metadados
+
+    # ---------- persistência ----------
+
+    @classmethod
+    def carregar(cls, diretorio=DIRETORIO_PADRAO, formato=FORMATO_PADRAO):
+        indice = cls(diretorio, formato)
+        caminho = indice._caminho("indice.npz")
+        if os.path.exists(caminho):
+            with np.load(caminho, allow_pickle=False) as dados:
+                indice.centroides = dados["centroides"] if dados["centroides"].size else None
+                indice.tamanho_treino = int(dados["tamanho_treino"])
+                indice.modelo = str(dados["modelo"]) or None
+            indice._modelo_gravado = indice.modelo
+        if os.path.exists(indice._caminho("atribuicao.bin")):
+            indice.atribuicao = np.fromfile(indice._caminho("atribuicao.bin"), dtype=np.int64)[:len(indice)]
+        indice._atribuicao_gravada = len(indice.atribuicao)
+        # Vetores gravados no armazém sem o salvar() correspondente entram na lista mais próxima
+        if len(indice.atribuicao) < len(indice):
+            indice._reatribuir(np.arange(len(indice.atribuicao), len(indice)))
+        return indice
+
+    def _gravar_substituindo(self, nome, gravar):
+        temporario = f"{self._caminho(nome)}.{os.getpid()}.tmp"
+        with open(temporario, "wb") as f:
+            gravar(f)
+        os.replace(temporario, self._caminho(nome))
+
+    def salvar(self):
+        """Grava o que mudou desde o último carregar/salvar; só o retreino reescreve os arquivos inteiros."""
+        if not len(self):
+            return
+        os.makedirs(self.diretorio, exist_ok=True)
+
+        if self._retreinado or self.modelo != self._modelo_gravado:
+            self._gravar_substituindo("indice.npz", lambda f: np.savez(
+                f,
+                centroides=self.centroides if self.centroides is not None else np.empty((0, 0), np.float32),
+                tamanho_treino=np.int64(self.tamanho_treino),
+                modelo=np.array(self.modelo or ""),
+            ))
+            self._modelo_gravado = self.modelo
+
+        if self._retreinado or not os.path.exists(self._caminho("atribuicao.bin")):
+            self._gravar_substituindo("atribuicao.bin", lambda f: f.write(self.atribuicao.tobytes()))
+        else:
+            alteradas = np.unique(np.concatenate(self._alteradas)) if self._alteradas else []
+            if len(alteradas):
+                mapa = np.memmap(self._caminho("atribuicao.bin"), dtype=np.int64, mode="r+",
+                                 shape=(self._atribuicao_gravada,))
+                mapa[alteradas] = self.atribuicao[alteradas]
+                mapa.flush()
+            with open(self._caminho("atribuicao.bin"), "r+b") as f:
+                # Descarta sobras de um append interrompido antes de gravar
+                f.truncate(self._atribuicao_gravada * 8)
+                f.seek(self._atribuicao_gravada * 8)
+                f.write(self.atribuicao[self._atribuicao_gravada:].tobytes())
+        self._atribuicao_gravada = len(self.atribuicao)
+        self._alteradas = []
+
+        if self._retreinado:
+            # Compacta o log de metadados: uma linha por vaga
+            metadados = self.metadados
+            self._gravar_substituindo("metadados.ndjson", lambda f: f.write("".join(
+                json.dumps({"id": id_vaga, "meta": meta}, ensure_ascii=False) + "\n"
+                for id_vaga, meta in metadados.items()
+            ).encode("utf-8")))
+        elif self._metadados_pendentes:
+            with open(self._caminho("metadados.ndjson"), "a", encoding="utf-8") as f:
+                f.write("".join(
+                    json.dumps({"id": id_vaga, "meta": meta}, ensure_ascii=False) + "\n"
+                    for id_vaga, meta in self._metadados_pendentes
+                ))
+        self._metadados_pendentes = []
+        self._retreinado = False
+
+    # ---------- construção ----------
+
+    def treinar(self, n_listas=None):
+        """(Re)agrupa todas as vagas em `n_listas` listas invertidas (padrão: √N)."""
+        n = len(self)
+        if n < MIN_VETORES_TREINO:
+            self.centroides = None
+            self.atribuicao = np.zeros(n, dtype=np.int64)
+        else:
+            n_listas = n_listas or max(1, int(np.sqrt(n)))
+            inicio = time.perf_counter()
+            # O k-means roda numa amostra; a atribuição final percorre o armazém em blocos
+            rng = np.random.default_rng(0)
+            amostra = np.sort(rng.choice(n, size=min(n, AMOSTRA_POR_LISTA * n_listas), replace=False))
+            self.centroides = kmeans_esferico(self.armazem.vetores(amostra), n_listas)
+            self.atribuicao = np.empty(n, dtype=np.int64)
+            self._reatribuir(np.arange(n))
+            logger.info(f"Índice treinado: {n} vagas em {n_listas} listas ({time.perf_counter() - inicio:.1f}s).")
+        self.tamanho_treino = n
+        self._listas = None
+        self._retreinado = True
+
+    def _reatribuir(self, posicoes):
+        if len(self.atribuicao) < len(self):
+            self.atribuicao = np.concatenate(
+                [self.atribuicao, np.zeros(len(self) - len(self.atribuicao), dtype=np.int64)]
+            )
+        if self.centroides is not None:
+            for i in range(0, len(posicoes), TAMANHO_BLOCO):
+                bloco = posicoes[i:i + TAMANHO_BLOCO]
+                self.atribuicao[bloco] = _mais_proximo(self.armazem.vetores(bloco), self.centroides)
+        self._alteradas.append(posicoes[posicoes < self._atribuicao_gravada])
+        self._listas = None
+
+    def adicionar(self, ids, vetores, metadados=None):
+        """Insere (ou substitui) vagas. `vetores` é normalizado aqui."""
+        vetores = normalizar(vetores).reshape(len(ids), -1)
+        posicoes = self.armazem.adicionar(ids, vetores)
+        if metadados:
+            for id_vaga, meta in zip(ids, metadados):
+                self._metadados_pendentes.append((str(id_vaga), meta))
+                if self._metadados is not None:
+                    self._metadados[str(id_vaga)] = meta
+
+        precisa_treino = (
+            self.tamanho_treino == 0
+            or len(self) > FATOR_RETREINO * self.tamanho_treino
+            or (self.centroides is None and len(self) >= MIN_VETORES_TREINO)
+        )
+        if precisa_treino:
+            self.treinar()
+        else:
+            # Reatribui só o que mudou; o resto das listas fica como está
+            self._reatribuir(np.unique(posicoes))
+
+    # ---------- consulta ----------
+
+    def _listas_invertidas(self):
+        if self._listas is None:
+            ordem = np.argsort(self.atribuicao, kind="stable")
+            n_listas = len(self.centroides) if self.centroides is not None else 1
+            limites = np.searchsorted(self.atribuicao[ordem], np.arange(n_listas + 1))
+            self._listas = [ordem[limites[i]:limites[i + 1]] for i in range(n_listas)]
+        return self._listas
+
+    def buscar(self, consulta, k=10, n_sondas=N_SONDAS_PADRAO):
+        """
+        Top-k vagas mais similares a `consulta` (vetor, ou matriz de seções do CV,
+        que é reduzida à média). Retorna lista de (id, score) em ordem decrescente.
+        """
+        if not len(self):
+            return []
+        consulta = normalizar(consulta)
+        if consulta.ndim == 2:
+            consulta = normalizar(consulta.mean(axis=0))
+
+        listas = self._listas_invertidas()
+        if self.centroides is None:
+            candidatos = listas[0]
+        else:
+            n_sondas = min(n_sondas, len(listas))
+            sondas = np.argpartition(-(self.centroides @ consulta), n_sondas - 1)[:n_sondas]
+            candidatos = np.sort(np.concatenate([listas[i] for i in sondas]))
+
+        scores = self.armazem.produto(consulta, candidatos)
+        k = min(k, len(candidatos))
+        melhores = np.argpartition(-scores, k - 1)[:k]
+        melhores = melhores[np.argsort(-scores[melhores])]
+        return [(self.ids[candidatos[i]], float(scores[i])) for i in melhores]
+
+
+@contextmanager
+def _bloqueio(diretorio):
+    """Serializa carregar/alterar/salvar entre processos (o n8n roda um aderencia por vaga)."""
+    os.makedirs(diretorio, exist_ok=True)
+    with open(os.path.join(diretorio, ".lock"), "w") as trava:
+        fcntl.flock(trava, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(trava, fcntl.LOCK_UN)
+
+
+def _assinatura(diretorio):
+    """(mtime, tamanho) de vetores.bin e indice.npz: toda inserção ou retreino muda algum dos dois."""
+    assinatura = []
+    for caminho in (os.path.join(diretorio, "vetores", "vetores.bin"), os.path.join(diretorio, "indice.npz")):
+        try:
+            estado = os.stat(caminho)
+            assinatura.append((estado.st_mtime_ns, estado.st_size))
+        except FileNotFoundError:
+            assinatura.append(None)
+    return tuple(assinatura)
+
+
+class IndiceAberto:
+    """
+    Índice mantido em memória entre inserções (uma execução com vários lotes,
+    ou o servidor_aderencia entre requisições). Só é recarregado do disco
+    quando outro processo gravou nele desde a última inserção daqui.
+    """
+
+    def __init__(self, diretorio=DIRETORIO_PADRAO, formato=FORMATO_PADRAO):
+        self.diretorio = diretorio
+        self.formato = formato
+        self.indice = None
+        self._assinatura = None
+
+    def abrir(self):
+        """Carrega o índice já, sob bloqueio (senão ele é carregado na primeira inserção)."""
+        with _bloqueio(self.diretorio):
+            self._atualizar()
+        return self
+
+    def _atualizar(self):
+        if self.indice is None or _assinatura(self.diretorio) != self._assinatura:
+            self.indice = IndiceVagas.carregar(self.diretorio, self.formato)
+            self._assinatura = _assinatura(self.diretorio)
+
+    def adicionar(self, modelo, ids, vetores, metadados=None):
+        """Insere as vagas e grava só o que mudou, sob bloqueio de arquivo."""
+        if not len(ids):
+            return
+        with _bloqueio(self.diretorio):
+            self._atualizar()
+            indice = self.indice
+            if indice.modelo and indice.modelo != modelo:
+                logger.warning(
+                    f"Índice em {self.diretorio} foi criado com '{indice.modelo}', não com '{modelo}'; "
+                    "vagas não indexadas (use outro diretorio_indice_vagas)."
+                )
+                return
+            indice.modelo = modelo
+            indice.adicionar(ids, vetores, metadados)
+            indice.salvar()
+            self._assinatura = _assinatura(self.diretorio)
+        logger.info(f"{len(ids)} vagas adicionadas ao índice ({len(indice)} no total).")
+
+
+def adicionar_ao_indice(diretorio, modelo, ids, vetores, metadados=None, formato=FORMATO_PADRAO):
+    """Carrega o índice, insere as vagas e salva, sob bloqueio de arquivo."""
+    IndiceAberto(diretorio, formato).adicionar(modelo, ids, vetores, metadados)
+
+
+# ================= USO PELA LINHA DE COMANDO =================
+
+def main():
+    parser = argparse.ArgumentParser(description="Consulta o índice de vagas pelo CV ou por texto livre.")
+    grupo = parser.add_mutually_exclusive_group(required=True)
+    grupo.add_argument("--cv", help="Caminho do CV (.docx)")
+    grupo.add_argument("--texto", help="Texto livre de busca")
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--sondas", type=int, default=N_SONDAS_PADRAO)
+    args = parser.parse_args()
+
+    config_path = os.environ.get('CONFIG_JSON_PATH', 'configs/linkedin.json')
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    indice = IndiceVagas.carregar(config.get('diretorio_indice_vagas', DIRETORIO_PADRAO))
+    if not len(indice):
+        logger.error("Índice de vagas vazio: rode o aderencia_cv_vaga_ia.py antes.")
+        sys.exit(1)
+
+    # Importados aqui para que carregar/salvar o índice não dependa do backend de embedding
+    import cache_embedding
+    from backends_embedding import criar_backend
+    from embedding_cv import carregar_matriz_cv
+
+    backend = criar_backend(config)
+    if indice.modelo and indice.modelo != backend.nome:
+        logger.error(f"Índice criado com '{indice.modelo}', mas o config usa '{backend.nome}'.")
+        sys.exit(1)
+
+    def gerar(textos):
+        if not backend.usar_cache:
+            return backend.gerar(textos, etapa="indice_consulta")
+        return cache_embedding.obter_ou_calcular(
+            textos, backend.nome, lambda faltantes: backend.gerar(faltantes, etapa="indice_consulta")
+        )
+
+    if args.cv:
+        consulta, _ = carregar_matriz_cv(args.cv, backend.nome, gerar)
+    else:
+        consulta = gerar([args.texto])[0]
+
+    inicio = time.perf_counter()
+    resultados = indice.buscar(consulta, k=args.k, n_sondas=args.sondas)
+    logger.info(f"Busca em {len(indice)} vagas: {(time.perf_counter() - inicio) * 1000:.1f} ms")
+    print(json.dumps(
+        [{"codigo": id_vaga, "score": round(score, 4), **indice.metadados.get(id_vaga, {})}
+         for id_vaga, score in resultados],
+        ensure_ascii=False, indent=2,
+    ))
+
+
+if __name__ == "__main__":
+    main()
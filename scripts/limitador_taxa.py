@@ -0,0 +1,193 @@
+#limitador_taxa.py
+"""
+Limitador de taxa compartilhado entre processos para as chamadas ao Gemini e
+aos embeddings do Vertex.
+
+O n8n roda cv_sugestor.py e aderencia_cv_vaga_ia.py em paralelo, além do
+analise_vaga_ia.py. Em vez de cada script pausar com o seu próprio
+time.sleep, todos retiram fichas de um token bucket guardado num SQLite
+local: a transação BEGIN IMMEDIATE serializa o acesso entre processos e threads.
+
+A taxa é adaptativa (AIMD): cada sucesso aumenta a taxa um pouco até o
+máximo configurado; cada 429 corta a taxa pela metade e bloqueia o balde
+até o Retry-After informado pela API.
+"""
+import os
+import re
+import sys
+import time
+import sqlite3
+import logging
+
+# ================= LOGGING SETUP =================
+loglevel = os.environ.get("MY_LOG_LEVEL", "INFO").upper()
+logger = logging.getLogger(__name__)
+logger.setLevel(loglevel)
+
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.propagate = False
+
+# ================= CONFIGURAÇÃO =================
+CAMINHO_DB = os.environ.get("LIMITADOR_TAXA_DB", "logs/limitador_taxa.sqlite")
+DESATIVADO = os.environ.get("LIMITADOR_TAXA_DESATIVADO", "").lower() in ("1", "true", "sim")
+
+# nome do balde -> (requisições por minuto, rajada máxima)
+BALDES = {
+    "gemini": (float(os.environ.get("GEMINI_RPM", "60")), float(os.environ.get("GEMINI_BURST", "5"))),
+    "vertex_embeddings": (float(os.environ.get("VERTEX_EMBEDDING_RPM", "600")),
+                          float(os.environ.get("VERTEX_EMBEDDING_BURST", "20"))),
+}
+
+FATOR_REDUCAO = 0.5          # Multiplica a taxa a cada 429
+INCREMENTO_POR_SUCESSO = 0.02  # Fração da taxa máxima somada a cada sucesso
+TAXA_MINIMA_FRACAO = 0.05    # Nunca desce abaixo de 5% da taxa máxima
+ESPERA_PADRAO_429 = 10.0     # Segundos de bloqueio quando a API não informa Retry-After
+
+_RE_RETRY_EM = re.compile(r"retry (?:in|after) (\d+(?:\.\d+)?)\s*s", re.IGNORECASE)
+
+
+def _conectar():
+    diretorio = os.path.dirname(CAMINHO_DB)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    conexao = sqlite3.connect(CAMINHO_DB, timeout=30, isolation_level=None)
+    conexao.execute(
+        "CREATE TABLE IF NOT EXISTS baldes ("
+        " nome TEXT PRIMARY KEY, fichas REAL, taxa REAL, atualizado REAL, bloqueado_ate REAL)"
+    )
+    return conexao
+
+
+def _config_balde(nome):
+    rpm, rajada = BALDES.get(nome, (60.0, 5.0))
+    return rpm / 60.0, max(rajada, 1.0)
+
+
+def _ler_balde(conexao, nome, agora):
+    """Lê o balde (criando se preciso) já com as fichas reabastecidas até `agora`."""
+    taxa_max, capacidade = _config_balde(nome)
+    linha = conexao.execute(
+        "SELECT fichas, taxa, atualizado, bloqueado_ate FROM baldes WHERE nome = ?", (nome,)
+    ).fetchone()
+    if linha is None:
+        return capacidade, taxa_max, 0.0
+    fichas, taxa, atualizado, bloqueado_ate = linha
+    taxa = min(taxa, taxa_max)
+    fichas = min(capacidade, fichas + max(0.0, agora - atualizado) * taxa)
+    return fichas, taxa, bloqueado_ate
+
+
+def _gravar_balde(conexao, nome, fichas, taxa, agora, bloqueado_ate):
+    conexao.execute(
+        "INSERT INTO baldes (nome, fichas, taxa, atualizado, bloqueado_ate) VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT(nome) DO UPDATE SET fichas = excluded.fichas, taxa = excluded.taxa, "
+        "atualizado = excluded.atualizado, bloqueado_ate = excluded.bloqueado_ate",
+        (nome, fichas, taxa, agora, bloqueado_ate),
+    )
+
+
+# ================= API PÚBLICA =================
+
+def adquirir(nome, custo=1.0):
+    """Bloqueia até haver `custo` fichas no balde `nome` e as consome. Retorna o tempo esperado."""
+    if DESATIVADO:
+        return 0.0
+
+    esperado = 0.0
+    conexao = _conectar()
+    try:
+        while True:
+            agora = time.time()
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                fichas, taxa, bloqueado_ate = _ler_balde(conexao, nome, agora)
+                if agora < bloqueado_ate:
+                    espera = bloqueado_ate - agora
+                elif fichas >= custo:
+                    _gravar_balde(conexao, nome, fichas - custo, taxa, agora, bloqueado_ate)
+                    conexao.execute("COMMIT")
+                    if esperado:
+                        logger.debug(f"Limitador '{nome}': aguardou {esperado:.2f}s por ficha.")
+                    return esperado
+                else:
+                    espera = (custo - fichas) / taxa
+                _gravar_balde(conexao, nome, fichas, taxa, agora, bloqueado_ate)
+                conexao.execute("COMMIT")
+            except Exception:
+                conexao.execute("ROLLBACK")
+                raise
+            time.sleep(espera)
+            esperado += espera
+    finally:
+        conexao.close()
+
+
+def registrar_sucesso(nome):
+    """Aumento aditivo da taxa após uma chamada bem-sucedida."""
+    if DESATIVADO:
+        return
+    taxa_max, _ = _config_balde(nome)
+    _atualizar_taxa(nome, lambda taxa: min(taxa_max, taxa + taxa_max * INCREMENTO_POR_SUCESSO))
+
+
+def registrar_limite(nome, retry_after=None):
+    """Após um 429: corta a taxa pela metade e bloqueia o balde até o Retry-After."""
+    if DESATIVADO:
+        return
+    taxa_max, _ = _config_balde(nome)
+    espera = retry_after if retry_after is not None else ESPERA_PADRAO_429
+    nova_taxa = _atualizar_taxa(
+        nome,
+        lambda taxa: max(taxa_max * TAXA_MINIMA_FRACAO, taxa * FATOR_REDUCAO),
+        bloquear_por=espera,
+        zerar_fichas=True,
+    )
+    logger.warning(
+        f"Limitador '{nome}': limite da API atingido (429). Pausando {espera:.1f}s; "
+        f"nova taxa {nova_taxa * 60:.1f} req/min."
+    )
+
+
+def _atualizar_taxa(nome, funcao, bloquear_por=0.0, zerar_fichas=False):
+    conexao = _conectar()
+    try:
+        agora = time.time()
+        conexao.execute("BEGIN IMMEDIATE")
+        try:
+            fichas, taxa, bloqueado_ate = _ler_balde(conexao, nome, agora)
+            taxa = funcao(taxa)
+            if bloquear_por:
+                bloqueado_ate = max(bloqueado_ate, agora + bloquear_por)
+            _gravar_balde(conexao, nome, 0.0 if zerar_fichas else fichas, taxa, agora, bloqueado_ate)
+            conexao.execute("COMMIT")
+        except Exception:
+            conexao.execute("ROLLBACK")
+            raise
+        return taxa
+    finally:
+        conexao.close()
+
+
+def extrair_retry_after(excecao):
+    """Obtém o Retry-After (em segundos) de uma exceção da API, se houver."""
+    resposta = getattr(excecao, "response", None)
+    cabecalhos = getattr(resposta, "headers", None) or {}
+    valor = cabecalhos.get("Retry-After") if hasattr(cabecalhos, "get") else None
+    if valor:
+        try:
+            return float(valor)
+        except ValueError:
+            pass
+
+    # gRPC: google.rpc.RetryInfo nos detalhes do erro
+    for detalhe in getattr(excecao, "details", None) or []:
+        atraso = getattr(detalhe, "retry_delay", None)
+        if atraso is not None:
+            return atraso.seconds + atraso.nanos / 1e9
+
+    achado = _RE_RETRY_EM.search(str(excecao))
+    return float(achado.group(1)) if achado else None
@@ -0,0 +1,201 @@
+#metricas_llm.py
+"""
+Contabilidade das chamadas aos modelos (Gemini e embeddings do Vertex).
+
+Cada chamada vira uma linha JSON em logs/metricas/metricas_<run_id>.jsonl com
+etapa, modelo, tokens de entrada/saída, latência, número de tentativas e
+status de cache. Ao final do processo é gravado resumo_<run_id>.json com,
+por etapa, latência p50/p95, tokens por vaga e custo estimado.
+
+Processos do mesmo workflow compartilham o arquivo quando recebem o mesmo
+METRICAS_RUN_ID; sem ele, cada processo gera o seu.
+
+Uso avulso para (re)gerar o resumo:
+    python scripts/metricas_llm.py logs/metricas/metricas_<run_id>.jsonl
+"""
+import os
+import sys
+import json
+import math
+import time
+import atexit
+import logging
+import threading
+from datetime import datetime
+
+# ================= LOGGING SETUP =================
+loglevel = os.environ.get("MY_LOG_LEVEL", "INFO").upper()
+logger = logging.getLogger(__name__)
+logger.setLevel(loglevel)
+
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.propagate = False
+
+# ================= CONFIGURAÇÃO =================
+DIRETORIO_METRICAS = os.environ.get("METRICAS_DIR", "logs/metricas")
+RUN_ID = os.environ.get("METRICAS_RUN_ID") or f"{datetime.now():%Y%m%d_%H%M%S}_{os.getpid()}"
+DESATIVADO = os.environ.get("METRICAS_DESATIVADO", "").lower() in ("1", "true", "sim")
+
+# Preço estimado em US$ por 1 milhão de tokens: (entrada, saída).
+# Valores de referência da tabela pública; servem só para comparar execuções.
+PRECOS_POR_MILHAO = {
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-1.5-pro": (1.25, 5.00),
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "text-multilingual-embedding-002": (0.025, 0.0),
+    "text-embedding-004": (0.025, 0.0),
+}
+
+_lock = threading.Lock()
+_registros_processo = 0
+
+
+def caminho_metricas(run_id=RUN_ID):
+    return os.path.join(DIRETORIO_METRICAS, f"metricas_{run_id}.jsonl")
+
+
+def caminho_resumo(run_id=RUN_ID):
+    return os.path.join(DIRETORIO_METRICAS, f"resumo_{run_id}.json")
+
+
+def _preco(modelo):
+    nome = (modelo or "").split("/")[-1]
+    for prefixo, preco in PRECOS_POR_MILHAO.items():
+        if nome.startswith(prefixo):
+            return preco
+    return (0.0, 0.0)
+
+
+def custo_estimado(modelo, tokens_entrada, tokens_saida):
+    preco_entrada, preco_saida = _preco(modelo)
+    return (tokens_entrada * preco_entrada + tokens_saida * preco_saida) / 1_000_000
+
+
+# ================= REGISTRO =================
+
+def registrar_chamada(etapa, modelo, latencia, tokens_entrada=0, tokens_saida=0,
+                      tentativas=1, cache="miss", codigo_vaga=None, erro=None, espera_limitador=0.0):
+    """Acrescenta uma chamada ao arquivo de métricas da execução."""
+    global _registros_processo
+    if DESATIVADO:
+        return
+
+    registro = {
+        "ts": round(time.time(), 3),
+        "pid": os.getpid(),
+        "etapa": etapa or "desconhecida",
+        "modelo": modelo,
+        "codigo_vaga": codigo_vaga,
+        "tokens_entrada": int(tokens_entrada or 0),
+        "tokens_saida": int(tokens_saida or 0),
+        "latencia_s": round(latencia, 4),
+        "espera_limitador_s": round(espera_limitador, 4),
+        "tentativas": tentativas,
+        "cache": cache,
+        "erro": str(erro) if erro else None,
+    }
+    try:
+        with _lock:
+            os.makedirs(DIRETORIO_METRICAS, exist_ok=True)
+            # Uma linha por write(): appends pequenos não se misturam entre processos
+            with open(caminho_metricas(), "a", encoding="utf-8") as f:
+                f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            _registros_processo += 1
+    except OSError as e:
+        logger.warning(f"Não foi possível gravar métricas em {caminho_metricas()}: {e}")
+
+
+def tokens_da_resposta(resposta):
+    """Extrai (entrada, saída, cache) do usage_metadata de uma resposta do Gemini."""
+    uso = getattr(resposta, "usage_metadata", None)
+    if uso is None:
+        return 0, 0, "miss"
+    tokens_cache = getattr(uso, "cached_content_token_count", 0) or 0
+    return (
+        getattr(uso, "prompt_token_count", 0) or 0,
+        getattr(uso, "candidates_token_count", 0) or 0,
+        "hit" if tokens_cache else "miss",
+    )
+
+
+# ================= RESUMO =================
+
+def _percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    # Método nearest-rank
+    indice = max(0, math.ceil(p / 100 * len(ordenados)) - 1)
+    return ordenados[indice]
+
+
+def resumir(caminho):
+    """Agrega o arquivo de métricas por etapa."""
+    por_etapa = {}
+    with open(caminho, "r", encoding="utf-8") as f:
+        for linha in f:
+            if linha.strip():
+                registro = json.loads(linha)
+                por_etapa.setdefault(registro["etapa"], []).append(registro)
+
+    resumo = {}
+    for etapa, registros in por_etapa.items():
+        latencias = [r["latencia_s"] for r in registros]
+        entrada = sum(r["tokens_entrada"] for r in registros)
+        saida = sum(r["tokens_saida"] for r in registros)
+        vagas = {r["codigo_vaga"] for r in registros if r.get("codigo_vaga")}
+        divisor = len(vagas) or len(registros)
+        resumo[etapa] = {
+            "chamadas": len(registros),
+            "erros": sum(1 for r in registros if r.get("erro")),
+            "tentativas_extras": sum(max(0, r["tentativas"] - 1) for r in registros),
+            "cache_hits": sum(1 for r in registros if r.get("cache") == "hit"),
+            "latencia_p50_s": round(_percentil(latencias, 50), 4),
+            "latencia_p95_s": round(_percentil(latencias, 95), 4),
+            "latencia_total_s": round(sum(latencias), 3),
+            "espera_limitador_total_s": round(sum(r.get("espera_limitador_s", 0.0) for r in registros), 3),
+            "tokens_entrada": entrada,
+            "tokens_saida": saida,
+            "tokens_por_vaga": round((entrada + saida) / divisor, 1),
+            "custo_estimado_usd": round(
+                sum(custo_estimado(r["modelo"], r["tokens_entrada"], r["tokens_saida"]) for r in registros), 6
+            ),
+        }
+    return resumo
+
+
+def gravar_resumo(run_id=RUN_ID):
+    caminho = caminho_metricas(run_id)
+    if not os.path.exists(caminho):
+        return None
+    resumo = resumir(caminho)
+    with open(caminho_resumo(run_id), "w", encoding="utf-8") as f:
+        json.dump(resumo, f, ensure_ascii=False, indent=2)
+    for etapa, dados in resumo.items():
+        logger.info(
+            f"Métricas [{etapa}]: {dados['chamadas']} chamadas, p50 {dados['latencia_p50_s']}s, "
+            f"p95 {dados['latencia_p95_s']}s, {dados['tokens_por_vaga']} tokens/vaga, "
+            f"~US$ {dados['custo_estimado_usd']}"
+        )
+    return resumo
+
+
+@atexit.register
+def _resumo_ao_sair():
+    if _registros_processo and not DESATIVADO:
+        try:
+            gravar_resumo()
+        except Exception as e:
+            logger.warning(f"Falha ao gerar resumo de métricas: {e}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.stderr.write("Uso: python scripts/metricas_llm.py logs/metricas/metricas_<run_id>.jsonl\n")
+        sys.exit(1)
+    print(json.dumps(resumir(sys.argv[1]), ensure_ascii=False, indent=2))
@@ -0,0 +1,338 @@
+#parser_resposta_ia.py
+"""
+Parser único das respostas JSON do Gemini.
+
+Tenta primeiro o caminho rápido (json.loads). Se falhar, repara localmente os
+defeitos mais comuns — cercas de markdown, texto antes/depois do JSON, aspas
+simples, vírgulas sobrando, NaN/Infinity, literais Python e arrays/objetos
+truncados — e valida o resultado contra o schema do tipo de saída. Só quando
+nada disso funciona é levantada RespostaInvalida, e aí sim vale a pena
+chamar a API de novo.
+"""
+import os
+import re
+import sys
+import ast
+import json
+import logging
+
+# ================= LOGGING SETUP =================
+loglevel = os.environ.get("MY_LOG_LEVEL", "INFO").upper()
+logger = logging.getLogger(__name__)
+logger.setLevel(loglevel)
+
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.propagate = False
+
+
+class RespostaInvalida(ValueError):
+    """A resposta do modelo não pôde ser reparada nem validada."""
+
+
+# ================= SCHEMAS =================
+# Cada campo mapeia para `str` ou `list` (lista de strings).
+
+SCHEMA_ANALISE = {
+    "titulo": str,
+    "localizacao": str,
+    "senioridade": str,
+    "requisitos_obrigatorios": list,
+    "requisitos_desejaveis": list,
+    "soft_skills": list,
+    "hard_skills": list,
+}
+
+SCHEMA_SUGESTAO = {
+    "original": str,
+    "substituto": str,
+}
+
+_RE_CERCA = re.compile(r"```(?:json)?\s*|```", re.IGNORECASE)
+_RE_VIRGULA_SOBRANDO = re.compile(r",\s*([\]}])")
+# Sem \b antes do "-": não há limite de palavra entre um espaço (ou [, :) e o sinal
+_RE_NAO_NUMERICO = re.compile(r"(?<![\w.])-?Infinity\b|\b(?:NaN|Infinity|None|undefined)\b")
+_LITERAIS_PYTHON = {"True": "true", "False": "false"}
+
+# Tipos de reparo devolvidos por carregar_json_tolerante
+REPARO_SINTAXE = "sintaxe"
+REPARO_TRUNCADO = "truncado"
+# Campos sem os quais uma análise não serve para as etapas seguintes
+CAMPOS_OBRIGATORIOS_ANALISE = ("requisitos_obrigatorios", "hard_skills")
+
+
+# ================= REPARO =================
+
+def _json_loads(texto):
+    """json.loads com NaN/Infinity/-Infinity (que o json aceita) convertidos em null."""
+    return json.loads(texto, parse_constant=lambda _: None)
+
+
+def _limpar(texto):
+    """Remove cercas de markdown e qualquer texto antes do primeiro [ ou {."""
+    texto = _RE_CERCA.sub("", texto or "").strip()
+    inicios = [i for i in (texto.find("["), texto.find("{")) if i != -1]
+    if inicios:
+        texto = texto[min(inicios):]
+    return texto
+
+
+def _segmentos(texto):
+    """Divide o texto em (eh_string, trecho), reconhecendo strings com aspas duplas ou simples."""
+    segmentos = []
+    atual = []
+    delimitador = None
+    escape = False
+    for caractere in texto:
+        if delimitador:
+            atual.append(caractere)
+            if escape:
+                escape = False
+            elif caractere == "\\":
+                escape = True
+            elif caractere == delimitador:
+                segmentos.append((True, "".join(atual)))
+                atual, delimitador = [], None
+        elif caractere in "\"'":
+            if atual:
+                segmentos.append((False, "".join(atual)))
+            atual, delimitador = [caractere], caractere
+        else:
+            atual.append(caractere)
+    if atual:
+        segmentos.append((delimitador is not None, "".join(atual)))
+    return segmentos
+
+
+def _para_aspas_duplas(trecho):
+    """'texto "x"' -> "texto \\"x\\"" (string em aspas simples vira JSON válido)."""
+    if not trecho.startswith("'"):
+        return trecho
+    fechado = len(trecho) > 1 and trecho.endswith("'")
+    interno = trecho[1:-1] if fechado else trecho[1:]
+    interno = interno.replace("\\'", "'").replace('"', '\\"')
+    return '"' + interno + ('"' if fechado else "")
+
+
+def _reparar_sintaxe(texto):
+    partes = []
+    for eh_string, trecho in _segmentos(texto):
+        if eh_string:
+            partes.append(_para_aspas_duplas(trecho))
+            continue
+        trecho = _RE_NAO_NUMERICO.sub("null", trecho)
+        for literal, json_literal in _LITERAIS_PYTHON.items():
+            trecho = re.sub(rf"\b{literal}\b", json_literal, trecho)
+        partes.append(_RE_VIRGULA_SOBRANDO.sub(r"\1", trecho))
+    return "".join(partes)
+
+
+def _candidatos_truncados(texto):
+    """Fecha strings, arrays e objetos abertos de uma resposta cortada no meio."""
+    pilha = []
+    em_string = False
+    escape = False
+    ultima_virgula = None
+    for indice, caractere in enumerate(texto):
+        if em_string:
+            if escape:
+                escape = False
+            elif caractere == "\\":
+                escape = True
+            elif caractere == '"':
+                em_string = False
+            continue
+        if caractere == '"':
+            em_string = True
+        elif caractere in "[{":
+            pilha.append(caractere)
+        elif caractere in "]}":
+            if pilha:
+                pilha.pop()
+        elif caractere == ",":
+            ultima_virgula = (indice, list(pilha))
+
+    if not pilha and not em_string:
+        return []
+
+    def fechamento(abertos):
+        return "".join("]" if c == "[" else "}" for c in reversed(abertos))
+
+    candidatos = [texto + ('"' if em_string else "") + fechamento(pilha)]
+    if ultima_virgula:
+        # Descarta o último elemento incompleto; se o corte caiu no meio de uma
+        # string, essa é a opção preferida (o valor parcial não é confiável)
+        indice, abertos = ultima_virgula
+        sem_ultimo = texto[:indice] + fechamento(abertos)
+        if em_string:
+            candidatos.insert(0, sem_ultimo)
+        else:
+            candidatos.append(sem_ultimo)
+    return candidatos
+
+
+def carregar_json_tolerante(texto):
+    """
+    Devolve (objeto, reparo). `reparo` é None quando o JSON bruto era válido,
+    REPARO_SINTAXE quando precisou de reparo local e REPARO_TRUNCADO quando a
+    resposta estava cortada e foi fechada (o conteúdo pode estar incompleto).
+    Levanta RespostaInvalida se nada funcionar.
+    """
+    limpo = _limpar(texto)
+    if not limpo:
+        raise RespostaInvalida("Resposta vazia após a limpeza.")
+
+    try:
+        return _json_loads(limpo), None
+    except json.JSONDecodeError:
+        pass
+
+    try:
+        return ast.literal_eval(limpo), REPARO_SINTAXE
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+        pass
+
+    reparado = _reparar_sintaxe(limpo)
+    try:
+        return _json_loads(reparado), REPARO_SINTAXE
+    except json.JSONDecodeError:
+        pass
+    for candidato in _candidatos_truncados(reparado):
+        try:
+            return _json_loads(candidato), REPARO_TRUNCADO
+        except json.JSONDecodeError:
+            continue
+
+    raise RespostaInvalida(f"JSON irreparável: {limpo[:200]!r}")
+
+
+# ================= VALIDAÇÃO =================
+
+def _como_lista_de_strings(valor):
+    if valor is None:
+        return []
+    if isinstance(valor, str):
+        return [valor] if valor.strip() else []
+    if isinstance(valor, (list, tuple)):
+        return [str(item).strip() for item in valor if item is not None and str(item).strip()]
+    return [str(valor)]
+
+
+def validar_objeto(dados, schema):
+    """Mantém só as chaves do schema, convertendo cada valor para o tipo esperado."""
+    if not isinstance(dados, dict):
+        raise RespostaInvalida(f"Esperado objeto JSON, recebido {type(dados).__name__}.")
+    resultado = {}
+    for campo, tipo in schema.items():
+        valor = dados.get(campo)
+        if tipo is list:
+            resultado[campo] = _como_lista_de_strings(valor)
+        else:
+            resultado[campo] = "" if valor is None else str(valor).strip()
+    return resultado
+
+
+def validar_analise(dados, truncado=False):
+    """
+    Schema da análise de vaga (analise_vaga_ia.analisar_vaga). Rejeita objetos
+    sem nenhuma chave do schema (ex.: {"error": ...}) ou sem as listas
+    obrigatórias; numa resposta truncada, exige todas as chaves do schema.
+    """
+    if isinstance(dados, list) and len(dados) == 1:
+        dados = dados[0]
+    if not isinstance(dados, dict):
+        raise RespostaInvalida(f"Esperado objeto JSON, recebido {type(dados).__name__}.")
+    if not any(campo in dados for campo in SCHEMA_ANALISE):
+        raise RespostaInvalida(f"Objeto JSON sem nenhuma chave da análise: {sorted(dados)[:5]}")
+    exigidos = SCHEMA_ANALISE if truncado else CAMPOS_OBRIGATORIOS_ANALISE
+    faltando = [campo for campo in exigidos if campo not in dados]
+    if faltando:
+        motivo = "Resposta truncada sem" if truncado else "Análise sem"
+        raise RespostaInvalida(f"{motivo} as chaves: {', '.join(faltando)}")
+    return validar_objeto(dados, SCHEMA_ANALISE)
+
+
+def validar_sugestoes(dados, truncado=False):
+    """Schema das sugestões de substituição (lista de {original, substituto})."""
+    if isinstance(dados, dict):
+        if isinstance(dados.get("sugestoes"), list):
+            dados = dados["sugestoes"]
+        elif "original" in dados:
+            dados = [dados]
+        else:
+            raise RespostaInvalida("Objeto JSON sem a chave 'sugestoes'.")
+    if not isinstance(dados, list):
+        raise RespostaInvalida(f"Esperada lista de sugestões, recebido {type(dados).__name__}.")
+
+    sugestoes = []
+    for item in dados:
+        if not isinstance(item, dict):
+            continue
+        sugestao = validar_objeto(item, SCHEMA_SUGESTAO)
+        if sugestao["original"] and sugestao["substituto"]:
+            sugestoes.append(sugestao)
+    if dados and not sugestoes:
+        raise RespostaInvalida("Nenhuma sugestão válida com 'original' e 'substituto'.")
+    return sugestoes
+
+
+def filtrar_sugestoes_literais(sugestoes, texto_cv, codigo=None):
+    """
+    Mantém só as sugestões cujo "original" aparece literalmente numa linha do
+    CV completo. O cv_aplicador só substitui trechos exatos de um parágrafo;
+    um "original" parafraseado (ex.: tirado do resumo do CV) não casaria com
+    nada e seria ignorado em silêncio. As descartadas vão para o log.
+    """
+    linhas = texto_cv.splitlines()
+    literais = []
+    for sugestao in sugestoes:
+        original = sugestao.get("original", "")
+        if original and any(original in linha for linha in linhas):
+            literais.append(sugestao)
+        else:
+            logger.warning(f"Sugestão descartada{f' (vaga {codigo})' if codigo else ''}: "
+                           f"{original!r} não aparece literalmente no CV.")
+    return literais
+
+
+def validar_analise_com_sugestoes(dados, truncado=False):
+    """Schema do modo combinado (analise_vaga_ia com analise_com_sugestoes): {"analise": {...}, "sugestoes": [...]}."""
+    if isinstance(dados, list) and len(dados) == 1:
+        dados = dados[0]
+    if not isinstance(dados, dict) or not isinstance(dados.get("analise"), dict):
+        raise RespostaInvalida("Objeto JSON sem a chave 'analise'.")
+    if truncado and "sugestoes" not in dados:
+        raise RespostaInvalida("Resposta truncada sem a chave 'sugestoes'.")
+    return {
+        "analise": validar_analise(dados["analise"], truncado),
+        "sugestoes": validar_sugestoes(dados.get("sugestoes") or []),
+    }
+
+
+def validar_resumo_cv(dados, truncado=False):
+    """Resumo do CV (contexto_cv): {"resumo_cv": "..."} com texto não vazio. Truncado, o resumo perderia parte do CV."""
+    if isinstance(dados, list) and len(dados) == 1:
+        dados = dados[0]
+    if not isinstance(dados, dict):
+        raise RespostaInvalida(f"Esperado objeto JSON, recebido {type(dados).__name__}.")
+    if truncado:
+        raise RespostaInvalida("Resumo do CV truncado.")
+    resumo = dados.get("resumo_cv")
+    if not isinstance(resumo, str) or not resumo.strip():
+        raise RespostaInvalida("Objeto JSON sem 'resumo_cv' preenchido.")
+    return resumo.strip()
+
+
+def interpretar_resposta(texto, validador):
+    """
+    Carrega (reparando se preciso) e valida a resposta. Levanta RespostaInvalida.
+    O validador recebe `truncado=True` quando a resposta foi fechada à força.
+    """
+    dados, reparo = carregar_json_tolerante(texto)
+    validado = validador(dados, truncado=reparo == REPARO_TRUNCADO)
+    if reparo:
+        logger.info("Resposta da IA reparada localmente; nova chamada à API evitada.")
+    return validado
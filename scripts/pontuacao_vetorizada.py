@@ -0,0 +1,124 @@
+#pontuacao_vetorizada.py
+"""
+Pontuação CV x requisitos vetorizada com NumPy.
+
+Os vetores dos requisitos distintos são empilhados numa única matriz float32
+já normalizada. Os scores saem de um único produto matriz-vetor com o CV
+normalizado e são espalhados para as vagas por um vetor de índices (vagas em
+sequência); os agregados por vaga (média, média ponderada
+obrigatório/desejável e média dos top-k) são reduções por segmento sobre os
+offsets de cada vaga.
+"""
+import numpy as np
+
+PESO_OBRIGATORIO_PADRAO = 2.0
+PESO_DESEJAVEL_PADRAO = 1.0
+TOP_K_PADRAO = 3
+
+
+def normalizar(vetores):
+    """Converte para float32 e normaliza cada linha (ou o vetor) para norma 1."""
+    matriz = np.asarray(vetores, dtype=np.float32)
+    normas = np.linalg.norm(matriz, axis=-1, keepdims=True)
+    return matriz / np.maximum(normas, 1e-8)
+
+
+def montar_offsets(listas):
+    """
+    Concatena as listas de índices de cada vaga. Retorna (índices, offsets),
+    onde offsets[j] é a posição da primeira linha da vaga j.
+    """
+    tamanhos = np.fromiter((len(lista) for lista in listas), dtype=np.int64, count=len(listas))
+    offsets = np.zeros(len(tamanhos), dtype=np.int64)
+    np.cumsum(tamanhos[:-1], out=offsets[1:])
+    indices = np.fromiter((i for lista in listas for i in lista), dtype=np.int64, count=int(tamanhos.sum()))
+    return indices, offsets
+
+
+def validar_top_k(top_k):
+    """top_k_requisitos precisa ser inteiro >= 1 (com 0 a média do top-k divide por zero)."""
+    if isinstance(top_k, bool) or not isinstance(top_k, (int, np.integer)) or top_k < 1:
+        raise ValueError(f"top_k_requisitos inválido: {top_k!r} (use um inteiro maior ou igual a 1).")
+    return int(top_k)
+
+
+def pontuar(vetor_cv, matriz, indices, offsets, pesos=None, top_k=TOP_K_PADRAO):
+    """
+    Calcula os scores de todos os requisitos e os agregados por vaga.
+
+    `vetor_cv` é o vetor do CV ou a matriz seções x dimensão (embedding_cv); no
+    segundo caso o score de cada requisito é o máximo entre as seções.
+    `matriz` traz os requisitos distintos já normalizados; `indices` e `offsets`
+    vêm de montar_offsets e cada vaga deve ter ao menos um requisito. `pesos`
+    (um por linha de `indices`) alimenta a média ponderada; sem ele a ponderada
+    é igual à média. Retorna um dict com arrays: scores (por linha de
+    `indices`), media, ponderada e top_k (por vaga).
+    """
+    top_k = validar_top_k(top_k)
+    similaridades = matriz @ normalizar(vetor_cv).T
+    if similaridades.ndim == 2:
+        # CV por seções: cada requisito fica com a seção mais aderente
+        similaridades = similaridades.max(axis=1)
+    scores = similaridades[indices]
+    n_linhas = scores.shape[0]
+    tamanhos = np.diff(np.append(offsets, n_linhas))
+
+    media = np.add.reduceat(scores, offsets) / tamanhos
+
+    if pesos is None:
+        ponderada = media
+    else:
+        pesos = np.asarray(pesos, dtype=np.float32)
+        ponderada = np.add.reduceat(scores * pesos, offsets) / np.add.reduceat(pesos, offsets)
+
+    # Top-k por vaga: ordena por (vaga, score decrescente) e fica com as k primeiras posições
+    id_vaga = np.repeat(np.arange(len(offsets)), tamanhos)
+    ordem = np.lexsort((-scores, id_vaga))
+    posicao = np.arange(n_linhas) - offsets[id_vaga[ordem]]
+    selecionados = ordem[posicao < top_k]
+    soma_top = np.bincount(id_vaga[selecionados], weights=scores[selecionados], minlength=len(offsets))
+    media_top = soma_top / np.minimum(tamanhos, top_k)
+
+    return {"scores": scores, "media": media, "ponderada": ponderada, "top_k": media_top}
+
+
+def pontuar_varios_cvs(matrizes_cv, matriz, indices, offsets, pesos=None, top_k=TOP_K_PADRAO):
+    """
+    Versão de `pontuar` para vários CVs de uma vez: cada item de `matrizes_cv`
+    é a matriz seções x dimensão (ou o vetor) de um CV. As seções de todos os
+    CVs são empilhadas e entram num único produto com a matriz de requisitos;
+    o máximo por CV é uma redução por segmento sobre as colunas. Retorna o
+    mesmo dict de `pontuar`, com uma coluna por CV (scores: linhas x CVs;
+    media, ponderada e top_k: vagas x CVs).
+    """
+    top_k = validar_top_k(top_k)
+    matrizes_cv = [np.atleast_2d(normalizar(m)) for m in matrizes_cv]
+    inicio_cv = np.zeros(len(matrizes_cv), dtype=np.int64)
+    np.cumsum([len(m) for m in matrizes_cv[:-1]], out=inicio_cv[1:])
+
+    similaridades = np.maximum.reduceat(matriz @ np.concatenate(matrizes_cv).T, inicio_cv, axis=1)
+    scores = similaridades[indices]
+    n_linhas = scores.shape[0]
+    tamanhos = np.diff(np.append(offsets, n_linhas))[:, None]
+
+    media = np.add.reduceat(scores, offsets, axis=0) / tamanhos
+
+    if pesos is None:
+        ponderada = media
+    else:
+        pesos = np.asarray(pesos, dtype=np.float32)[:, None]
+        ponderada = np.add.reduceat(scores * pesos, offsets, axis=0) / np.add.reduceat(pesos, offsets, axis=0)
+
+    # Top-k: ordena cada coluna por (vaga, score decrescente); a vaga de cada linha não muda com a ordenação
+    id_vaga = np.repeat(np.arange(len(offsets)), tamanhos[:, 0])
+    ordem = np.lexsort((-scores, np.broadcast_to(id_vaga[:, None], scores.shape)), axis=0)
+    ordenados = np.take_along_axis(scores, ordem, axis=0)
+    dentro_top = (np.arange(n_linhas) - offsets[id_vaga]) < top_k
+    media_top = np.add.reduceat(ordenados * dentro_top[:, None], offsets, axis=0) / np.minimum(tamanhos, top_k)
+
+    return {"scores": scores, "media": media, "ponderada": ponderada, "top_k": media_top}
+
+
+def vetores_das_vagas(matriz, indices, offsets):
+    """Vetor de cada vaga: média normalizada dos vetores dos seus requisitos."""
+    return normalizar(np.add.reduceat(matriz[indices], offsets, axis=0))
@@ -0,0 +1,240 @@
+#preprocessamento_vaga.py
+"""
+Pré-processamento da descrição da vaga antes de enviá-la ao LLM.
+
+Remove seções de boilerplate copiadas da página do LinkedIn ("Sobre nós",
+benefícios, declarações de diversidade/EEO, cabeçalhos duplicados), em
+português e inglês, usando um índice de frases. Depois estima os tokens e
+corta o texto para caber no orçamento configurado.
+"""
+import os
+import re
+import sys
+import math
+import logging
+import unicodedata
+
+# ================= LOGGING SETUP =================
+loglevel = os.environ.get("MY_LOG_LEVEL", "INFO").upper()
+logger = logging.getLogger(__name__)
+logger.setLevel(loglevel)
+
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.propagate = False
+
+# ================= ÍNDICE DE FRASES =================
+# Todas as frases já normalizadas (minúsculas, sem acento).
+
+# Cabeçalhos que abrem uma seção inteira de boilerplate: tudo até o próximo
+# cabeçalho relevante é descartado.
+CABECALHOS_BOILERPLATE = {
+    # Sobre a empresa
+    "sobre nos": "empresa",
+    "sobre a empresa": "empresa",
+    "quem somos": "empresa",
+    "nossa empresa": "empresa",
+    "nossa historia": "empresa",
+    "conheca a empresa": "empresa",
+    "about us": "empresa",
+    "about the company": "empresa",
+    "who we are": "empresa",
+    "our company": "empresa",
+    "our story": "empresa",
+    # Benefícios
+    "beneficios": "beneficios",
+    "nossos beneficios": "beneficios",
+    "o que oferecemos": "beneficios",
+    "oferecemos": "beneficios",
+    "remuneracao e beneficios": "beneficios",
+    "benefits": "beneficios",
+    "perks": "beneficios",
+    "perks and benefits": "beneficios",
+    "what we offer": "beneficios",
+    "compensation and benefits": "beneficios",
+    # Diversidade / EEO
+    "diversidade e inclusao": "diversidade",
+    "diversidade": "diversidade",
+    "equal opportunity": "diversidade",
+    "equal employment opportunity": "diversidade",
+    "diversity and inclusion": "diversidade",
+    "diversity, equity and inclusion": "diversidade",
+    # Processo seletivo / privacidade
+    "etapas do processo": "processo",
+    "etapas do processo seletivo": "processo",
+    "politica de privacidade": "processo",
+    "privacy notice": "processo",
+    "hiring process": "processo",
+}
+
+# Cabeçalhos que encerram uma seção de boilerplate (conteúdo que interessa à análise).
+CABECALHOS_RELEVANTES = (
+    "requisitos", "requisitos obrigatorios", "requisitos desejaveis", "diferenciais",
+    "qualificacoes", "responsabilidades", "atribuicoes", "atividades", "o que voce vai fazer",
+    "o que esperamos", "o que buscamos", "sobre a vaga", "descricao da vaga", "conhecimentos",
+    "requirements", "qualifications", "responsibilities", "what you will do",
+    "what you'll do", "nice to have", "preferred qualifications", "skills", "about the role",
+    "about the job", "job description", "the role",
+)
+
+# Frases que marcam uma linha isolada como boilerplate, em qualquer posição do texto.
+FRASES_BOILERPLATE = {
+    "equal opportunity employer": "diversidade",
+    "all qualified applicants": "diversidade",
+    "without regard to race": "diversidade",
+    "we are committed to diversity": "diversidade",
+    "sem distincao de": "diversidade",
+    "todas as pessoas candidatas": "diversidade",
+    "valorizamos a diversidade": "diversidade",
+    "acreditamos na diversidade": "diversidade",
+    "independentemente de raca": "diversidade",
+    "vale refeicao": "beneficios",
+    "vale alimentacao": "beneficios",
+    "plano de saude": "beneficios",
+    "plano odontologico": "beneficios",
+    "gympass": "beneficios",
+    "wellhub": "beneficios",
+    "seguro de vida": "beneficios",
+    "health insurance": "beneficios",
+    "dental insurance": "beneficios",
+    "paid time off": "beneficios",
+}
+
+# Linhas de "chrome" do LinkedIn que não carregam informação.
+LINHAS_RUIDO = {
+    "about the job", "sobre a vaga", "show more", "show less", "see more", "exibir mais",
+    "exibir menos", "ver mais", "ver menos", "...more", "…more", "apply", "candidatar-se",
+}
+
+_CARACTERES_POR_TOKEN = 4  # Aproximação usual para português/inglês
+_MAX_PALAVRAS_CABECALHO = 8
+
+
+def _normalizar(texto):
+    texto = unicodedata.normalize("NFKD", texto)
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    texto = re.sub(r"\s+", " ", texto.lower()).strip()
+    return texto.strip(" :-–—•*#|")
+
+
+def _compilar_indice(frases):
+    padroes = sorted(frases, key=len, reverse=True)
+    return re.compile(r"\b(" + "|".join(re.escape(f) for f in padroes) + r")\b")
+
+
+_RE_FRASES = _compilar_indice(FRASES_BOILERPLATE)
+
+
+def estimar_tokens(texto):
+    """Estimativa barata de tokens (sem chamada à API)."""
+    if not texto:
+        return 0
+    return math.ceil(len(texto) / _CARACTERES_POR_TOKEN)
+
+
+def _eh_cabecalho(linha_normalizada, linha_original):
+    if not linha_normalizada:
+        return False
+    if len(linha_normalizada.split()) > _MAX_PALAVRAS_CABECALHO:
+        return False
+    return linha_original.rstrip().endswith(":") or linha_normalizada in CABECALHOS_BOILERPLATE \
+        or linha_normalizada in CABECALHOS_RELEVANTES
+
+
+def remover_boilerplate(texto):
+    """
+    Remove seções e linhas de boilerplate e cabeçalhos duplicados.
+    Retorna (texto_limpo, categorias_removidas) onde categorias_removidas conta
+    as linhas descartadas por categoria.
+    """
+    linhas_mantidas = []
+    removidas = {}
+    vistas = set()
+    em_boilerplate = None
+
+    for linha in texto.splitlines():
+        normalizada = _normalizar(linha)
+
+        if not normalizada:
+            # Preserva no máximo uma linha em branco seguida
+            if linhas_mantidas and linhas_mantidas[-1] != "" and em_boilerplate is None:
+                linhas_mantidas.append("")
+            continue
+
+        if normalizada in LINHAS_RUIDO:
+            removidas["ruido"] = removidas.get("ruido", 0) + 1
+            if normalizada in CABECALHOS_RELEVANTES:
+                em_boilerplate = None
+            continue
+
+        if _eh_cabecalho(normalizada, linha):
+            categoria = CABECALHOS_BOILERPLATE.get(normalizada)
+            if categoria:
+                em_boilerplate = categoria
+                removidas[categoria] = removidas.get(categoria, 0) + 1
+                continue
+            if normalizada in CABECALHOS_RELEVANTES or em_boilerplate is not None:
+                em_boilerplate = None
+
+        if em_boilerplate is not None:
+            removidas[em_boilerplate] = removidas.get(em_boilerplate, 0) + 1
+            continue
+
+        achado = _RE_FRASES.search(normalizada)
+        if achado:
+            categoria = FRASES_BOILERPLATE[achado.group(1)]
+            # Benefício só é descartado em itens curtos de lista: numa frase longa
+            # o termo pode fazer parte do requisito (ex.: experiência com plano de saúde)
+            if categoria != "beneficios" or len(normalizada.split()) <= _MAX_PALAVRAS_CABECALHO:
+                removidas[categoria] = removidas.get(categoria, 0) + 1
+                continue
+
+        # Cabeçalhos e parágrafos duplicados (comuns ao copiar da página do LinkedIn)
+        if normalizada in vistas:
+            removidas["duplicado"] = removidas.get("duplicado", 0) + 1
+            continue
+        vistas.add(normalizada)
+
+        linhas_mantidas.append(linha.strip())
+
+    return "\n".join(linhas_mantidas).strip(), removidas
+
+
+def truncar_para_orcamento(texto, max_tokens):
+    """Corta o texto (em limite de linha sempre que possível) para caber em max_tokens."""
+    if not max_tokens or estimar_tokens(texto) <= max_tokens:
+        return texto, False
+
+    limite_chars = max_tokens * _CARACTERES_POR_TOKEN
+    cortado = texto[:limite_chars]
+    quebra = cortado.rfind("\n")
+    if quebra > limite_chars // 2:
+        cortado = cortado[:quebra]
+    return cortado.rstrip(), True
+
+
+def preprocessar_descricao(texto, max_tokens=None, codigo=None):
+    """
+    Limpa a descrição da vaga e aplica o orçamento de tokens.
+    Retorna (texto_processado, estatisticas).
+    """
+    tokens_antes = estimar_tokens(texto)
+    limpo, removidas = remover_boilerplate(texto)
+    limpo, truncado = truncar_para_orcamento(limpo, max_tokens)
+    tokens_depois = estimar_tokens(limpo)
+
+    estatisticas = {
+        "tokens_antes": tokens_antes,
+        "tokens_depois": tokens_depois,
+        "tokens_economizados": tokens_antes - tokens_depois,
+        "linhas_removidas": removidas,
+        "truncado": truncado,
+    }
+    logger.info(
+        f"Pré-processamento da vaga {codigo}: {tokens_antes} -> {tokens_depois} tokens "
+        f"({estatisticas['tokens_economizados']} economizados, truncado={truncado}, removidas={removidas})"
+    )
+    return limpo, estatisticas
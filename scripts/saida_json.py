@@ -0,0 +1,122 @@
+#saida_json.py
+"""
+Saída dos scripts de etapa para o n8n (stdout).
+
+Formatos (SAIDA_FORMATO):
+- "json" (padrão): array indentado, como sempre foi.
+- "ndjson": um registro JSON compacto por linha, estritamente válido (NaN e
+  infinitos viram null), sem o custo de indentar e sem o regex de limpeza no
+  nó Code do n8n.
+
+No modo ndjson, se a saída passar de SAIDA_LIMITE_BYTES (padrão 8 MB, abaixo
+do N8N_EXECUTE_COMMAND_MAX_BUFFER_SIZE de 10 MB), os registros vão para um
+arquivo em SAIDA_DIR e o stdout recebe só um manifesto de uma linha:
+
+    {"manifesto": "saida_json", "arquivo": "output/analise_vaga_ia_....ndjson",
+     "registros": 12000, "bytes": 48123456, "sha256": "..."}
+
+O entrada_json reconhece o manifesto e lê os registros do arquivo (conferindo
+o sha256), então a etapa seguinte recebe os mesmos itens nos dois casos.
+"""
+import os
+import sys
+import json
+import math
+import hashlib
+import logging
+from datetime import datetime
+from itertools import chain
+
+# ================= LOGGING SETUP =================
+loglevel = os.environ.get("MY_LOG_LEVEL", "INFO").upper()
+logger = logging.getLogger(__name__)
+logger.setLevel(loglevel)
+
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.propagate = False
+
+FORMATOS = ("json", "ndjson")
+SAIDA_FORMATO = os.environ.get("SAIDA_FORMATO", "json").lower()
+SAIDA_LIMITE_BYTES = int(os.environ.get("SAIDA_LIMITE_BYTES", str(8 * 1024 * 1024)))
+SAIDA_DIR = os.environ.get("SAIDA_DIR", "output")
+TIPO_MANIFESTO = "saida_json"  # Valor da chave "manifesto" que identifica o manifesto
+
+
+def sem_nan(valor):
+    """Cópia de `valor` com NaN e infinitos (float) trocados por None, em qualquer profundidade."""
+    if isinstance(valor, float):
+        return None if math.isnan(valor) or math.isinf(valor) else valor
+    if isinstance(valor, dict):
+        return {chave: sem_nan(v) for chave, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [sem_nan(v) for v in valor]
+    return valor
+
+
+def serializar(registro):
+    """JSON compacto e estritamente válido de um registro (sem NaN/Infinity)."""
+    try:
+        return json.dumps(registro, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+    except ValueError:
+        # Só paga a cópia recursiva quando há NaN ou infinito no registro
+        return json.dumps(sem_nan(registro), ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+
+def eh_manifesto(item):
+    return isinstance(item, dict) and item.get("manifesto") == TIPO_MANIFESTO
+
+
+def _despejar(etapa, linhas, restantes, diretorio):
+    """Grava as linhas já serializadas e as restantes num .ndjson em `diretorio`. Retorna o manifesto."""
+    os.makedirs(diretorio, exist_ok=True)
+    caminho = os.path.join(os.path.abspath(diretorio), f"{etapa}_{datetime.now():%Y%m%d_%H%M%S}_{os.getpid()}.ndjson")
+    temporario = f"{caminho}.tmp"
+    sha = hashlib.sha256()
+    total_bytes = 0
+    registros = 0
+    with open(temporario, "wb") as f:
+        for linha in chain(linhas, (serializar(r) for r in restantes)):
+            dados = (linha + "\n").encode("utf-8")
+            f.write(dados)
+            sha.update(dados)
+            total_bytes += len(dados)
+            registros += 1
+    os.replace(temporario, caminho)  # O manifesto só aponta para arquivo completo
+    logger.info(f"Saída de {etapa} com {registros} registros ({total_bytes / 1e6:.1f} MB) gravada em {caminho}")
+    return {"manifesto": TIPO_MANIFESTO, "arquivo": caminho, "registros": registros,
+            "bytes": total_bytes, "sha256": sha.hexdigest()}
+
+
+def renderizar(registros, etapa, formato=None, limite_bytes=None, diretorio=None):
+    """Texto a imprimir no stdout para os registros, conforme o formato (ver docstring do módulo)."""
+    formato = (formato or SAIDA_FORMATO).lower()
+    if formato not in FORMATOS:
+        raise ValueError(f"SAIDA_FORMATO inválido: {formato!r} (use {', '.join(FORMATOS)}).")
+    if formato == "json":
+        return json.dumps(list(registros), ensure_ascii=False, indent=2)
+
+    limite_bytes = SAIDA_LIMITE_BYTES if limite_bytes is None else limite_bytes
+    linhas = []
+    tamanho = 0
+    registros = iter(registros)
+    for registro in registros:
+        linha = serializar(registro)
+        linhas.append(linha)
+        tamanho += len(linha.encode("utf-8")) + 1
+        if tamanho > limite_bytes:
+            # Passou do limite: o restante é serializado direto para o arquivo, sem acumular
+            return serializar(_despejar(etapa, linhas, registros, diretorio or SAIDA_DIR))
+    return "\n".join(linhas)
+
+
+def emitir(registros, etapa, formato=None, fluxo=None):
+    """Imprime os registros no stdout (ou em `fluxo`) no formato configurado."""
+    fluxo = fluxo or sys.stdout
+    texto = renderizar(registros, etapa, formato)
+    if texto:
+        fluxo.write(texto + "\n")
+    fluxo.flush()
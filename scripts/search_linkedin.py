@@ -18,6 +18,7 @@ import openpyxl  # Necessário para o Pandas ler/escrever .xlsx
 import urllib.parse # Para codificar URLs
 
 from dotenv import load_dotenv
+from armazem_vagas import salvar_vagas, caminho_parquet_padrao
 from selenium import webdriver
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
@@ -45,6 +46,7 @@ if not logger.handlers:
     formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     handler.setFormatter(formatter)
     logger.addHandler(handler)
+    logger.propagate = False
 
 # ================= FUNÇÕES DE UTILIDADE =================
 def log_erro(mensagem):
@@ -117,6 +119,9 @@ class EasyApplyLinkedin:
 
         self.driver_path = config_data.get('driver_path', None) 
         self.output_file = config_data.get('input_file_jobs', 'dados/entrada/job_details.xlsx')
+        # Parquet é o formato de troca com analise_vaga_ia.py; o .xlsx fica como exportação para leitura humana
+        self.output_file_parquet = config_data.get('input_file_jobs_parquet', caminho_parquet_padrao(self.output_file))
+        self.export_excel = config_data.get('exportar_excel', True)
         self.error_backup_file = config_data.get('linkedin_error_backup_file', 'logs/job_details_error_backup.xlsx')
         
         # Novas configurações para controle do scraping
@@ -1053,20 +1058,16 @@ class EasyApplyLinkedin:
             return default
 
     def save_jobs_data(self):
-        """Salva os dados coletados em arquivo Excel."""
+        """Salva os dados coletados em Parquet (e exporta em Excel, se configurado)."""
         if not self.job_details:
             logger.warning("Nenhuma vaga foi coletada para salvar.")
             return False
         
         df = pd.DataFrame(self.job_details)
         
-        output_dir = os.path.dirname(self.output_file)
-        if output_dir:
-            os.makedirs(output_dir, exist_ok=True)
-        
         try:
-            df.to_excel(self.output_file, index=False)
-            logger.info(f"Dados das vagas salvos com sucesso em: {self.output_file}")
+            salvar_vagas(df, self.output_file_parquet, self.output_file if self.export_excel else None)
+            logger.info(f"Dados das vagas salvos com sucesso em: {self.output_file_parquet}")
             logger.info(f"Total de vagas salvas: {len(self.job_details)}")
             return True
         except Exception as e:
@@ -0,0 +1,233 @@
+#servidor_aderencia.py
+"""
+Servidor persistente da aderência CV x vagas, num socket Unix local.
+
+O n8n chama o run_aderencia.sh uma vez por item; no modo de execução única,
+cada item paga a importação dos SDKs, a inicialização do modelo, a leitura
+da matriz do CV e a do índice do histórico. Com `aderencia_cv_vaga_ia.py
+--servidor`, um único processo mantém o backend aquecido, a matriz do CV em
+memória (recarregada só quando o .docx muda de mtime ou tamanho) e o índice
+aberto, e o shell só repassa a entrada com curl:
+
+    POST /pontuar   corpo = o mesmo JSON da entrada padrão (lista, objeto ou NDJSON)
+                    resposta = o ranking, igual à saída do modo de execução única (SAIDA_FORMATO)
+    GET  /saude     {"status": "ok", ...}
+
+O servidor encerra sozinho depois de ADERENCIA_OCIOSO_SEGUNDOS sem requisições
+(assim mudanças no config ou no código valem na próxima subida). Um arquivo de
+trava ao lado do socket garante um único servidor por socket.
+"""
+import io
+import os
+import sys
+import json
+import time
+import fcntl
+import socket
+import logging
+import threading
+import socketserver
+from http.server import BaseHTTPRequestHandler
+
+from entrada_json import iterar_json
+from saida_json import renderizar, SAIDA_FORMATO
+
+# ================= LOGGING SETUP =================
+loglevel = os.environ.get("MY_LOG_LEVEL", "INFO").upper()
+logger = logging.getLogger(__name__)
+logger.setLevel(loglevel)
+
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.propagate = False
+
+CAMINHO_SOCKET = os.environ.get("ADERENCIA_SOCKET", "logs/aderencia.sock")
+OCIOSO_SEGUNDOS = float(os.environ.get("ADERENCIA_OCIOSO_SEGUNDOS", "900"))
+INTERVALO_CHECAGEM = 5.0  # Segundos entre checagens do tempo ocioso
+
+
+class _ServidorUnix(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, caminho, config, backend, pontuar_vagas, carregar_cv, indice=None):
+        self.config = config
+        self.backend = backend
+        self.pontuar_vagas = pontuar_vagas
+        self.carregar_cv = carregar_cv
+        self.indice = indice
+        self._cv = None
+        self._chave_cv = None
+        # Uma pontuação por vez: o ranking é gravado em output_file_score e o índice é compartilhado
+        self.trava_pontuacao = threading.Lock()
+        self.trava_estado = threading.Lock()
+        self.em_andamento = 0
+        self.ultima_atividade = time.monotonic()
+        self.atendidas = 0
+        super().__init__(caminho, _Requisicao)
+
+    def cv(self):
+        """CV carregado uma vez e mantido até o .docx mudar (mtime ou tamanho)."""
+        estado = os.stat(self.config['input_file_cv'])
+        chave = (estado.st_mtime_ns, estado.st_size)
+        if chave != self._chave_cv:
+            self._cv = self.carregar_cv(self.config, self.backend)
+            self._chave_cv = chave
+        return self._cv
+
+    def marcar(self, delta):
+        with self.trava_estado:
+            self.em_andamento += delta
+            self.ultima_atividade = time.monotonic()
+
+    def ocioso_ha(self):
+        with self.trava_estado:
+            if self.em_andamento:
+                return 0.0
+            return time.monotonic() - self.ultima_atividade
+
+
+class _Requisicao(BaseHTTPRequestHandler):
+
+    def address_string(self):
+        return "unix"  # Socket Unix não tem endereço de cliente
+
+    def log_message(self, formato, *args):
+        logger.debug(formato % args)
+
+    def _responder(self, status, corpo, tipo="application/json"):
+        dados = (corpo if isinstance(corpo, str) else json.dumps(corpo, ensure_ascii=False)).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{tipo}; charset=utf-8")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_GET(self):
+        if self.path != "/saude":
+            return self._responder(404, {"error": f"Caminho desconhecido: {self.path}"})
+        self._responder(200, {
+            "status": "ok",
+            "pid": os.getpid(),
+            "backend": self.server.backend.nome,
+            "atendidas": self.server.atendidas,
+        })
+
+    def do_POST(self):
+        if self.path != "/pontuar":
+            return self._responder(404, {"error": f"Caminho desconhecido: {self.path}"})
+
+        self.server.marcar(+1)
+        try:
+            tamanho = int(self.headers.get("Content-Length") or 0)
+            vagas = iterar_json(io.StringIO(self.rfile.read(tamanho).decode("utf-8")))
+            inicio = time.perf_counter()
+            with self.server.trava_pontuacao:
+                ranking = self.server.pontuar_vagas(
+                    self.server.config, self.server.backend, vagas,
+                    cv=self.server.cv(), indice=self.server.indice,
+                )
+                self.server.atendidas += 1
+            logger.info(f"{len(ranking)} vaga(s) pontuada(s) em {(time.perf_counter() - inicio) * 1000:.1f} ms")
+            # Mesmo formato do stdout do modo de execução única (SAIDA_FORMATO)
+            self._responder(200, renderizar(ranking, "aderencia_cv_vaga_ia"),
+                            "application/x-ndjson" if SAIDA_FORMATO == "ndjson" else "application/json")
+        except Exception as e:
+            logger.error(f"Erro ao pontuar a requisição: {e}")
+            self._responder(500, {"error": str(e)})
+        finally:
+            self.server.marcar(-1)
+
+
+def _travar(caminho_socket):
+    """Abre e trava <socket>.lock. Retorna o arquivo travado, ou None se outro servidor já o detém."""
+    arquivo = open(f"{caminho_socket}.lock", "w")
+    try:
+        fcntl.flock(arquivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        arquivo.close()
+        return None
+    return arquivo
+
+
+def servir(config, backend, pontuar_vagas, carregar_cv, indice=None,
+           caminho_socket=CAMINHO_SOCKET, ocioso_segundos=OCIOSO_SEGUNDOS):
+    """
+    Atende requisições até ficar `ocioso_segundos` sem nenhuma. Retorna o total
+    atendido. `carregar_cv(config, backend)` prepara o CV para `pontuar_vagas`;
+    `indice` (indice_vagas.IndiceAberto ou None) fica aberto entre as requisições.
+    """
+    diretorio = os.path.dirname(caminho_socket)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+
+    trava = _travar(caminho_socket)
+    if trava is None:
+        logger.info(f"Já existe um servidor de aderência em {caminho_socket}; nada a fazer.")
+        return 0
+
+    # Com a trava em mãos, um socket que sobrou de um servidor encerrado à força pode ser removido
+    if os.path.exists(caminho_socket):
+        os.remove(caminho_socket)
+
+    with trava, _ServidorUnix(caminho_socket, config, backend, pontuar_vagas, carregar_cv, indice) as servidor:
+        os.chmod(caminho_socket, 0o600)
+        # CV e índice carregados antes da primeira requisição
+        servidor.cv()
+        if indice is not None:
+            indice.abrir()
+        thread = threading.Thread(target=servidor.serve_forever, kwargs={"poll_interval": 0.5}, daemon=True)
+        thread.start()
+        logger.info(f"Servidor de aderência ouvindo em {caminho_socket} (backend {backend.nome}, "
+                    f"encerra após {ocioso_segundos:.0f}s ocioso)")
+        try:
+            while servidor.ocioso_ha() < ocioso_segundos:
+                time.sleep(min(INTERVALO_CHECAGEM, ocioso_segundos))
+            logger.info(f"Servidor de aderência ocioso por {ocioso_segundos:.0f}s; encerrando.")
+        except KeyboardInterrupt:
+            logger.info("Servidor de aderência interrompido.")
+        finally:
+            servidor.shutdown()
+            try:
+                os.remove(caminho_socket)
+            except FileNotFoundError:
+                pass
+        return servidor.atendidas
+
+
+def consultar(caminho, corpo=None, caminho_socket=CAMINHO_SOCKET, timeout=300):
+    """Cliente mínimo (sem curl): GET quando `corpo` é None, senão POST com o JSON. Retorna (status, resposta)."""
+    import http.client
+
+    class _ConexaoUnix(http.client.HTTPConnection):
+        def connect(self):
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(self.timeout)
+            self.sock.connect(caminho_socket)
+
+    conexao = _ConexaoUnix("localhost", timeout=timeout)
+    try:
+        if corpo is None:
+            conexao.request("GET", caminho)
+        else:
+            dados = corpo if isinstance(corpo, (bytes, str)) else json.dumps(corpo, ensure_ascii=False)
+            if isinstance(dados, str):
+                dados = dados.encode("utf-8")  # O http.client codificaria str em latin-1
+            conexao.request("POST", caminho, body=dados, headers={"Content-Type": "application/json"})
+        resposta = conexao.getresponse()
+        return resposta.status, json.loads(resposta.read().decode("utf-8"))
+    finally:
+        conexao.close()
+
+
+if __name__ == "__main__":
+    # Checagem rápida: python scripts/servidor_aderencia.py  -> estado do servidor no socket configurado
+    try:
+        status, resposta = consultar("/saude", timeout=5)
+    except OSError as e:
+        print(json.dumps({"status": "fora do ar", "socket": CAMINHO_SOCKET, "erro": str(e)}, ensure_ascii=False))
+        sys.exit(1)
+    print(json.dumps(resposta, ensure_ascii=False))
+    sys.exit(0 if status == 200 else 1)